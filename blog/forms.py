@@ -5,6 +5,7 @@ from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 from .models import Author, BlogPost, GalleryImage
 from teaching.subject import Subject
+from mks.reference_data import ReferenceModelChoiceField
 import uuid
 import logging
 
@@ -90,8 +91,8 @@ class ArticleForm(forms.ModelForm):
         max_length=160
     )
     
-    category = forms.ModelChoiceField(
-        queryset=Subject.objects.all(),
+    category = ReferenceModelChoiceField(
+        Subject,
         widget=forms.Select(attrs={'class': 'form-control'}),
         label=_("Category"),
         required=False
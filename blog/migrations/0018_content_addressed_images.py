@@ -0,0 +1,25 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:10
+
+import django.core.validators
+from django.db import migrations, models
+import mks.media_storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_alter_author_id_alter_blogpost_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogpost',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=mks.media_storage.get_media_storage, upload_to='blog/posts/images/'),
+        ),
+        migrations.AlterField(
+            model_name='galleryimage',
+            name='image',
+            field=models.ImageField(storage=mks.media_storage.get_media_storage, upload_to='blog/gallery/images/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'gif'])]),
+        ),
+    ]
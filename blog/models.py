@@ -11,6 +11,7 @@ from django.core.exceptions import ValidationError
 import uuid
 from PIL import Image
 import os
+from mks.media_storage import get_media_storage
 
 class Author(models.Model):
     first_name = models.CharField(max_length=60)
@@ -44,7 +45,7 @@ class BlogPost(models.Model):
         blank=True, null=True
     )
     content = HTMLField()  # Changed from RichTextField to HTMLField for TinyMCE
-    image = models.ImageField(upload_to='blog/posts/images/', blank=True, null=True)  # Bild optional
+    image = models.ImageField(upload_to='blog/posts/images/', storage=get_media_storage, blank=True, null=True)  # Bild optional
     image_alt_text = models.CharField(max_length=255, blank=True)  # Added for SEO/accessibility
     
     # Neue Felder für bessere Bildverwaltung
@@ -239,7 +240,7 @@ class BlogPost(models.Model):
 class GalleryImage(models.Model):
     blog_post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='gallery_images')
     image = models.ImageField(
-        upload_to='blog/gallery/images/', 
+        upload_to='blog/gallery/images/', storage=get_media_storage,
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'gif'])]
     )
     caption = models.CharField(max_length=255, blank=True)
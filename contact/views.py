@@ -5,6 +5,7 @@ from contact.forms import ContactForm
 from contact.email import contact_mail_student
 from students.models import Student
 from students.gender import Gender
+from mks import reference_data
 import datetime
 from django.conf import settings
 import urllib.request
@@ -50,7 +51,7 @@ def emailView(request):
                 from_email = form.cleaned_data['from_email']
                 message = form.cleaned_data['message']
                 gender_id = request.POST['gender']
-                gender_object = Gender.objects.get(pk=gender_id)
+                gender_object = reference_data.get(Gender, gender_id)
                 first_name = request.POST['first_name']
                 last_name = request.POST['last_name']
                 from_email = request.POST['from_email']
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ControllingConfig(AppConfig):
     name = 'controlling'
+
+    def ready(self):
+        import controlling.signals
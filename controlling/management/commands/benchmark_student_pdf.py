@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from controlling.pdf import resolve_resource, warm_up
+from controlling.student_pdf import (
+    pdf_cache, render_student_pdf, render_student_pdfs, student_pdf_cache_key,
+)
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Misst die Kosten der Schüler-PDFs (Template, xhtml2pdf, Cache, Batch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20,
+                            help='Anzahl Schüler')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Prozesse für den Batch (Standard: CPU-Anzahl)')
+
+    def handle(self, *args, **options):
+        students = list(Student.objects.select_related('parent', 'subject', 'teacher')[:options['students']])
+        if not students:
+            raise CommandError('Keine Schüler in der Datenbank')
+        keys = [student_pdf_cache_key(student) for student in students]
+
+        pdf_cache().delete_many(keys)
+        timings = {}
+        render_student_pdf(students[0], timings)
+        self.write_timings('Erstes PDF (kalt)', timings)
+
+        warm_up()
+        pdf_cache().delete_many(keys)
+        timings = {}
+        for student in students:
+            render_student_pdf(student, timings)
+        self.write_timings('Pro PDF (warm)', {phase: ms / len(students) for phase, ms in timings.items()})
+
+        timings = {}
+        for student in students:
+            render_student_pdf(student, timings)
+        self.write_timings('Pro PDF (Cache)', {phase: ms / len(students) for phase, ms in timings.items()})
+
+        pdf_cache().delete_many(keys)
+        start = time.perf_counter()
+        render_student_pdfs(students, workers=options['workers'])
+        seconds = time.perf_counter() - start
+        self.stdout.write(f'{"Batch (Prozess-Pool)":<20} {seconds * 1000:8.1f} ms gesamt, '
+                          f'{seconds * 1000 / len(students):.1f} ms/PDF')
+
+        info = resolve_resource.cache_info()
+        self.stdout.write(f'{"Asset-Auflösung":<20} {info.hits} Treffer, {info.misses} Auflösungen')
+
+    def write_timings(self, label, timings):
+        phases = ', '.join(f'{phase} {ms:.1f} ms' for phase, ms in timings.items())
+        self.stdout.write(f'{label:<20} {sum(timings.values()):8.1f} ms ({phases})')
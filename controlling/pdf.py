@@ -0,0 +1,134 @@
+"""
+HTML -> PDF mit xhtml2pdf
+
+Das Modul importiert keine Models, damit html_to_pdf auch in den
+Prozessen eines ProcessPoolExecutor (Batch-Erzeugung) aufgerufen werden
+kann.
+
+- Asset-URIs (STATIC_URL/MEDIA_URL) werden pro Prozess einmal aufgelöst
+  und geprüft (resolve_resource, LRU-Cache).
+- warm_up() rendert einmal ein Minimaldokument, damit xhtml2pdf und
+  reportlab ihre Font-Metriken und Tabellen vor dem ersten echten PDF
+  geladen haben; der Batch-Pool nutzt es als Initializer.
+- Über ``timings`` werden die Phasen in Millisekunden gemessen
+  (siehe server_timing_header).
+"""
+import io
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Optional PDF import - graceful fallback if not available
+try:
+    from xhtml2pdf import pisa
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_CACHE_SIZE = 256
+
+_warmed_up = False
+
+
+class PdfRenderError(Exception):
+    pass
+
+
+@contextmanager
+def timed(timings, phase):
+    """Addiert die Dauer des Blocks in ms unter ``phase`` (falls timings nicht None)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def server_timing_header(timings):
+    """Server-Timing Header, z.B. 'template;dur=3.1, pdf;dur=82.4'"""
+    return ', '.join('%s;dur=%.1f' % (phase, duration) for phase, duration in timings.items())
+
+
+@lru_cache(maxsize=1)
+def _resource_roots():
+    return (
+        (settings.MEDIA_URL, settings.MEDIA_ROOT),
+        (settings.STATIC_URL, settings.STATIC_ROOT),
+    )
+
+
+@lru_cache(maxsize=RESOURCE_CACHE_SIZE)
+def resolve_resource(uri):
+    """
+    Dateipfad für eine Media/Static-URI; andere URIs bleiben unverändert.
+    Nicht vorhandene Dateien lösen eine Exception aus und werden nicht
+    gecacht.
+    """
+    for url, root in _resource_roots():
+        if url and uri.startswith(url):
+            path = os.path.join(root, uri[len(url):])
+            break
+    else:
+        return uri
+
+    # Make sure that file exists
+    if not os.path.isfile(path):
+        raise Exception(f'Media/static file not found: {path}')
+
+    return path
+
+
+def reset_resource_cache():
+    _resource_roots.cache_clear()
+    resolve_resource.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting in ('MEDIA_URL', 'MEDIA_ROOT', 'STATIC_URL', 'STATIC_ROOT'):
+        reset_resource_cache()
+
+
+def link_callback(uri, rel):
+    """
+    Convert HTML URIs to absolute system paths so xhtml2pdf can access those resources
+    """
+    return resolve_resource(uri)
+
+
+def html_to_pdf(html, timings=None):
+    """Rendert ein HTML-Dokument und liefert die PDF-Bytes"""
+    if not PDF_AVAILABLE:
+        raise PdfRenderError('xhtml2pdf ist nicht installiert')
+    output = io.BytesIO()
+    # xhtml2pdf parst, setzt und schreibt das Dokument in einem Aufruf
+    with timed(timings, 'pdf'):
+        pisa_status = pisa.CreatePDF(
+            io.BytesIO(html.encode("UTF-8")),
+            dest=output,
+            encoding='UTF-8',
+            link_callback=link_callback
+        )
+    if pisa_status.err:
+        raise PdfRenderError('Fehler bei der PDF-Erstellung')
+    return output.getvalue()
+
+
+def warm_up():
+    """Einmal pro Prozess ein Minimaldokument rendern"""
+    global _warmed_up
+    if _warmed_up or not PDF_AVAILABLE:
+        return
+    timings = {}
+    html_to_pdf('<html><body><p><b>MKS</b> <i>PDF</i></p><table><tr><td>-</td></tr></table></body></html>', timings)
+    _warmed_up = True
+    logger.debug('PDF warm-up in %.1f ms', timings['pdf'])
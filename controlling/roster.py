@@ -0,0 +1,113 @@
+"""
+Schülerliste mit Keyset-Pagination
+
+Die Liste ist nach (start_date, id) absteigend sortiert. Statt OFFSET
+wird ein Cursor mit dem letzten (start_date, id) weitergegeben, damit
+jede Seite genau eine Abfrage kostet - egal wie weit gescrollt wird.
+"""
+import base64
+import datetime
+
+from django.db.models import Count, Q
+from django.urls import reverse
+
+from students.models import Student
+
+ROSTER_PAGE_SIZE = 50
+ROSTER_MAX_PAGE_SIZE = 200
+
+# GET-Parameter -> Filter auf Student
+ROSTER_FILTERS = {
+    'category': 'subject__category_id',
+    'teacher': 'teacher_id',
+    'subject': 'subject_id',
+    'lesson_form': 'lesson_form_id',
+    'location': 'location_id',
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(student):
+    raw = f'{student.start_date.isoformat()}|{student.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        start_date, student_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.date.fromisoformat(start_date), int(student_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def parse_filters(params):
+    """Liest die Filter aus den GET-Parametern; ungültige IDs werden ignoriert"""
+    filters = {}
+    for param, lookup in ROSTER_FILTERS.items():
+        value = params.get(param, '')
+        if value.isdigit():
+            filters[lookup] = int(value)
+    return filters
+
+
+def roster_queryset(filters=None):
+    """Gefilterte Schüler inklusive Fach, Lehrer und Eltern in einem Join"""
+    return Student.objects.filter(**(filters or {})).select_related(
+        'subject', 'teacher', 'parent',
+    ).only(
+        'id', 'first_name', 'last_name', 'start_date', 'trial_lesson',
+        'subject__subject',
+        'teacher__first_name', 'teacher__last_name',
+        'parent__phone', 'parent__email',
+    ).order_by('-start_date', '-id')
+
+
+def roster_page(queryset, cursor=None, page_size=ROSTER_PAGE_SIZE):
+    """
+    Liefert (students, next_cursor) für die Seite nach ``cursor``.
+    next_cursor ist None, wenn keine weiteren Einträge folgen.
+    """
+    if cursor:
+        start_date, student_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(start_date__lt=start_date) | Q(start_date=start_date, id__lt=student_id)
+        )
+    # Ein Eintrag mehr, um zu wissen ob es weitergeht
+    students = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(students) > page_size:
+        students = students[:page_size]
+        next_cursor = encode_cursor(students[-1])
+    return students, next_cursor
+
+
+def roster_row(student):
+    """JSON-Darstellung einer Tabellenzeile"""
+    parent = student.parent
+    return {
+        'id': student.id,
+        'start_date': student.start_date.isoformat() if student.start_date else None,
+        'first_name': student.first_name,
+        'last_name': student.last_name,
+        'subject': str(student.subject) if student.subject else '',
+        'teacher': str(student.teacher) if student.teacher else None,
+        'parent_phone': parent.phone if parent else '',
+        'parent_email': parent.email if parent else '',
+        'trial_lesson': student.trial_lesson,
+        'detail_url': '%s?id=%d' % (reverse('controlling:get_controlling_single_student'), student.id),
+    }
+
+
+def roster_summary(filters=None):
+    """Kennzahlen für die Statistik-Karten in einer Abfrage"""
+    thirty_days_ago = datetime.date.today() - datetime.timedelta(days=30)
+    return Student.objects.filter(**(filters or {})).aggregate(
+        total=Count('pk'),
+        with_teacher=Count('pk', filter=Q(teacher__isnull=False)),
+        trial_done=Count('pk', filter=Q(trial_lesson=True)),
+        recent=Count('pk', filter=Q(start_date__gte=thirty_days_ago)),
+    )
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from students.models import Parent, Student
+from teaching.models import Teacher
+from teaching.subject import Subject, SubjectCategory
+
+from .statistics import invalidate_statistics
+from .student_search import invalidate_search_index
+
+# Models deren Änderungen die Controlling-Statistik beeinflussen
+STATISTICS_MODELS = (Student, Teacher, Subject, SubjectCategory)
+
+
+def invalidate_statistics_on_change(sender, **kwargs):
+    """
+    Signal handler - Statistik beim nächsten Aufruf neu berechnen
+    """
+    invalidate_statistics()
+
+
+for model in STATISTICS_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_statistics_on_change, sender=model,
+        dispatch_uid='controlling_statistics_save_%s' % label)
+    post_delete.connect(
+        invalidate_statistics_on_change, sender=model,
+        dispatch_uid='controlling_statistics_delete_%s' % label)
+
+m2m_changed.connect(
+    invalidate_statistics_on_change, sender=Teacher.subject_coordinator.through,
+    dispatch_uid='controlling_statistics_coordinators')
+
+
+def invalidate_search_index_on_change(sender, **kwargs):
+    """
+    Signal handler - Suchindex beim nächsten Aufruf neu aufbauen
+    """
+    invalidate_search_index()
+
+
+for model in (Student, Parent):
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_search_index_on_change, sender=model,
+        dispatch_uid='controlling_search_save_%s' % label)
+    post_delete.connect(
+        invalidate_search_index_on_change, sender=model,
+        dispatch_uid='controlling_search_delete_%s' % label)
@@ -0,0 +1,72 @@
+"""
+Statistik-Service für das Controlling
+
+Alle Kennzahlen für Dashboard und Lehrer-Verwaltung werden mit einer
+Abfrage pro Model berechnet (bedingte Aggregation bzw. GROUP BY) und im
+Cache gehalten. Die Signal-Handler in controlling.signals verwerfen den
+Cache, sobald Schüler, Lehrer oder Fächer geändert werden.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from students.models import Student
+from teaching.models import Teacher
+from teaching.subject import Subject, SubjectCategory
+
+from .teacher_search import annotate_teacher_flags
+
+STATISTICS_CACHE_KEY = 'controlling_statistics'
+STATISTICS_CACHE_TIMEOUT = 60 * 60
+
+
+def teacher_counts(queryset=None):
+    """
+    Gesamtzahl, Fachgruppenleitungen sowie Lehrer mit E-Mail/Telefon
+    in einer Abfrage. Ein gefiltertes Queryset kann übergeben werden.
+    """
+    teachers = Teacher.objects.all() if queryset is None else queryset.order_by()
+    return annotate_teacher_flags(teachers).aggregate(
+        total=Count('pk'),
+        coordinators=Count('pk', filter=Q(is_coordinator=True)),
+        with_email=Count('pk', filter=Q(has_email=True)),
+        with_phone=Count('pk', filter=Q(has_phone=True)),
+    )
+
+
+def student_counts_by_category():
+    """Anzahl der Schüler je SubjectCategory-ID (ein GROUP BY)"""
+    rows = Student.objects.order_by().values('subject__category_id').annotate(count=Count('pk'))
+    return {row['subject__category_id']: row['count'] for row in rows}
+
+
+def build_statistics():
+    by_category = student_counts_by_category()
+    teachers = teacher_counts()
+    return {
+        'total_students': sum(by_category.values()),
+        'students_by_category': by_category,
+        'total_subjects': Subject.objects.count(),
+        'teachers': teachers,
+    }
+
+
+def get_statistics():
+    """Kennzahlen aus dem Cache, bei Bedarf neu berechnet"""
+    statistics = cache.get(STATISTICS_CACHE_KEY)
+    if statistics is None:
+        statistics = build_statistics()
+        cache.set(STATISTICS_CACHE_KEY, statistics, STATISTICS_CACHE_TIMEOUT)
+    return statistics
+
+
+def invalidate_statistics():
+    cache.delete(STATISTICS_CACHE_KEY)
+
+
+def category_statistics(categories):
+    """Liste von {'category', 'count'} für die übergebenen Kategorien"""
+    by_category = get_statistics()['students_by_category']
+    return [
+        {'category': category, 'count': by_category.get(category.id, 0)}
+        for category in categories
+    ]
@@ -0,0 +1,140 @@
+"""
+Schülerdatenblätter als PDF
+
+Jedes PDF wird unter einem Hash der Schüler- und Elterndaten (plus
+Fach, Lehrkraft und Template-Quelle) in einem eigenen Cache
+(STUDENT_PDF_CACHE) abgelegt, damit große Batches nicht die Einträge des
+Standard-Caches verdrängen. Unveränderte
+Schüler werden daher nie neu gerendert; jede Änderung ergibt einen neuen
+Schlüssel. Für Batches werden die fehlenden PDFs in einem Prozess-Pool
+erzeugt - das HTML wird im Request-Prozess gerendert, xhtml2pdf läuft in
+den Workern.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.defaultfilters import date as date_filter
+from django.template.loader import get_template
+
+from controlling.pdf import html_to_pdf, timed, warm_up
+
+STUDENT_PDF_TEMPLATE = 'controlling/single_student_pdf.html'
+# Cache-Alias in settings.CACHES
+STUDENT_PDF_CACHE = 'student_pdfs'
+STUDENT_PDF_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+# Obergrenze für einen Batch-Download
+STUDENT_PDF_BATCH_MAX = 500
+
+
+def student_pdf_context(student):
+    parent = student.parent
+    return {
+        'student': student,
+        'parent': parent,
+        # Format dates for locale
+        'birth_date': date_filter(student.birth_date, "d.m.Y") if student.birth_date else "",
+        'start_date': date_filter(student.start_date, "d.m.Y") if student.start_date else "",
+        # Explicitly convert foreign key objects to strings
+        'subject_str': str(student.subject) if student.subject else "",
+        'teacher_str': str(student.teacher) if student.teacher else "",
+        'BASE_DIR': settings.BASE_DIR,  # For static file paths
+    }
+
+
+def pdf_cache():
+    return caches[STUDENT_PDF_CACHE]
+
+
+def student_pdf_filename(student):
+    safe_name = f"{student.first_name}_{student.last_name}".replace(" ", "_").replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
+    return f"schuelerdaten_{safe_name}_{student.id}.pdf"
+
+
+@lru_cache(maxsize=None)
+def _template_digest():
+    template = get_template(STUDENT_PDF_TEMPLATE)
+    return hashlib.sha256(template.template.source.encode()).hexdigest()
+
+
+def _row_values(instance):
+    if instance is None:
+        return None
+    return [(field.attname, getattr(instance, field.attname)) for field in instance._meta.concrete_fields]
+
+
+def student_pdf_cache_key(student):
+    context = student_pdf_context(student)
+    content = repr((
+        _row_values(student), _row_values(student.parent),
+        context['subject_str'], context['teacher_str'], _template_digest(),
+    ))
+    return 'student_pdf_%s' % hashlib.sha256(content.encode()).hexdigest()
+
+
+def render_student_html(student, timings=None):
+    with timed(timings, 'template'):
+        return get_template(STUDENT_PDF_TEMPLATE).render(student_pdf_context(student))
+
+
+def render_student_pdf(student, timings=None):
+    """
+    PDF-Bytes eines Schülers, aus dem Cache falls unverändert.
+    ``timings`` (dict) erhält die Dauer der einzelnen Phasen in ms.
+    """
+    with timed(timings, 'cache'):
+        key = student_pdf_cache_key(student)
+        pdf = pdf_cache().get(key)
+    if pdf is None:
+        pdf = html_to_pdf(render_student_html(student, timings), timings)
+        with timed(timings, 'write'):
+            pdf_cache().set(key, pdf, STUDENT_PDF_CACHE_TIMEOUT)
+    return pdf
+
+
+def _batch_workers(pending):
+    workers = getattr(settings, 'STUDENT_PDF_WORKERS', None) or os.cpu_count() or 1
+    return max(1, min(workers, pending))
+
+
+def render_student_pdfs(students, workers=None):
+    """
+    Liste von (student, pdf_bytes) in der Reihenfolge von ``students``.
+    Nur nicht gecachte PDFs werden gerendert, bei mehr als einem Worker
+    parallel in einem ProcessPoolExecutor.
+    """
+    students = list(students)
+    keys = [student_pdf_cache_key(student) for student in students]
+    cached = pdf_cache().get_many(keys)
+    missing = [index for index, key in enumerate(keys) if key not in cached]
+
+    if missing:
+        html = [render_student_html(students[index]) for index in missing]
+        workers = workers or _batch_workers(len(missing))
+        if workers == 1:
+            pdfs = [html_to_pdf(document) for document in html]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as executor:
+                pdfs = list(executor.map(html_to_pdf, html))
+        rendered = {keys[index]: pdf for index, pdf in zip(missing, pdfs)}
+        pdf_cache().set_many(rendered, STUDENT_PDF_CACHE_TIMEOUT)
+        cached.update(rendered)
+
+    return [(student, cached[key]) for student, key in zip(students, keys)]
+
+
+def merge_pdfs(pdfs):
+    """Fügt mehrere PDFs zu einem Dokument zusammen"""
+    from PyPDF2 import PdfMerger
+
+    merger = PdfMerger()
+    for pdf in pdfs:
+        merger.append(io.BytesIO(pdf))
+    output = io.BytesIO()
+    merger.write(output)
+    merger.close()
+    return output.getvalue()
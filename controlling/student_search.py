@@ -0,0 +1,199 @@
+"""
+Unscharfe Suche über Schüler und Eltern
+
+Durchsucht Vor- und Nachname des Schülers sowie Name, E-Mail, Telefon und
+PLZ der Eltern. Jeder Suchbegriff muss in mindestens einem Feld
+vorkommen; das Ranking ist die Summe der besten Wort-Ähnlichkeit
+(Trigramme) je Begriff.
+
+- PostgreSQL: pg_trgm mit GIN-Indizes (Migration students 0015). Eine
+  Abfrage filtert mit allen Begriffen über Schüler und Eltern; das
+  Ranking wird nur für diese Treffer berechnet.
+- Andere Datenbanken (SQLite): ein Trigramm-Index im Prozess, der über
+  einen Versions-Stempel im Cache verworfen wird, sobald Schüler oder
+  Eltern geändert werden (controlling.signals). Ohne gemeinsamen Cache
+  wird er spätestens nach STUDENT_SEARCH_INDEX_MAX_AGE Sekunden neu
+  aufgebaut.
+"""
+import heapq
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+
+from students.models import Student
+
+STUDENT_SEARCH_LIMIT = 20
+STUDENT_SEARCH_MAX_LIMIT = 100
+# Entspricht pg_trgm.word_similarity_threshold
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+STUDENT_SEARCH_FIELDS = ('first_name', 'last_name')
+PARENT_SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'phone', 'postal_code')
+
+SEARCH_INDEX_VERSION_KEY = 'student_search_version'
+DEFAULT_INDEX_MAX_AGE = 300
+
+_WORD_SPLIT = re.compile(r'[^\w]+')
+
+# (version, index, gebaut_um) - wird als Ganzes ersetzt
+_local_index = (None, None, 0.0)
+_build_lock = threading.Lock()
+
+
+def split_terms(query):
+    """Suchbegriffe in Kleinbuchstaben, ohne Duplikate"""
+    return list(dict.fromkeys(word for word in _WORD_SPLIT.split(query.lower()) if word))
+
+
+def trigrams(word):
+    """Trigramme wie pg_trgm: zwei Leerzeichen davor, eines danach"""
+    padded = '  %s ' % word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def search_students(query, limit=STUDENT_SEARCH_LIMIT):
+    """
+    Liste von (student, score), nach score absteigend. Die Schüler sind
+    mit select_related wie in controlling.roster geladen.
+    """
+    terms = split_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == 'postgresql':
+        ranked = _postgres_rank(terms, limit)
+    else:
+        ranked = get_search_index().search(terms, limit)
+    if not ranked:
+        return []
+    students = Student.objects.select_related('subject', 'teacher', 'parent').in_bulk(
+        [student_id for student_id, score in ranked])
+    return [(students[student_id], score) for student_id, score in ranked if student_id in students]
+
+
+def _postgres_rank(terms, limit):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+    from django.db.models.functions import Coalesce, Greatest
+
+    fields = [*STUDENT_SEARCH_FIELDS, *('parent__' + field for field in PARENT_SEARCH_FIELDS)]
+    # Alle Begriffe in einer Abfrage: erst die vollständige Treffermenge,
+    # dann Ranking und Limit - ein Schnitt pro Begriff könnte Treffer verlieren
+    match = Q()
+    for term in terms:
+        term_match = Q()
+        for field in fields:
+            term_match |= Q(**{f'{field}__trigram_word_similar': term})
+        match &= term_match
+    score = None
+    for term in terms:
+        term_score = Greatest(*[Coalesce(TrigramWordSimilarity(term, field), 0.0) for field in fields])
+        score = term_score if score is None else score + term_score
+    rows = Student.objects.filter(match).annotate(score=score).order_by(
+        '-score', 'last_name', 'first_name', 'id',
+    ).values_list('id', 'score')[:limit]
+    return [(student_id, round(score / len(terms), 3)) for student_id, score in rows]
+
+
+class TrigramIndex:
+    """
+    Trigramm-Index über das Vokabular: Trigramm -> Wörter, Wort -> Schüler.
+    Da jedes Posting zu genau einem Wort gehört, ergibt die Anzahl
+    gemeinsamer Trigramme direkt die Wort-Ähnlichkeit.
+    """
+
+    def __init__(self, rows):
+        self.sort_keys = {}
+        students_by_word = defaultdict(set)
+        for student_id, sort_key, values in rows:
+            self.sort_keys[student_id] = sort_key
+            for value in values:
+                if value:
+                    for word in split_terms(str(value)):
+                        students_by_word[word].add(student_id)
+        self.words = list(students_by_word)
+        self.word_students = [students_by_word[word] for word in self.words]
+        self.postings = defaultdict(list)
+        for word_index, word in enumerate(self.words):
+            for trigram in trigrams(word):
+                self.postings[trigram].append(word_index)
+
+    def __len__(self):
+        return len(self.sort_keys)
+
+    def score_term(self, term):
+        """{student_id: Ähnlichkeit} für alle Schüler über dem Schwellwert"""
+        term_trigrams = trigrams(term)
+        shared = Counter()
+        for trigram in term_trigrams:
+            shared.update(self.postings.get(trigram, ()))
+        scores = {}
+        for word_index, count in shared.items():
+            similarity = count / len(term_trigrams)
+            if similarity < WORD_SIMILARITY_THRESHOLD:
+                continue
+            for student_id in self.word_students[word_index]:
+                if similarity > scores.get(student_id, 0.0):
+                    scores[student_id] = similarity
+        return scores
+
+    def search(self, terms, limit):
+        totals = None
+        # Lange (meist seltene) Begriffe zuerst, damit die Schnittmenge schnell klein wird
+        for term in sorted(terms, key=len, reverse=True):
+            scores = self.score_term(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {
+                    student_id: total + scores[student_id]
+                    for student_id, total in totals.items() if student_id in scores
+                }
+            if not totals:
+                return []
+        ranked = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], self.sort_keys[item[0]]))
+        return [(student_id, round(total / len(terms), 3)) for student_id, total in ranked]
+
+
+def build_search_index():
+    fields = [*STUDENT_SEARCH_FIELDS, *('parent__' + field for field in PARENT_SEARCH_FIELDS)]
+    rows = Student.objects.order_by().values_list('id', *fields).iterator(chunk_size=2000)
+    return TrigramIndex(
+        (row[0], (row[2].lower(), row[1].lower(), row[0]), row[1:]) for row in rows
+    )
+
+
+def get_search_version():
+    version = cache.get(SEARCH_INDEX_VERSION_KEY)
+    if version is None:
+        # Zufälliger Stempel, damit ein geleerter Cache nie eine alte Version trifft
+        version = uuid.uuid4().hex
+        if not cache.add(SEARCH_INDEX_VERSION_KEY, version, None):
+            version = cache.get(SEARCH_INDEX_VERSION_KEY, version)
+    return version
+
+
+def _index_is_current(version):
+    local_version, index, built_at = _local_index
+    max_age = getattr(settings, 'STUDENT_SEARCH_INDEX_MAX_AGE', DEFAULT_INDEX_MAX_AGE)
+    return local_version == version and time.monotonic() - built_at < max_age
+
+
+def get_search_index():
+    """Index dieses Prozesses, neu aufgebaut wenn sich die Version geändert hat"""
+    global _local_index
+    version = get_search_version()
+    if not _index_is_current(version):
+        with _build_lock:
+            if not _index_is_current(version):
+                _local_index = (version, build_search_index(), time.monotonic())
+    return _local_index[1]
+
+
+def invalidate_search_index():
+    cache.set(SEARCH_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,54 @@
+"""
+Suche und Kennzeichen für die Lehrer-Verwaltung
+
+Die Liste (get_all_teachers) und die AJAX-Suche (teacher_api_search)
+filtern über dieselbe Funktion. Fächer werden per EXISTS geprüft statt
+über einen Join, damit kein DISTINCT nötig ist; Fachgruppenleitung,
+E-Mail und Telefon kommen als Annotationen aus derselben Abfrage.
+"""
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+
+from teaching.models import Teacher
+
+TEACHER_PAGE_SIZE = 24
+
+TEACHER_SORT_OPTIONS = {
+    'last_name': ('last_name', 'first_name'),
+    'first_name': ('first_name', 'last_name'),
+    'email': ('email', 'first_name'),
+    'recent': ('-id',),
+}
+
+
+def _teacher_subjects():
+    return Teacher.subject.through.objects.filter(teacher_id=OuterRef('pk'))
+
+
+def search_teachers(queryset=None, query='', subject_id=None):
+    """Filtert nach Name, E-Mail oder Fach und optional nach einem Fach"""
+    teachers = Teacher.objects.all() if queryset is None else queryset
+    if query:
+        teachers = teachers.filter(
+            Q(first_name__icontains=query) |
+            Q(last_name__icontains=query) |
+            Q(email__icontains=query) |
+            Exists(_teacher_subjects().filter(subject__subject__icontains=query))
+        )
+    if subject_id:
+        teachers = teachers.filter(Exists(_teacher_subjects().filter(subject_id=subject_id)))
+    return teachers
+
+
+def annotate_teacher_flags(queryset):
+    """is_coordinator, has_email und has_phone als Annotationen"""
+    return queryset.annotate(
+        is_coordinator=Exists(
+            Teacher.subject_coordinator.through.objects.filter(teacher_id=OuterRef('pk'))
+        ),
+        has_email=ExpressionWrapper(~Q(email=''), output_field=BooleanField()),
+        has_phone=ExpressionWrapper(~Q(phone=''), output_field=BooleanField()),
+    )
+
+
+def sort_teachers(queryset, sort_by):
+    return queryset.order_by(*TEACHER_SORT_OPTIONS.get(sort_by, TEACHER_SORT_OPTIONS['last_name']))
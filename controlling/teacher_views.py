@@ -1,10 +1,12 @@
 """
 Erweiterte Teacher-Verwaltungsansichten für das MKS Admin Interface
 """
+from operator import attrgetter
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
@@ -13,6 +15,11 @@ from teaching.models import Teacher
 from teaching.subject import Subject, SubjectCategory
 from students.models import Gender, AcademicTitle
 from location.models import Country
+from mks import reference_data
+from controlling.statistics import get_statistics, teacher_counts
+from controlling.teacher_search import (
+    TEACHER_PAGE_SIZE, annotate_teacher_flags, search_teachers, sort_teachers,
+)
 
 
 @login_required
@@ -24,63 +31,66 @@ def get_all_teachers(request):
     subject_filter = request.GET.get('subject', '')
     sort_by = request.GET.get('sort', 'last_name')
     
-    # Base queryset with optimizations
-    teachers = Teacher.objects.select_related(
-        'gender', 
-        'academic_title', 
-        'country'
-    ).prefetch_related(
-        'subject', 
-        'subject_coordinator'
+    teachers = search_teachers(
+        query=search_query,
+        subject_id=subject_filter if subject_filter.isdigit() else None,
     )
     
-    # Search functionality
-    if search_query:
-        teachers = teachers.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(subject__subject__icontains=search_query)  # Fixed: subject.subject instead of subject.name
-        ).distinct()
-    
-    # Subject filter
-    if subject_filter:
-        teachers = teachers.filter(subject__id=subject_filter)
-    
-    # Sorting
-    sort_options = {
-        'last_name': 'last_name',
-        'first_name': 'first_name',
-        'email': 'email',
-        'recent': '-id',
-    }
-    
-    if sort_by in sort_options:
-        teachers = teachers.order_by(sort_options[sort_by], 'first_name')
+    # Statistics - eine Abfrage; ungefiltert aus dem Cache
+    if search_query or subject_filter:
+        counts = teacher_counts(teachers)
     else:
-        teachers = teachers.order_by('last_name', 'first_name')
+        counts = get_statistics()['teachers']
     
-    # Get all subjects for filter - Fixed: order by 'subject' instead of 'name'
-    all_subjects = Subject.objects.all().order_by('subject')
+    # Nur die aktuelle Seite laden; Fächer und Fachgruppen per Prefetch
+    teachers = sort_teachers(annotate_teacher_flags(teachers), sort_by).select_related(
+        'academic_title',
+    ).prefetch_related(
+        'subject', 
+        'subject_coordinator'
+    )
+    paginator = Paginator(teachers, TEACHER_PAGE_SIZE)
+    # Gesamtzahl ist schon bekannt - kein zusätzliches COUNT(*)
+    paginator.count = counts['total']
+    page = paginator.get_page(request.GET.get('page'))
+    page_query = request.GET.copy()
+    page_query.pop('page', None)
     
-    # Statistics
-    total_count = teachers.count()
+    # Fächer für den Filter aus dem Referenzdaten-Cache
+    all_subjects = sorted(reference_data.rows(Subject), key=attrgetter('subject'))
     
     context = {
-        'teachers': teachers,
+        'teachers': page,
+        'page_obj': page,
+        'page_query': page_query.urlencode(),
         'search_query': search_query,
         'subject_filter': subject_filter,
         'sort_by': sort_by,
-        'total_count': total_count,
+        'total_count': counts['total'],
         'all_subjects': all_subjects,
-        'coordinators_count': teachers.filter(subject_coordinator__isnull=False).distinct().count(),
-        'teachers_with_email': teachers.exclude(email='').count(),
-        'teachers_with_phone': teachers.exclude(phone='').count(),
+        'coordinators_count': counts['coordinators'],
+        'teachers_with_email': counts['with_email'],
+        'teachers_with_phone': counts['with_phone'],
     }
     
     return render(request, 'controlling/teachers_list.html', context)
 
 
+def teacher_form_choices():
+    """
+    Auswahllisten für Anlegen/Bearbeiten aus dem Referenzdaten-Cache
+    (mks.reference_data) - keine Abfragen pro Aufruf
+    """
+    return {
+        'academic_titles': reference_data.rows(AcademicTitle),
+        'genders': reference_data.rows(Gender),
+        'countries': reference_data.rows(Country),
+        'all_subjects': sorted(reference_data.rows(Subject), key=attrgetter('subject')),
+        # SubjectCategory ist bereits nach Name sortiert
+        'subject_categories': reference_data.rows(SubjectCategory),
+    }
+
+
 @login_required
 def teacher_create(request):
     """
@@ -168,13 +178,7 @@ def teacher_create(request):
                 messages.error(request, f'Fehler beim Erstellen: {str(e)}')
     
     # Get form choices
-    context = {
-        'academic_titles': AcademicTitle.objects.all(),
-        'genders': Gender.objects.all(),
-        'countries': Country.objects.all(),
-        'all_subjects': Subject.objects.all().order_by('subject'),
-        'subject_categories': SubjectCategory.objects.all().order_by('name'),
-    }
+    context = teacher_form_choices()
     
     return render(request, 'controlling/teacher_create.html', context)
 
@@ -271,7 +275,7 @@ def teacher_quick_edit(request, teacher_id):
     
     context = {
         'teacher': teacher,
-        'subject_categories': SubjectCategory.objects.all().order_by('name'),
+        'subject_categories': reference_data.rows(SubjectCategory),
     }
     
     return render(request, 'controlling/teacher_quick_edit.html', context)
@@ -360,11 +364,7 @@ def teacher_full_edit(request, teacher_id):
     # Get form data
     context = {
         'teacher': teacher,
-        'academic_titles': AcademicTitle.objects.all(),
-        'genders': Gender.objects.all(),
-        'countries': Country.objects.all(),
-        'all_subjects': Subject.objects.all().order_by('subject'),  # Fixed: order by 'subject'
-        'subject_categories': SubjectCategory.objects.all().order_by('name'),
+        **teacher_form_choices(),
     }
     
     return render(request, 'controlling/teacher_full_edit.html', context)
@@ -399,17 +399,16 @@ def teacher_api_search(request):
     if len(query) < 2:
         return JsonResponse({'teachers': []})
     
-    teachers = Teacher.objects.filter(
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query)
-    ).select_related('academic_title')[:10]
+    teachers = search_teachers(query=query).select_related(
+        'academic_title'
+    ).prefetch_related('subject').order_by('last_name', 'first_name')[:10]
     
     teacher_list = []
     for teacher in teachers:
+        title = f"{teacher.academic_title} " if teacher.academic_title else ""
         teacher_list.append({
             'id': teacher.id,
-            'name': f"{teacher.academic_title} {teacher.first_name} {teacher.last_name}".strip(),
+            'name': f"{title}{teacher.first_name} {teacher.last_name}",
             'email': teacher.email,
             'subjects': [subject.subject for subject in teacher.subject.all()[:3]]  # Fixed: subject.subject
         })
@@ -423,10 +422,11 @@ def teacher_stats_api(request):
     """
     API endpoint for teacher statistics
     """
-    total_teachers = Teacher.objects.count()
-    coordinators = Teacher.objects.filter(subject_coordinator__isnull=False).distinct().count()
-    with_email = Teacher.objects.exclude(email='').count()
-    with_phone = Teacher.objects.exclude(phone='').count()
+    counts = get_statistics()['teachers']
+    total_teachers = counts['total']
+    coordinators = counts['coordinators']
+    with_email = counts['with_email']
+    with_phone = counts['with_phone']
     
     # Subject distribution
     subject_stats = []
@@ -12,10 +12,13 @@ urlpatterns = [
     # Student URLs
         path('', views.controlling_dashboard, name='controlling_dashboard'),
     path('students', views.get_all_students, name='get_controlling_students'),
+    path('api/students', views.student_roster_api, name='student_roster_api'),
+    path('api/students/search', views.student_search_api, name='student_search_api'),
     path('coordinator/students', views.get_all_students_coordinator, name='get_controlling_students_coordinator'),
     path('single_student', views.get_student, name='get_controlling_single_student'),
     path('new_student', views.newStudentView, name='create_new_student'),
     path('student/<int:student_id>/pdf/', views.generate_student_pdf, name='generate_student_pdf'),
+    path('students/pdf/', views.generate_students_pdf_batch, name='generate_students_pdf_batch'),
     path('parent', views.get_parent, name='get_controlling_parent'),
     path('coordinator/single_student', views.get_student_coordinator, name='get_controlling_single_student_coordinator'),
     path('index_text', views.get_index_text, name='get_index_text'),
@@ -25,6 +28,7 @@ urlpatterns = [
     # Teacher Management URLs
     path('teachers', teacher_views.get_all_teachers, name='get_controlling_teachers'),
     path('teachers/new', teacher_views.teacher_create, name='teacher_create'),
+    path('teachers/export', xlsviews.export_teachers, name='export_teachers'),
     path('teacher/<int:teacher_id>', teacher_views.get_teacher_detail, name='teacher_detail'),
     path('teacher/<int:teacher_id>/edit', teacher_views.teacher_quick_edit, name='teacher_quick_edit'),
     path('teacher/<int:teacher_id>/full-edit', teacher_views.teacher_full_edit, name='teacher_full_edit'),
@@ -1,4 +1,6 @@
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 import datetime
@@ -10,6 +12,15 @@ from controlling.forms import SingleStudentDataFormCoordinator, ParentDataForm
 from teaching.models import Teacher
 from students.forms import SignInForm
 from teaching.models import SubjectCategory
+from mks import reference_data
+from controlling.statistics import get_statistics, category_statistics
+from controlling.roster import (
+    ROSTER_PAGE_SIZE, ROSTER_MAX_PAGE_SIZE, InvalidCursor,
+    parse_filters, roster_page, roster_queryset, roster_row, roster_summary,
+)
+from controlling.student_search import (
+    STUDENT_SEARCH_LIMIT, STUDENT_SEARCH_MAX_LIMIT, search_students,
+)
 
 from django.utils.datastructures import MultiValueDictKeyError
 
@@ -18,28 +29,18 @@ from django.utils.datastructures import MultiValueDictKeyError
 @staff_member_required  
 def controlling_dashboard(request):
     """Controlling Dashboard with statistics and navigation"""
-    from students.models import Student
-    from teaching.models import Teacher, Subject
-    from django.db.models import Count
-    
-    # Calculate statistics
-    total_students = Student.objects.count()
-    total_teachers = Teacher.objects.count()
-    total_subjects = Subject.objects.count()
+    # Calculate statistics (cached, see controlling.statistics)
+    statistics = get_statistics()
+    total_students = statistics['total_students']
+    total_teachers = statistics['teachers']['total']
+    total_subjects = statistics['total_subjects']
     
     # Recent students
     recent_students = Student.objects.all().order_by('-start_date')[:5]
     
     # Students by category
-    from teaching.models import SubjectCategory
-    categories = SubjectCategory.objects.all().exclude(hidden=True)
-    category_stats = []
-    for category in categories:
-        student_count = Student.objects.filter(subject__category=category).count()
-        category_stats.append({
-            'category': category,
-            'count': student_count
-        })
+    categories = [category for category in reference_data.rows(SubjectCategory) if not category.hidden]
+    category_stats = category_statistics(categories)
     
     context = {
         'total_students': total_students,
@@ -54,26 +55,69 @@ def controlling_dashboard(request):
 @login_required(login_url='/team/login/')
 @staff_member_required
 def get_all_students(request):
-    students = Student.objects.all().order_by('-start_date')
-    categories = SubjectCategory.objects.all().exclude(hidden=True)
+    categories = [category for category in reference_data.rows(SubjectCategory) if not category.hidden]
     try:
         student_id = request.GET['id']
         Student.objects.filter(id=student_id).delete()
     except MultiValueDictKeyError:
         pass
-    try:
-        category_id = request.GET['category']
-        students = Student.objects.filter(subject__category=category_id)
-    except MultiValueDictKeyError:
-        pass
+
+    # Erste Seite wird direkt gerendert, der Rest per Infinite Scroll
+    # über student_roster_api nachgeladen
+    filters = parse_filters(request.GET)
+    students, next_cursor = roster_page(roster_queryset(filters))
 
     # Model data
     context = {
         'students': students,
+        'next_cursor': next_cursor,
+        'summary': roster_summary(filters),
         'categories': categories,
         }
     return render(request, 'controlling/all_students.html', context)
 
+@login_required(login_url='/team/login/')
+@staff_member_required
+@require_GET
+def student_roster_api(request):
+    """
+    JSON-Seite der Schülerliste (Keyset-Pagination, siehe controlling.roster)
+    """
+    try:
+        page_size = min(int(request.GET.get('limit', ROSTER_PAGE_SIZE)), ROSTER_MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = ROSTER_PAGE_SIZE
+    try:
+        students, next_cursor = roster_page(
+            roster_queryset(parse_filters(request.GET)),
+            cursor=request.GET.get('cursor'),
+            page_size=max(page_size, 1),
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Ungültiger Cursor'}, status=400)
+    return JsonResponse({
+        'students': [roster_row(student) for student in students],
+        'next_cursor': next_cursor,
+    })
+
+@login_required(login_url='/team/login/')
+@staff_member_required
+@require_GET
+def student_search_api(request):
+    """
+    Type-ahead Suche über Schüler und Eltern (siehe controlling.student_search)
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(int(request.GET.get('limit', STUDENT_SEARCH_LIMIT)), STUDENT_SEARCH_MAX_LIMIT)
+    except ValueError:
+        limit = STUDENT_SEARCH_LIMIT
+    results = search_students(query, limit=max(limit, 1)) if len(query) >= 2 else []
+    return JsonResponse({
+        'query': query,
+        'results': [dict(roster_row(student), score=score) for student, score in results],
+    })
+
 @login_required(login_url='/team/login/')
 def get_all_students_coordinator(request):
     try:
@@ -127,19 +171,13 @@ def get_student(request):
 
 
 # PDF generation imports
-from django.http import HttpResponse
-from django.template.loader import get_template
-from django.template.defaultfilters import date as date_filter
-import io
-from django.conf import settings
-import os
-
-# Optional PDF import - graceful fallback if not available
-try:
-    from xhtml2pdf import pisa
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from django.http import HttpResponse, StreamingHttpResponse
+from controlling.pdf import PDF_AVAILABLE, PdfRenderError, server_timing_header
+from controlling.student_pdf import (
+    STUDENT_PDF_BATCH_MAX, merge_pdfs, render_student_pdf, render_student_pdfs,
+    student_pdf_filename,
+)
+from mks.exports import stream_zip
 
 
 @login_required(login_url='/team/login/')
@@ -152,78 +190,61 @@ def generate_student_pdf(request, student_id):
         return HttpResponse("PDF-Funktionalität nicht verfügbar. Bitte xhtml2pdf installieren.", status=500)
     
     try:
-        student = Student.objects.get(id=student_id)
-        parent = student.parent
+        student = Student.objects.select_related('parent', 'subject', 'teacher').get(id=student_id)
     except Student.DoesNotExist:
         return HttpResponse("Schüler nicht gefunden", status=404)
 
-    # Format dates for locale
-    formatted_birth_date = date_filter(student.birth_date, "d.m.Y") if student.birth_date else ""
-    formatted_start_date = date_filter(student.start_date, "d.m.Y") if student.start_date else ""
-
-    # Explicitly convert foreign key objects to strings
-    subject_str = str(student.subject) if student.subject else ""
-    teacher_str = str(student.teacher) if student.teacher else ""
+    timings = {}
+    try:
+        pdf = render_student_pdf(student, timings)
+    except PdfRenderError:
+        return HttpResponse('Fehler bei der PDF-Erstellung', status=500)
 
-    # Generate a safe filename
-    safe_name = f"{student.first_name}_{student.last_name}".replace(" ", "_").replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
-    filename = f"schuelerdaten_{safe_name}_{student_id}.pdf"
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{student_pdf_filename(student)}"'
+    response['Server-Timing'] = server_timing_header(timings)
+    return response
 
-    context = {
-        'student': student,
-        'parent': parent,
-        'birth_date': formatted_birth_date,
-        'start_date': formatted_start_date,
-        'subject_str': subject_str,
-        'teacher_str': teacher_str,
-        'BASE_DIR': settings.BASE_DIR,  # For static file paths
-    }
 
-    # Get template
-    template_path = 'controlling/single_student_pdf.html'
-    template = get_template(template_path)
-    html = template.render(context)
+@login_required(login_url='/team/login/')
+@staff_member_required
+@require_GET
+def generate_students_pdf_batch(request):
+    """
+    Datenblätter für alle Schüler der gewählten Filter (siehe
+    controlling.roster.ROSTER_FILTERS), als ZIP oder mit ?format=pdf als
+    ein zusammengefügtes PDF.
+    """
+    if not PDF_AVAILABLE:
+        return HttpResponse("PDF-Funktionalität nicht verfügbar. Bitte xhtml2pdf installieren.", status=500)
 
-    # Create PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    students = Student.objects.filter(**parse_filters(request.GET)).select_related(
+        'parent', 'subject', 'teacher',
+    ).order_by('last_name', 'first_name', 'id')
+    students = list(students[:STUDENT_PDF_BATCH_MAX + 1])
+    if not students:
+        return HttpResponse("Keine Schüler gefunden", status=404)
+    if len(students) > STUDENT_PDF_BATCH_MAX:
+        return HttpResponse(
+            f"Zu viele Schüler für einen Download (maximal {STUDENT_PDF_BATCH_MAX}). Bitte Filter verwenden.",
+            status=400)
 
-    # Create PDF with error handling
-    pisa_status = pisa.CreatePDF(
-        io.BytesIO(html.encode("UTF-8")), 
-        dest=response,
-        encoding='UTF-8',
-        link_callback=link_callback
-    )
-    
-    if pisa_status.err:
+    try:
+        pdfs = render_student_pdfs(students)
+    except PdfRenderError:
         return HttpResponse('Fehler bei der PDF-Erstellung', status=500)
-    
-    return response
 
+    filename = 'schuelerdaten_' + datetime.date.today().strftime('%Y-%m-%d')
+    if request.GET.get('format') == 'pdf':
+        response = HttpResponse(merge_pdfs(pdf for student, pdf in pdfs), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+        return response
 
-def link_callback(uri, rel):
-    """
-    Convert HTML URIs to absolute system paths so xhtml2pdf can access those resources
-    """
-    # Use Django static file system
-    sUrl = settings.STATIC_URL
-    sRoot = settings.STATIC_ROOT
-    mUrl = settings.MEDIA_URL
-    mRoot = settings.MEDIA_ROOT
-    
-    if uri.startswith(mUrl):
-        path = os.path.join(mRoot, uri.replace(mUrl, ""))
-    elif uri.startswith(sUrl):
-        path = os.path.join(sRoot, uri.replace(sUrl, ""))
-    else:
-        return uri
-    
-    # Make sure that file exists
-    if not os.path.isfile(path):
-        raise Exception(f'Media/static file not found: {path}')
-    
-    return path
+    response = StreamingHttpResponse(
+        stream_zip((student_pdf_filename(student), pdf) for student, pdf in pdfs),
+        content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+    return response
 
 
 @login_required(login_url='/team/login/')
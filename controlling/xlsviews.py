@@ -1,64 +1,70 @@
-import xlwt
 import datetime
 
-from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
-from django.contrib.admin.views.decorators import staff_member_required
+from mks.exports import Column, streaming_export_response
 from students.models import Student
+from teaching.models import Teacher
 from teaching.subject import SubjectCategory
 
-# Create your views here.
-@login_required(login_url='/team/login/')
-def export_students_xls(request):
-    now = datetime.datetime.now()
-    now = now.strftime('%Y-%m-%d')
-    file_name = 'Anmeldungen_' + now
-    try:
-        category_id = request.GET['id']
-        category = SubjectCategory.objects.get(id=category_id)
-        file_name = 'Anmeldungen_' + '_FG_' + category.name + '_' + now
-    except:
-        category = None
-    response = HttpResponse(content_type='application/ms-excel')
-    response['Content-Disposition'] = 'attachment; filename=' + file_name + '.xls'
-
-    wb = xlwt.Workbook(encoding='utf-8')
-    ws = wb.add_sheet('Students')
+STUDENT_EXPORT_COLUMNS = (
+    Column('Anmeldedatum', 'start_date'),
+    Column('Eltern Vorname', 'parent__first_name'),
+    Column('Eltern Nachname', 'parent__last_name'),
+    Column('Vorname', 'first_name'),
+    Column('Nachname', 'last_name'),
+    Column('Email', 'parent__email'),
+    Column('Geburtstag', 'birth_date'),
+    Column('Instrument', 'subject__subject'),
+    Column('Straße', 'parent__adress_line'),
+    Column('Hausnummer', 'parent__house_number'),
+    Column('PLZ', 'parent__postal_code'),
+    Column('Ort', 'parent__city'),
+    Column('Telefon', 'parent__phone'),
+    Column('Lehrkraft Vorname', 'teacher__first_name'),
+    Column('Lehrkraft Nachname', 'teacher__last_name'),
+    Column('Anmerkung', 'note'),
+)
 
-    # Sheet header, first row
-    row_num = 0
+TEACHER_EXPORT_COLUMNS = (
+    Column('Titel', 'academic_title__academic_title'),
+    Column('Vorname', 'first_name'),
+    Column('Nachname', 'last_name'),
+    Column('Email', 'email'),
+    Column('Telefon', 'phone'),
+    Column('Straße', 'adress_line'),
+    Column('Hausnummer', 'house_number'),
+    Column('PLZ', 'postal_code'),
+    Column('Ort', 'city'),
+    Column('Website', 'homepage'),
+)
 
-    font_style = xlwt.XFStyle()
-    font_style.font.bold = True
 
-    columns = ['Anmeldedatum', 'Eltern Vorname', 'Eltern Nachname', 
-               'Vorname', 'Nachname', 'Email', 'Geburtstag', 'Instrument', 
-               'Straße','Hausnummer', 'PLZ', 'Ort', 'Telefon',
-               'Lehrkraft Vorname', 'Lehrkraft Nachname', 'Anmerkung']
+def _export_format(request):
+    return request.GET.get('format', 'xlsx')
 
-    for col_num in range(len(columns)):
-        ws.write(row_num, col_num, columns[col_num], font_style)
 
-    # Sheet body, remaining rows
-    font_style = xlwt.XFStyle()
-    style1 = xlwt.easyxf(num_format_str='D-MMM-YY')
-    font_style.num_format_str = 'dd/mm/yyyy'
+# Create your views here.
+@login_required(login_url='/team/login/')
+def export_students_xls(request):
+    now = datetime.datetime.now().strftime('%Y-%m-%d')
+    file_name = 'Anmeldungen_' + now
+    students = Student.objects.order_by('start_date', 'id')
+    category = SubjectCategory.objects.filter(id=request.GET.get('id', '')).first() \
+        if request.GET.get('id', '').isdigit() else None
     if category:
-        students = Student.objects.filter(subject__category=category_id)
-    else:
-        students = Student.objects.all()
-    rows = students.values_list('start_date', 'parent__first_name', 'parent__last_name', 'first_name', 
-                                'last_name', 'parent__email', 'birth_date', 'subject__subject',
-                                'parent__adress_line', 'parent__house_number', 'parent__postal_code', 
-                                'parent__city', 'parent__phone', 'teacher__first_name', 'teacher__last_name',
-                                'note')
-    for row in rows:
-        row_num += 1
-        for col_num in range(len(row)):
-            if isinstance(row[col_num], datetime.datetime):
-                ws.write(row_num, col_num, row[col_num], style1)
-            else:
-                ws.write(row_num, col_num, row[col_num], font_style)
+        file_name = 'Anmeldungen_' + '_FG_' + category.name + '_' + now
+        students = students.filter(subject__category=category)
+    return streaming_export_response(
+        students, STUDENT_EXPORT_COLUMNS, file_name,
+        export_format=_export_format(request), sheet_name='Students',
+    )
+
 
-    wb.save(response)
-    return response
\ No newline at end of file
+@login_required(login_url='/team/login/')
+def export_teachers(request):
+    now = datetime.datetime.now().strftime('%Y-%m-%d')
+    teachers = Teacher.objects.order_by('last_name', 'first_name', 'id')
+    return streaming_export_response(
+        teachers, TEACHER_EXPORT_COLUMNS, 'Lehrkraefte_' + now,
+        export_format=_export_format(request), sheet_name='Lehrkräfte',
+    )
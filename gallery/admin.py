@@ -1,6 +1,5 @@
 from django.contrib import admin
 from .models import Photo, PhotoCategory
-from gallery.image_utils import process_uploaded_image
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,8 +7,8 @@ logger = logging.getLogger(__name__)
 # Register your models here.
 
 class PhotoAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'ordering', 'has_lazy_image', 'has_thumbnail']
-    list_filter = ['category']
+    list_display = ['title', 'category', 'ordering', 'has_lazy_image', 'has_thumbnail', 'has_variants', 'image_health']
+    list_filter = ['category', 'image_health']
     search_fields = ['title', 'description']
     
     def has_lazy_image(self, obj):
@@ -21,6 +20,11 @@ class PhotoAdmin(admin.ModelAdmin):
         return bool(obj.image_thumbnail)
     has_thumbnail.boolean = True
     has_thumbnail.short_description = 'Thumbnail'
+
+    def has_variants(self, obj):
+        return bool(obj.image_variants)
+    has_variants.boolean = True
+    has_variants.short_description = 'WebP/AVIF'
     
     def save_model(self, request, obj, form, change):
         # Automatische Bildverarbeitung bei neuen Uploads
@@ -28,20 +32,12 @@ class PhotoAdmin(admin.ModelAdmin):
             try:
                 logger.info(f"Verarbeite Upload für Photo: {obj.title}")
                 
-                # Verarbeite das hochgeladene Bild
-                processed = process_uploaded_image(obj.image)
-                
-                if processed['main']:
-                    obj.image = processed['main']
-                    logger.info("Hauptbild verarbeitet")
-                
-                if processed['thumbnail']:
-                    obj.image_thumbnail = processed['thumbnail']
-                    logger.info("Thumbnail erstellt")
-                
-                if processed['lazy']:
-                    obj.image_lazy = processed['lazy']
-                    logger.info("Lazy Image erstellt")
+                # Hauptbild, Thumbnail, Lazy Image und WebP/AVIF-Varianten -
+                # bei einer schon bekannten Datei die vorhandenen
+                if obj.assign_upload(obj.image):
+                    logger.info("Bekannte Datei, vorhandene Bilder wiederverwendet")
+                else:
+                    logger.info("Hauptbild und Varianten verarbeitet")
                     
             except Exception as e:
                 logger.error(f"Fehler bei Bildverarbeitung: {str(e)}")
@@ -4,11 +4,16 @@ from django.http import JsonResponse, HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.core.exceptions import ValidationError
-from django.db.models import Max
-import os
+from django.urls import reverse
 from django.conf import settings
-from .models import Photo, PhotoCategory
-from .image_utils import process_uploaded_image, get_image_info, check_image_size
+from .gallery_api import invalidate_gallery
+from .models import Photo, PhotoCategory, UploadBatch, UploadItem
+from .uploads import (
+    CHUNK_SIZE, ChunkError, batch_progress, create_upload_batch, schedule_batch, start_chunked_batch,
+    write_chunk,
+)
+from .ordering import apply_order, next_ordering
+from .image_utils import get_image_info, check_image_size
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,17 +40,8 @@ def gallery_admin_view(request):
     # Get photos for the selected category
     photos = []
     if category_id:
+        # Missing images are flagged by Photo.image_health (see backfill_photo_metadata)
         photos = Photo.objects.filter(category_id=category_id).order_by('-ordering')
-        
-        # Ensure image files exist (clean up database if images are missing)
-        for photo in list(photos):
-            image_path = os.path.join(settings.MEDIA_ROOT, photo.image.name)
-            if not os.path.exists(image_path):
-                # Option 1: Delete the database entry if image doesn't exist
-                # photo.delete()
-                
-                # Option 2: Mark that the image is missing
-                photo.missing_image = True
     
     context = {
         'categories': categories,
@@ -117,11 +113,8 @@ def handle_single_upload(request):
     
     # Process the uploaded image (resize and create variants)
     try:
-        processed_images = process_uploaded_image(uploaded_file)
-        
         # Determine ordering (put new photos at the top)
-        max_ordering = Photo.objects.filter(category=category).aggregate(Max('ordering'))['ordering__max']
-        ordering = (max_ordering + 1) if max_ordering else 1
+        ordering = next_ordering(Photo.objects.filter(category=category))
         
         # Create new photo with processed images
         photo = Photo(
@@ -132,14 +125,9 @@ def handle_single_upload(request):
             ordering=ordering
         )
         
-        # Assign the processed images
-        photo.image = processed_images['main']
-        
-        if processed_images['thumbnail']:
-            photo.image_thumbnail = processed_images['thumbnail']
-        
-        if processed_images['lazy']:
-            photo.image_lazy = processed_images['lazy']
+        # Resize and create variants (incl. WebP/AVIF) - or reuse them for a known file
+        if photo.assign_upload(uploaded_file):
+            logger.info(f"Known image {uploaded_file.name}, reusing stored files")
         
         # Save the photo
         photo.save()
@@ -177,7 +165,9 @@ def handle_single_upload(request):
 
 def handle_multiple_uploads(request):
     """
-    Handle multiple file uploads with automatic image processing
+    Handle multiple file uploads: the files are stored right away and
+    processed in the background; the response carries the batch id and
+    the URL of the progress endpoint.
     """
     # Get files from request
     files = request.FILES.getlist('images')
@@ -211,114 +201,111 @@ def handle_multiple_uploads(request):
     except PhotoCategory.DoesNotExist:
         return JsonResponse({'status': 'error', 'message': 'Invalid category'}, status=400)
     
-    # Process each file
-    uploaded_photos = []
-    errors = []
-    warnings = []
-    
-    # Get max ordering to start from
-    max_ordering = Photo.objects.filter(category=category).aggregate(Max('ordering'))['ordering__max'] or 0
-    
-    for i, uploaded_file in enumerate(files):
-        try:
-            # Check original file size
-            if uploaded_file.size > MAX_FILE_SIZE:
-                errors.append(
-                    f'{uploaded_file.name}: Originaldatei zu groß '
-                    f'(max. {MAX_FILE_SIZE//(1024*1024)}MB). '
-                    f'Datei ist {(uploaded_file.size / 1024 / 1024):.2f}MB.'
-                )
-                continue
-            
-            # Get image info
-            image_info = get_image_info(uploaded_file)
-            if image_info:
-                logger.info(f"Processing {uploaded_file.name}: {image_info['width']}x{image_info['height']}, "
-                           f"{image_info['size_mb']}MB")
-            
-            # Process the image
-            processed_images = process_uploaded_image(uploaded_file)
-            
-            # Extract filename as title (without extension)
-            filename = os.path.splitext(uploaded_file.name)[0]
-            title = filename[:50]  # Limit to model field length
-            
-            # Create photo with incremented ordering
-            ordering = max_ordering + i + 1
-            photo = Photo(
-                title=title,
-                description='',  # Can be updated later
-                copyright_by='',  # Can be updated later
-                category=category,
-                ordering=ordering
-            )
-            
-            # Assign processed images
-            photo.image = processed_images['main']
-            
-            if processed_images['thumbnail']:
-                photo.image_thumbnail = processed_images['thumbnail']
-            
-            if processed_images['lazy']:
-                photo.image_lazy = processed_images['lazy']
-            
-            # Save the photo
-            photo.save()
-            
-            # Check if the processed image is still quite large
-            final_size_mb = photo.image.size / (1024 * 1024) if photo.image else 0
-            original_size_mb = image_info['size_mb'] if image_info else uploaded_file.size / (1024 * 1024)
-            
-            compression_ratio = 100 - (final_size_mb / original_size_mb * 100) if original_size_mb > 0 else 0
-            
-            if compression_ratio > 50:  # If compressed by more than 50%
-                warnings.append(
-                    f'{uploaded_file.name}: Stark komprimiert von {original_size_mb:.1f}MB auf {final_size_mb:.1f}MB (-{compression_ratio:.0f}%)'
-                )
-            elif final_size_mb > 5:  # Warn if still over 5MB after processing
-                warnings.append(
-                    f'{uploaded_file.name}: Verarbeitetes Bild ist noch {final_size_mb:.1f}MB groß'
-                )
-            
-            uploaded_photos.append({
-                'id': photo.id,
-                'title': photo.title,
-                'image_url': photo.image.url,
-                'ordering': photo.ordering,
-                'original_size_mb': image_info['size_mb'] if image_info else 0,
-                'final_size_mb': final_size_mb
-            })
-            
-            logger.info(f"Successfully processed {uploaded_file.name} -> {final_size_mb:.2f}MB")
-            
-        except Exception as e:
-            logger.error(f"Error processing {uploaded_file.name}: {str(e)}")
-            errors.append(f'{uploaded_file.name}: {str(e)}')
-    
-    # Return response
-    if uploaded_photos:
-        message_parts = [f'{len(uploaded_photos)} Bilder erfolgreich hochgeladen und optimiert']
-        
-        if warnings:
-            message_parts.append(f'{len(warnings)} Warnungen')
-        
-        if errors:
-            message_parts.append(f'{len(errors)} Fehler')
-        
-        return JsonResponse({
-            'status': 'success',
-            'message': ' (' + ', '.join(message_parts[1:]) + ')' if len(message_parts) > 1 else message_parts[0],
-            'photos': uploaded_photos,
-            'errors': errors,
-            'warnings': warnings
-        })
-    else:
+    # Store the files and let the upload pool process them (gallery.uploads)
+    batch = create_upload_batch(files, category, request.user, MAX_FILE_SIZE)
+    schedule_batch(batch)
+    progress = batch_progress(batch)
+    logger.info(f"Upload batch {batch.pk}: {progress['total']} files, {progress['errors']} rejected")
+
+    if progress['errors'] == progress['total']:
         return JsonResponse({
             'status': 'error',
             'message': 'Keine Bilder konnten verarbeitet werden',
-            'errors': errors
+            'errors': [f"{item['filename']}: {item['message']}" for item in progress['items']],
         }, status=400)
 
+    return JsonResponse({
+        'status': 'accepted',
+        'message': f"{progress['total']} Bilder werden verarbeitet",
+        'progress_url': reverse('gallery_upload_progress', args=[batch.pk]),
+        **progress,
+    }, status=202)
+
+@login_required
+def upload_progress(request, batch_id):
+    """
+    Polling endpoint for a multi-file upload: status of every file.
+    """
+    batch = UploadBatch.objects.filter(pk=batch_id).first()
+    if batch is None:
+        return JsonResponse({'status': 'error', 'message': 'Upload nicht gefunden'}, status=404)
+    return JsonResponse(batch_progress(batch))
+
+@login_required
+def start_chunked_upload(request):
+    """
+    Start a resumable chunked upload. JSON body:
+    {"category_id": .., "files": [{"name": .., "size": ..}, ..]}.
+    Each file is then sent in blocks of ``chunk_size`` bytes to its
+    ``upload_url`` (see upload_chunk).
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        files = [(str(entry['name']), int(entry['size'])) for entry in data['files']]
+        category_id = data.get('category_id')
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid request'}, status=400)
+
+    if not files:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Keine Bilder empfangen. Bitte versuchen Sie es erneut.'
+        }, status=400)
+    if len(files) > MAX_FILES:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Zu viele Dateien. Maximal {MAX_FILES} Bilder pro Upload erlaubt.'
+        }, status=400)
+
+    try:
+        category = PhotoCategory.objects.get(id=category_id)
+    except (PhotoCategory.DoesNotExist, ValueError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid category'}, status=400)
+
+    batch = start_chunked_batch(files, category, request.user, MAX_FILE_SIZE)
+    progress = batch_progress(batch)
+    for item in progress['items']:
+        item['upload_url'] = reverse('gallery_upload_chunk', args=[item['id']])
+
+    return JsonResponse({
+        'status': 'accepted',
+        'chunk_size': CHUNK_SIZE,
+        'progress_url': reverse('gallery_upload_progress', args=[batch.pk]),
+        **progress,
+    }, status=201)
+
+@login_required
+def upload_chunk(request, item_id):
+    """
+    GET returns the offset to resume from. PUT writes one block at
+    ``?offset=``; the optional X-Chunk-Checksum header carries the SHA-256
+    (hex) of the block. A block that does not fit answers 409 with the
+    offset the client has to continue from.
+    """
+    item = UploadItem.objects.filter(pk=item_id).first()
+    if item is None:
+        return JsonResponse({'status': 'error', 'message': 'Upload nicht gefunden'}, status=404)
+
+    if request.method == 'GET':
+        return JsonResponse({'status': item.status, 'offset': item.received, 'size': item.original_size})
+    if request.method != 'PUT':
+        return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+
+    try:
+        offset = int(request.GET.get('offset', ''))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Offset fehlt'}, status=400)
+
+    try:
+        received = write_chunk(item, offset, request, request.headers.get('X-Chunk-Checksum'))
+    except ChunkError as e:
+        return JsonResponse({'status': 'error', 'message': str(e), 'offset': e.offset}, status=409)
+
+    return JsonResponse({'status': item.status, 'offset': received, 'size': item.original_size})
+
 @login_required
 def delete_photo(request, photo_id):
     """
@@ -388,17 +375,43 @@ def update_order(request):
     
     try:
         data = json.loads(request.body)
-        photo_order = data.get('photos', [])
+        photo_order = [int(photo_id) for photo_id in data.get('photos', [])]
+        
+        # Only moved photos get a new ordering (ordering is DESC, see gallery.ordering)
+        updated = apply_order(Photo.objects.all(), photo_order, descending=True)
+        if updated:
+            # update() sends no post_save signal
+            invalidate_gallery()
+        
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Photo order updated successfully',
+            'updated': updated
+        })
+        
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+@login_required
+def update_category_order(request):
+    """
+    Update the order of photo categories.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        category_order = [int(category_id) for category_id in data.get('categories', [])]
         
-        # Update each photo's ordering
-        for index, photo_id in enumerate(photo_order):
-            # Higher index = higher position in the list (ordering is DESC)
-            ordering = len(photo_order) - index
-            Photo.objects.filter(id=photo_id).update(ordering=ordering)
+        updated = apply_order(PhotoCategory.objects.all(), category_order)
+        if updated:
+            invalidate_gallery()
         
         return JsonResponse({
             'status': 'success',
-            'message': 'Photo order updated successfully'
+            'message': 'Category order updated successfully',
+            'updated': updated
         })
         
     except Exception as e:
@@ -419,11 +432,7 @@ def create_category(request):
         if not title:
             return JsonResponse({'status': 'error', 'message': 'Category title is required'}, status=400)
         
-        # Get the highest ordering value
-        max_ordering = PhotoCategory.objects.order_by('-ordering').first()
-        ordering = (max_ordering.ordering + 1) if max_ordering else 1
-        
-        category = PhotoCategory(title=title, ordering=ordering)
+        category = PhotoCategory(title=title, ordering=next_ordering(PhotoCategory.objects.all()))
         category.save()
         
         return JsonResponse({
@@ -0,0 +1,252 @@
+"""
+Galerie-API mit Cursor-Pagination
+
+Die Galerie zeigt Fotos nach ``ordering`` absteigend, bei gleicher
+Reihenfolge nach ``id`` absteigend; Fotos ohne ``ordering`` stehen am Ende.
+Eine Seite wird über den Cursor (ordering, id) des letzten Fotos der
+vorherigen Seite fortgesetzt - kein OFFSET und kein COUNT pro Seite. Ob es
+weitergeht, zeigt ein zusätzlich geladenes Foto.
+
+Das Manifest einer Kategorie (bzw. der ganzen Galerie) enthält die Foto-IDs
+in Anzeige-Reihenfolge und wird im Cache gehalten. Seiten und Manifeste
+tragen ein ETag aus dem Versions-Stempel der Galerie, der bei jeder
+Änderung an Fotos oder Kategorien neu gesetzt wird (gallery.signals).
+"""
+import base64
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from gallery.models import Photo, PhotoCategory
+
+GALLERY_PAGE_SIZE = 24
+GALLERY_MAX_PAGE_SIZE = 100
+# Kategorie, die nicht in der öffentlichen Galerie erscheint
+HIDDEN_CATEGORY = 'E-Learning'
+
+GALLERY_VERSION_KEY = 'gallery_version'
+MANIFEST_CACHE_KEY = 'gallery_manifest:%s:%s'
+MANIFEST_CACHE_TIMEOUT = 60 * 60 * 24
+
+DEFAULT_IMAGE_NAMES = {
+    'image_lazy': 'gallery_lazy_imageDefault.jpg',
+    'image_thumbnail': 'gallery_thumbnail_imageDefault.jpg',
+}
+
+# Felder für die Galerie-Kacheln und die Großansicht
+PHOTO_FIELDS = (
+    'id', 'title', 'description', 'copyright_by', 'ordering',
+    'image', 'image_lazy', 'image_thumbnail', 'image_width', 'image_height', 'image_variants',
+)
+# srcset-Kandidaten vom kleinsten zum größten, mit dem JPEG/PNG-Feld der Rolle
+SRCSET_ROLES = (('thumbnail', 'image_thumbnail'), ('lazy', 'image_lazy'), ('main', 'image'))
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+# Breite der Kacheln in gallery.html (Raster minmax(220px, 1fr))
+GALLERY_TILE_SIZES = '(max-width: 480px) 100vw, (max-width: 768px) 50vw, 300px'
+
+PHOTO_ORDERING = (F('ordering').desc(nulls_last=True), '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def gallery_photos(category_id=None):
+    """Sichtbare Fotos in Anzeige-Reihenfolge, ohne fehlende oder beschädigte Dateien"""
+    photos = Photo.objects.exclude(category__title=HIDDEN_CATEGORY).exclude(
+        image_health__in=Photo.BROKEN_IMAGE_STATES,
+    ).exclude(image='')
+    if category_id is not None:
+        photos = photos.filter(category_id=category_id)
+    return photos.order_by(*PHOTO_ORDERING)
+
+
+def encode_cursor(ordering, photo_id):
+    data = json.dumps([ordering, photo_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ordering, photo_id = json.loads(data)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor) from None
+    if not isinstance(photo_id, int) or not (ordering is None or isinstance(ordering, int)):
+        raise InvalidCursor(cursor)
+    return ordering, photo_id
+
+
+def after_cursor(photos, cursor):
+    """Fotos, die in Anzeige-Reihenfolge nach dem Cursor kommen"""
+    ordering, photo_id = decode_cursor(cursor)
+    if ordering is None:
+        return photos.filter(ordering__isnull=True, id__lt=photo_id)
+    return photos.filter(
+        Q(ordering__lt=ordering) | Q(ordering=ordering, id__lt=photo_id) | Q(ordering__isnull=True)
+    )
+
+
+def page_size(value, default=GALLERY_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, GALLERY_MAX_PAGE_SIZE))
+
+
+def paginate(photos, cursor=None, limit=GALLERY_PAGE_SIZE):
+    """
+    (Seite, nächster Cursor oder None). ``photos`` ist ein Queryset aus
+    gallery_photos(), gern mit .only() oder .values() eingeschränkt.
+    """
+    if cursor:
+        photos = after_cursor(photos, cursor)
+    page = list(photos[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    last = page[-1]
+    if isinstance(last, dict):
+        return page, encode_cursor(last['ordering'], last['id'])
+    return page, encode_cursor(last.ordering, last.id)
+
+
+def needs_generated_images(image, image_lazy, image_thumbnail):
+    """Fehlen Lazy-Bild oder Thumbnail (leer oder noch das Standardbild)?"""
+    return bool(image) and any(
+        not name or name == DEFAULT_IMAGE_NAMES[field]
+        for field, name in (('image_lazy', image_lazy), ('image_thumbnail', image_thumbnail))
+    )
+
+
+def orientation(width, height):
+    """Wie Photo.is_landscape/is_portrait/is_square - ohne Maße Querformat"""
+    if not width or not height or width > height:
+        return 'landscape'
+    return 'portrait' if height > width else 'square'
+
+
+def photo_details(photo):
+    """Daten für die Großansicht (showImg) aus einem Photo"""
+    details = {
+        'title': photo.title,
+        'description': photo.description,
+        'image': photo.image.url,
+    }
+    if photo.copyright_by:
+        details['copyright_by'] = photo.copyright_by
+    return details
+
+
+def build_srcsets(variants, names):
+    """
+    srcset je Format aus image_variants und den Dateinamen der JPEG/PNG-
+    Felder (``names``: Feldname -> Dateiname).
+
+    Returns:
+        (sources, fallback): [{'type': MIME, 'srcset': ..}, ..] in
+        bevorzugter Reihenfolge und der srcset für das <img> (oder '')
+    """
+    if not variants:
+        return [], ''
+    storage = Photo._meta.get_field('image').storage
+    fallback = []
+    candidates = {key: [] for key in MIME_TYPES}
+    for role, field in SRCSET_ROLES:
+        variant = variants.get(role)
+        if not variant:
+            continue
+        width = variant['width']
+        name = names.get(field)
+        if name and name != DEFAULT_IMAGE_NAMES.get(field):
+            fallback.append('%s %sw' % (storage.url(name), width))
+        for key in MIME_TYPES:
+            if variant.get(key):
+                candidates[key].append('%s %sw' % (storage.url(variant[key]), width))
+    sources = [
+        {'type': MIME_TYPES[key], 'srcset': ', '.join(candidates[key])}
+        for key in MIME_TYPES if candidates[key]
+    ]
+    return sources, ', '.join(fallback)
+
+
+def serialize_photo(row):
+    """Ein Eintrag der API aus einer values()-Zeile"""
+    storage = Photo._meta.get_field('image').storage
+    data = {
+        'id': row['id'],
+        'title': row['title'],
+        'description': row['description'],
+        'image': storage.url(row['image']),
+        'lazy': storage.url(row['image_lazy']) if row['image_lazy'] else None,
+        'width': row['image_width'],
+        'height': row['image_height'],
+        'orientation': orientation(row['image_width'], row['image_height']),
+    }
+    sources, srcset = build_srcsets(row['image_variants'], row)
+    if sources or srcset:
+        data['sources'] = sources
+        data['srcset'] = srcset
+    if row['copyright_by']:
+        data['copyright_by'] = row['copyright_by']
+    return data
+
+
+def get_photo_page(category_id=None, cursor=None, limit=GALLERY_PAGE_SIZE):
+    """{'photos': [...], 'next': Cursor oder None} - löst InvalidCursor aus"""
+    rows, next_cursor = paginate(
+        gallery_photos(category_id).values(*PHOTO_FIELDS), cursor, limit)
+    return {
+        'photos': [serialize_photo(row) for row in rows],
+        'next': next_cursor,
+        'pending_ids': [
+            row['id'] for row in rows
+            if needs_generated_images(row['image'], row['image_lazy'], row['image_thumbnail'])
+        ],
+    }
+
+
+def get_gallery_version():
+    version = cache.get(GALLERY_VERSION_KEY)
+    if version is None:
+        # Zufälliger Stempel, damit ein geleerter Cache nie eine alte Version trifft
+        version = uuid.uuid4().hex
+        if not cache.add(GALLERY_VERSION_KEY, version, None):
+            version = cache.get(GALLERY_VERSION_KEY, version)
+    return version
+
+
+def invalidate_gallery():
+    cache.set(GALLERY_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def build_manifest(category_id=None):
+    category = None
+    if category_id is not None:
+        category = PhotoCategory.objects.exclude(title=HIDDEN_CATEGORY).filter(
+            pk=category_id).values('id', 'title').first()
+        if category is None:
+            return None
+    ids = list(gallery_photos(category_id).values_list('id', flat=True))
+    return {'category': category, 'count': len(ids), 'ids': ids}
+
+
+def get_manifest(category_id=None, version=None):
+    """
+    Manifest der Kategorie (None = ganze Galerie) oder None für eine
+    unbekannte Kategorie. Der Cache-Schlüssel enthält die Version, alte
+    Manifeste laufen einfach aus.
+    """
+    version = get_gallery_version() if version is None else version
+    key = MANIFEST_CACHE_KEY % (version, 'all' if category_id is None else category_id)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = build_manifest(category_id)
+        if manifest is None:
+            return None
+        manifest['version'] = version
+        cache.set(key, manifest, MANIFEST_CACHE_TIMEOUT)
+    return manifest
@@ -5,7 +5,10 @@ to prevent memory limit crashes in the gallery app.
 """
 
 from PIL import Image, ImageOps
+import functools
+import hashlib
 import io
+import math
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
 import os
@@ -17,11 +20,207 @@ logger = logging.getLogger(__name__)
 MAX_IMAGE_SIZE = (2048, 2048)  # Maximum width/height in pixels
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes (original upload limit)
 JPEG_QUALITY = 85  # JPEG compression quality (1-100)
+MIN_JPEG_QUALITY = 50  # Lowest quality tried before the main image is shrunk further
+QUALITY_STEP = 5  # Step of the quality ladder searched by encode_to_size
+MAIN_MAX_BYTES = 2 * 1024 * 1024  # Target size of the main image (2MB)
+SHRINK_FACTOR = 0.8  # Scale applied when even MIN_JPEG_QUALITY is too large
+THUMBNAIL_QUALITY = 80
+LAZY_QUALITY = 75
+REDUCING_GAP = 3.0  # Pillow reducing_gap: fast integer reduce() before LANCZOS
+# JPEG draft decoding may end up this much below the requested size, so a
+# 4032x3024 phone photo is decoded at half scale (2016x1512) instead of in full
+DRAFT_TOLERANCE = 0.95
 THUMBNAIL_SIZE = (400, 400)  # Thumbnail dimensions
 LAZY_SIZE = (800, 600)  # Lazy loading image dimensions
 # Additional configuration for better compression
 WEBP_QUALITY = 80  # WebP compression quality for modern browsers
+AVIF_QUALITY = 60  # AVIF compression quality (only if the Pillow build can write AVIF)
+# Modern formats written next to each JPEG/PNG variant, preferred format first
+MODERN_FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': AVIF_QUALITY},
+    'webp': {'format': 'WEBP', 'quality': WEBP_QUALITY, 'method': 4},
+}
 PROGRESSIVE_JPEG = True  # Enable progressive JPEG encoding
+HASH_CHUNK_SIZE = 64 * 1024  # Read size when hashing image files
+EXIF_ORIENTATION_TAG = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)  # EXIF orientations that swap width and height
+
+def flatten_image(img):
+    """
+    Convert an image to RGB (or keep grayscale), putting transparent
+    pixels on a white background.
+    """
+    if img.mode in ('RGB', 'L'):
+        return img
+    if 'A' in img.getbands() or 'transparency' in img.info:
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
+        return background
+    return img.convert('RGB')
+
+
+def open_image(image_file, max_size=None):
+    """
+    Decode an image file once: upright (EXIF transpose) and in RGB/L mode.
+
+    With max_size, JPEGs are decoded at the smallest DCT scale (1/2, 1/4,
+    1/8) that still covers max_size (within DRAFT_TOLERANCE), so a 12
+    megapixel phone photo is never decoded at full resolution just to be
+    downscaled afterwards.
+
+    Args:
+        image_file: File-like object (UploadedFile, ContentFile, FieldFile)
+        max_size: Optional (width, height) the image will be fitted into
+
+    Returns:
+        Tuple of (PIL image, (width, height) of the upright original)
+    """
+    if hasattr(image_file, 'seek'):
+        image_file.seek(0)
+    img = Image.open(image_file)
+    width, height = img.size
+    rotated = img.getexif().get(EXIF_ORIENTATION_TAG) in ROTATED_ORIENTATIONS
+    if rotated:
+        width, height = height, width
+
+    if max_size is not None:
+        ratio = min(max_size[0] / width, max_size[1] / height)
+        if ratio < 1:
+            target = (math.ceil(width * ratio * DRAFT_TOLERANCE), math.ceil(height * ratio * DRAFT_TOLERANCE))
+            # draft works on the stored (not yet transposed) orientation
+            img.draft(None, target[::-1] if rotated else target)
+
+    ImageOps.exif_transpose(img, in_place=True)
+    img = flatten_image(img)
+    img.load()
+    return img, (width, height)
+
+
+def fit_image(img, max_size):
+    """
+    Downscale an image to fit within max_size, keeping the aspect ratio.
+    Images that already fit are returned unchanged (never upscaled).
+    """
+    width, height = img.size
+    ratio = min(max_size[0] / width, max_size[1] / height)
+    if ratio >= 1:
+        return img
+    size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+    # reducing_gap: integer-factor reduce() first, LANCZOS for the remainder
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def encode_jpeg(img, quality, progressive=False):
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, format='JPEG', quality=quality, optimize=True, progressive=progressive)
+    return output_buffer.getvalue()
+
+
+def encode_to_size(img, max_bytes=MAIN_MAX_BYTES, quality=JPEG_QUALITY, min_quality=MIN_JPEG_QUALITY):
+    """
+    Encode an image as JPEG at the highest quality that fits max_bytes.
+
+    The configured quality is tried first (most photos fit right away);
+    otherwise the quality ladder down to min_quality is binary searched,
+    which needs at most three more encodes. If even min_quality is too
+    large, the image is shrunk by SHRINK_FACTOR and searched again.
+
+    Returns:
+        Tuple of (JPEG bytes, quality, encoded image)
+    """
+    ladder = list(range(quality, min_quality - 1, -QUALITY_STEP))
+    if ladder[-1] != min_quality:
+        ladder.append(min_quality)
+    while True:
+        data = encode_jpeg(img, ladder[0], PROGRESSIVE_JPEG)
+        if len(data) <= max_bytes:
+            return data, ladder[0], img
+        best = None
+        low, high = 1, len(ladder) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            data = encode_jpeg(img, ladder[middle], PROGRESSIVE_JPEG)
+            if len(data) <= max_bytes:
+                best = (data, ladder[middle], img)
+                high = middle - 1
+            else:
+                low = middle + 1
+        if best is not None:
+            return best
+        width, height = img.size
+        if min(width, height) * SHRINK_FACTOR < 1:
+            return encode_jpeg(img, ladder[-1], PROGRESSIVE_JPEG), ladder[-1], img
+        img = img.resize(
+            (int(width * SHRINK_FACTOR), int(height * SHRINK_FACTOR)), Image.Resampling.LANCZOS)
+        logger.info(f"Further resized to {img.width}x{img.height} for size reduction")
+
+
+def _variant_name(image_file, suffix, extension='jpg'):
+    """File name of a variant, e.g. photo.jpg -> photo_lazy.webp (image_file may be a name)"""
+    original_name = image_file if isinstance(image_file, str) else getattr(image_file, 'name', None)
+    name_root, name_ext = os.path.splitext(original_name or 'image.jpg')
+    return f"{name_root}{suffix}.{extension}"
+
+
+@functools.lru_cache(maxsize=None)
+def supported_modern_formats():
+    """Keys of MODERN_FORMATS this Pillow build can write, preferred first"""
+    Image.init()
+    return tuple(key for key, options in MODERN_FORMATS.items() if options['format'] in Image.SAVE)
+
+
+def encode_modern(img, key):
+    options = dict(MODERN_FORMATS[key])
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, **options)
+    return output_buffer.getvalue()
+
+
+def create_modern_variants(images, name, formats=None):
+    """
+    Encode already decoded images in the modern formats.
+
+    Args:
+        images: Dictionary of role ('main', 'lazy', 'thumbnail') -> PIL image
+        name: Name of the main image, used as base for the file names
+        formats: Keys of MODERN_FORMATS (default: all supported ones)
+
+    Returns:
+        Dictionary of role -> {'width', 'height', 'files': {format key: ContentFile}}
+    """
+    formats = supported_modern_formats() if formats is None else formats
+    suffixes = {'main': '', 'lazy': '_lazy', 'thumbnail': '_thumb'}
+    variants = {}
+    for role, img in images.items():
+        variants[role] = {
+            'width': img.width,
+            'height': img.height,
+            'files': {
+                key: ContentFile(encode_modern(img, key), name=_variant_name(name, suffixes[role], key))
+                for key in formats
+            },
+        }
+    return variants
+
+
+def _encode_main(img, original_size, image_file, quality=JPEG_QUALITY):
+    """ContentFile of the main image (JPEG, or PNG for small PNG uploads)"""
+    original_name = getattr(image_file, 'name', None) or 'image.jpg'
+    original_width, original_height = original_size
+    # Smaller PNGs stay PNG, very large ones are converted to JPEG for better compression
+    if original_name.lower().endswith('.png') and original_width * original_height <= 2000 * 2000:
+        output_buffer = io.BytesIO()
+        img.save(output_buffer, format='PNG', optimize=True)
+        data, used_quality, new_name = output_buffer.getvalue(), None, original_name
+    else:
+        data, used_quality, img = encode_to_size(img, quality=quality)
+        name_root, name_ext = os.path.splitext(original_name)
+        new_name = original_name if name_ext.lower() in ['.jpg', '.jpeg'] else f"{name_root}.jpg"
+
+    logger.info(f"Image processed successfully: {new_name}, size: {len(data)} bytes, quality: {used_quality}")
+    return ContentFile(data, name=new_name)
+
 
 def resize_image(image_file, max_size=MAX_IMAGE_SIZE, quality=JPEG_QUALITY):
     """
@@ -36,95 +235,8 @@ def resize_image(image_file, max_size=MAX_IMAGE_SIZE, quality=JPEG_QUALITY):
         ContentFile object with resized image
     """
     try:
-        # Open the image
-        img = Image.open(image_file)
-        
-        # Auto-rotate based on EXIF data (fixes rotation issues from phones)
-        img = ImageOps.exif_transpose(img)
-        
-        # Convert to RGB if necessary (handles PNG with transparency, etc.)
-        if img.mode not in ('RGB', 'L'):
-            if img.mode == 'RGBA':
-                # Create a white background for transparent images
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
-                img = background
-            else:
-                img = img.convert('RGB')
-        
-        # Get original dimensions
-        original_width, original_height = img.size
-        max_width, max_height = max_size
-        
-        # Calculate new dimensions maintaining aspect ratio
-        ratio = min(max_width / original_width, max_height / original_height)
-        
-        # Only resize if the image is larger than max_size
-        if ratio < 1:
-            new_width = int(original_width * ratio)
-            new_height = int(original_height * ratio)
-            
-            # Use high-quality resampling
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            logger.info(f"Resized image from {original_width}x{original_height} to {new_width}x{new_height}")
-        
-        # Adaptive quality based on file size
-        # Start with the configured quality and reduce if needed
-        adaptive_quality = quality
-        
-        # Try different quality settings to get under 2MB
-        for attempt_quality in [quality, 80, 70, 60, 50]:
-            output_buffer = io.BytesIO()
-            
-            # Determine format and save
-            format_type = 'JPEG'
-            if hasattr(image_file, 'name') and image_file.name.lower().endswith('.png'):
-                # For very large PNGs, convert to JPEG for better compression
-                if original_width * original_height > 2000 * 2000:
-                    format_type = 'JPEG'
-                    img.save(output_buffer, format=format_type, quality=attempt_quality, optimize=True, progressive=PROGRESSIVE_JPEG)
-                else:
-                    # Keep PNG format for smaller images
-                    format_type = 'PNG'
-                    img.save(output_buffer, format=format_type, optimize=True)
-            else:
-                # Use JPEG for everything else (smaller file size)
-                # Enable progressive encoding for better loading experience
-                img.save(output_buffer, format=format_type, quality=attempt_quality, optimize=True, progressive=PROGRESSIVE_JPEG)
-            
-            output_buffer.seek(0)
-            file_size = len(output_buffer.getvalue())
-            
-            # If file is under 2MB, we're done
-            if file_size <= 2 * 1024 * 1024:
-                adaptive_quality = attempt_quality
-                break
-            
-            # If still too large after lowest quality, resize further
-            if attempt_quality == 50 and file_size > 2 * 1024 * 1024:
-                # Reduce dimensions by additional 20%
-                new_width = int(new_width * 0.8)
-                new_height = int(new_height * 0.8)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                logger.info(f"Further resized to {new_width}x{new_height} for size reduction")
-        
-        # Generate new filename
-        original_name = getattr(image_file, 'name', 'image.jpg')
-        name_root, name_ext = os.path.splitext(original_name)
-        if format_type == 'JPEG' and name_ext.lower() not in ['.jpg', '.jpeg']:
-            new_name = f"{name_root}.jpg"
-        else:
-            new_name = original_name
-        
-        # Create ContentFile
-        resized_file = ContentFile(
-            output_buffer.getvalue(),
-            name=new_name
-        )
-        
-        logger.info(f"Image processed successfully: {new_name}, size: {len(output_buffer.getvalue())} bytes, quality: {adaptive_quality}")
-        return resized_file
-        
+        img, original_size = open_image(image_file, max_size)
+        return _encode_main(fit_image(img, max_size), original_size, image_file, quality)
     except Exception as e:
         logger.error(f"Error resizing image: {str(e)}")
         # Return original file if resizing fails
@@ -142,40 +254,11 @@ def create_thumbnail(image_file, size=THUMBNAIL_SIZE):
         ContentFile object with thumbnail image
     """
     try:
-        # Reset file pointer if it's a file-like object
-        if hasattr(image_file, 'seek'):
-            image_file.seek(0)
-            
-        img = Image.open(image_file)
-        img = ImageOps.exif_transpose(img)
-        
-        # Convert to RGB if necessary
-        if img.mode not in ('RGB', 'L'):
-            if img.mode == 'RGBA':
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1])
-                img = background
-            else:
-                img = img.convert('RGB')
-        
-        # Create thumbnail maintaining aspect ratio
-        img.thumbnail(size, Image.Resampling.LANCZOS)
-        
-        # Save to buffer
-        output_buffer = io.BytesIO()
-        img.save(output_buffer, format='JPEG', quality=80, optimize=True)
-        output_buffer.seek(0)
-        
-        # Generate thumbnail filename
-        original_name = getattr(image_file, 'name', 'image.jpg')
-        name_root, name_ext = os.path.splitext(original_name)
-        thumbnail_name = f"{name_root}_thumb.jpg"
-        
+        img, original_size = open_image(image_file, size)
         return ContentFile(
-            output_buffer.getvalue(),
-            name=thumbnail_name
+            encode_jpeg(fit_image(img, size), THUMBNAIL_QUALITY),
+            name=_variant_name(image_file, '_thumb'),
         )
-        
     except Exception as e:
         logger.error(f"Error creating thumbnail: {str(e)}")
         return None
@@ -192,88 +275,65 @@ def create_lazy_image(image_file, size=LAZY_SIZE):
         ContentFile object with lazy loading image
     """
     try:
-        # Reset file pointer if it's a file-like object
-        if hasattr(image_file, 'seek'):
-            image_file.seek(0)
-            
-        img = Image.open(image_file)
-        img = ImageOps.exif_transpose(img)
-        
-        # Convert to RGB if necessary
-        if img.mode not in ('RGB', 'L'):
-            if img.mode == 'RGBA':
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1])
-                img = background
-            else:
-                img = img.convert('RGB')
-        
-        # Resize maintaining aspect ratio
-        original_width, original_height = img.size
-        max_width, max_height = size
-        
-        ratio = min(max_width / original_width, max_height / original_height)
-        
-        if ratio < 1:
-            new_width = int(original_width * ratio)
-            new_height = int(original_height * ratio)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Save to buffer
-        output_buffer = io.BytesIO()
-        img.save(output_buffer, format='JPEG', quality=75, optimize=True)
-        output_buffer.seek(0)
-        
-        # Generate lazy filename
-        original_name = getattr(image_file, 'name', 'image.jpg')
-        name_root, name_ext = os.path.splitext(original_name)
-        lazy_name = f"{name_root}_lazy.jpg"
-        
+        img, original_size = open_image(image_file, size)
         return ContentFile(
-            output_buffer.getvalue(),
-            name=lazy_name
+            encode_jpeg(fit_image(img, size), LAZY_QUALITY),
+            name=_variant_name(image_file, '_lazy'),
         )
-        
     except Exception as e:
         logger.error(f"Error creating lazy image: {str(e)}")
         return None
 
-def process_uploaded_image(uploaded_file):
+def scale_variants(img):
+    """Main image, lazy image and thumbnail, each scaled from the previous one"""
+    main = fit_image(img, MAX_IMAGE_SIZE)
+    lazy = fit_image(main, LAZY_SIZE)
+    return {'main': main, 'lazy': lazy, 'thumbnail': fit_image(lazy, THUMBNAIL_SIZE)}
+
+
+def create_modern_variants_from_file(image_file, formats=None):
+    """
+    Modern format variants for an already processed (stored) image: decode
+    once and encode main, lazy and thumbnail sizes (see create_modern_variants).
+    """
+    img, original_size = open_image(image_file, MAX_IMAGE_SIZE)
+    return create_modern_variants(scale_variants(img), getattr(image_file, 'name', None) or 'image.jpg', formats)
+
+
+def process_uploaded_image(uploaded_file, modern_formats=None):
     """
     Process an uploaded image by creating all necessary variants.
+
+    The upload is decoded once (at reduced scale for large JPEGs). The
+    lazy image is scaled from the in-memory main image and the thumbnail
+    from the lazy image, so nothing is re-decoded and the smaller variants
+    carry no JPEG artifacts of the main image. Each of the three is also
+    encoded in the modern formats (WebP, AVIF if supported).
     
     Args:
         uploaded_file: Django UploadedFile object
+        modern_formats: Keys of MODERN_FORMATS to encode (default: all supported, () for none)
     
     Returns:
         Dictionary with processed images:
         {
             'main': ContentFile,      # Resized main image
             'thumbnail': ContentFile, # Thumbnail
-            'lazy': ContentFile      # Lazy loading image
+            'lazy': ContentFile,     # Lazy loading image
+            'variants': dict         # See create_modern_variants
         }
     """
     try:
-        # First, resize the main image
-        main_image = resize_image(uploaded_file)
-        
-        # Create thumbnail and lazy versions from the main image
-        # Reset the main image file pointer
-        if hasattr(main_image, 'seek'):
-            main_image.seek(0)
-        
-        thumbnail = create_thumbnail(main_image)
-        
-        # Reset again for lazy image creation
-        if hasattr(main_image, 'seek'):
-            main_image.seek(0)
-        
-        lazy_image = create_lazy_image(main_image)
-        
+        img, original_size = open_image(uploaded_file, MAX_IMAGE_SIZE)
+        images = scale_variants(img)
+        main_image = _encode_main(images['main'], original_size, uploaded_file)
         return {
             'main': main_image,
-            'thumbnail': thumbnail,
-            'lazy': lazy_image
+            'thumbnail': ContentFile(encode_jpeg(images['thumbnail'], THUMBNAIL_QUALITY),
+                                     name=_variant_name(main_image, '_thumb')),
+            'lazy': ContentFile(encode_jpeg(images['lazy'], LAZY_QUALITY),
+                                name=_variant_name(main_image, '_lazy')),
+            'variants': create_modern_variants(images, main_image.name, modern_formats),
         }
         
     except Exception as e:
@@ -281,7 +341,8 @@ def process_uploaded_image(uploaded_file):
         return {
             'main': uploaded_file,
             'thumbnail': None,
-            'lazy': None
+            'lazy': None,
+            'variants': {},
         }
 
 def check_image_size(image_file, max_size_bytes=MAX_FILE_SIZE):
@@ -329,3 +390,43 @@ def get_image_info(image_file):
     except Exception as e:
         logger.error(f"Error getting image info: {str(e)}")
         return None
+
+
+def read_image_metadata(image_file):
+    """
+    Read dimensions, byte size and content hash of an image file.
+
+    Only the image header is parsed (no pixel decoding); the bytes are
+    hashed in chunks. The file pointer is reset afterwards so the file can
+    still be saved.
+
+    Args:
+        image_file: File-like object (UploadedFile, ContentFile or an open storage file)
+
+    Returns:
+        Dictionary with width, height, size and hash (sha256 hex digest)
+
+    Raises:
+        PIL.UnidentifiedImageError if the file is not a readable image
+    """
+    image_file.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: image_file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+
+    image_file.seek(0)
+    with Image.open(image_file) as img:
+        width, height = img.size
+        # Report the displayed orientation (as after exif_transpose)
+        if img.getexif().get(EXIF_ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+    image_file.seek(0)
+
+    return {
+        'width': width,
+        'height': height,
+        'size': size,
+        'hash': digest.hexdigest(),
+    }
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from gallery.gallery_api import invalidate_gallery
+from gallery.models import Photo
+
+METADATA_FIELDS = list(Photo.METADATA_FIELDS)
+
+
+class Command(BaseCommand):
+    help = 'Liest Breite, Höhe, Dateigröße, Hash und Zustand der Bilddateien und speichert sie am Photo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Alle Photos neu prüfen (Standard: nur noch nicht geprüfte)')
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Anzahl Photos pro Update-Statement')
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.order_by('id').only('id', 'image', *METADATA_FIELDS)
+        if not options['all']:
+            photos = photos.filter(image_health=Photo.IMAGE_UNKNOWN)
+
+        total = photos.count()
+        self.stdout.write(f'Gefunden: {total} Photos')
+
+        health = {state: 0 for state, label in Photo.IMAGE_HEALTH_CHOICES}
+        batch = []
+        for photo in photos.iterator(chunk_size=options['batch_size']):
+            photo.refresh_image_metadata()
+            health[photo.image_health] += 1
+            batch.append(photo)
+            if len(batch) >= options['batch_size']:
+                Photo.objects.bulk_update(batch, METADATA_FIELDS)
+                batch = []
+                self.stdout.write(f'Verarbeitet: {sum(health.values())}/{total}')
+        if batch:
+            Photo.objects.bulk_update(batch, METADATA_FIELDS)
+        if total:
+            # bulk_update sendet keine Signale - Galerie-Seiten und Manifeste verwerfen
+            invalidate_gallery()
+
+        summary = ', '.join(f'{count} {state}' for state, count in health.items() if count)
+        self.stdout.write(self.style.SUCCESS(f'Fertig! {summary or "keine Photos"}'))
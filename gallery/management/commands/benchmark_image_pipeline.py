@@ -0,0 +1,173 @@
+# gallery/management/commands/benchmark_image_pipeline.py
+"""
+Management command comparing the upload image pipeline against the
+previous implementation on a corpus of photos (e.g. a folder of phone
+pictures). Each pipeline runs in its own forked process so wall time and
+peak RSS are measured independently.
+"""
+
+import functools
+import io
+import multiprocessing
+import os
+import resource
+import time
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageOps
+
+from gallery.image_utils import (
+    JPEG_QUALITY, LAZY_SIZE, MAX_IMAGE_SIZE, PROGRESSIVE_JPEG, THUMBNAIL_SIZE,
+    process_uploaded_image,
+)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def _legacy_open(image_file):
+    if hasattr(image_file, 'seek'):
+        image_file.seek(0)
+    img = ImageOps.exif_transpose(Image.open(image_file))
+    if img.mode not in ('RGB', 'L'):
+        if img.mode == 'RGBA':
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        else:
+            img = img.convert('RGB')
+    return img
+
+
+def _legacy_resize(image_file):
+    img = _legacy_open(image_file)
+    original_width, original_height = img.size
+    ratio = min(MAX_IMAGE_SIZE[0] / original_width, MAX_IMAGE_SIZE[1] / original_height)
+    new_width, new_height = original_width, original_height
+    if ratio < 1:
+        new_width, new_height = int(original_width * ratio), int(original_height * ratio)
+        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    png = image_file.name.lower().endswith('.png') and original_width * original_height <= 2000 * 2000
+    for attempt_quality in [JPEG_QUALITY, 80, 70, 60, 50]:
+        output_buffer = io.BytesIO()
+        if png:
+            img.save(output_buffer, format='PNG', optimize=True)
+        else:
+            img.save(output_buffer, format='JPEG', quality=attempt_quality, optimize=True,
+                     progressive=PROGRESSIVE_JPEG)
+        if len(output_buffer.getvalue()) <= 2 * 1024 * 1024:
+            break
+        if attempt_quality == 50:
+            new_width, new_height = int(new_width * 0.8), int(new_height * 0.8)
+            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return ContentFile(output_buffer.getvalue(), name=image_file.name)
+
+
+def _legacy_variant(image_file, size, quality):
+    img = _legacy_open(image_file)
+    if size == THUMBNAIL_SIZE:
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+    else:
+        ratio = min(size[0] / img.width, size[1] / img.height)
+        if ratio < 1:
+            img = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.Resampling.LANCZOS)
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, format='JPEG', quality=quality, optimize=True)
+    return ContentFile(output_buffer.getvalue(), name=image_file.name)
+
+
+def legacy_process_uploaded_image(uploaded_file):
+    """
+    The pipeline before the single-decode rewrite: decode and resize, then
+    decode the re-encoded main image again for thumbnail and lazy image.
+    """
+    main_image = _legacy_resize(uploaded_file)
+    return {
+        'main': main_image,
+        'thumbnail': _legacy_variant(main_image, THUMBNAIL_SIZE, 80),
+        'lazy': _legacy_variant(main_image, LAZY_SIZE, 75),
+    }
+
+
+PIPELINES = {
+    'legacy': legacy_process_uploaded_image,
+    # Same output as legacy (JPEG/PNG only)
+    'current': functools.partial(process_uploaded_image, modern_formats=()),
+    # Including the WebP/AVIF variants written on upload
+    'modern': process_uploaded_image,
+}
+
+
+def _max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_pipeline(name, corpus, repeat, results):
+    pipeline = PIPELINES[name]
+    baseline = _max_rss_kb()
+    output_bytes = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for filename, data in corpus:
+            processed = pipeline(SimpleUploadedFile(filename, data))
+            output_bytes += sum(processed[key].size for key in ('main', 'lazy', 'thumbnail') if processed[key])
+            for variant in processed.get('variants', {}).values():
+                output_bytes += sum(content.size for content in variant['files'].values())
+    results.put({
+        'name': name,
+        'seconds': time.perf_counter() - start,
+        'baseline_kb': baseline,
+        'peak_kb': _max_rss_kb(),
+        'output_bytes': output_bytes,
+    })
+
+
+class Command(BaseCommand):
+    help = 'Compare wall time and peak RSS of the upload image pipeline with the previous implementation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('corpus', help='Directory with JPEG/PNG photos (searched recursively)')
+        parser.add_argument(
+            '--repeat', type=int, default=1,
+            help='Process the corpus this many times per pipeline')
+        parser.add_argument(
+            '--pipeline', choices=sorted(PIPELINES), action='append',
+            help='Pipeline to run (default: all)')
+
+    def load_corpus(self, directory):
+        if not os.path.isdir(directory):
+            raise CommandError(f'Corpus directory not found: {directory}')
+        corpus = []
+        for root, dirs, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    with open(os.path.join(root, filename), 'rb') as image_file:
+                        corpus.append((filename, image_file.read()))
+        if not corpus:
+            raise CommandError(f'No JPEG/PNG files in {directory}')
+        return corpus
+
+    def handle(self, *args, **options):
+        corpus = self.load_corpus(options['corpus'])
+        repeat = max(1, options['repeat'])
+        images = len(corpus) * repeat
+        self.stdout.write(
+            f'{len(corpus)} files, {sum(len(data) for _, data in corpus) / 1024 / 1024:.1f} MB, '
+            f'{repeat} run(s)')
+
+        # fork: the corpus is shared with the children instead of being pickled
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        for name in options['pipeline'] or list(PIPELINES):
+            process = context.Process(target=_run_pipeline, args=(name, corpus, repeat, results))
+            process.start()
+            result = results.get()
+            process.join()
+            self.stdout.write(
+                f"{result['name']:<8} {result['seconds']:8.2f} s  "
+                f"{result['seconds'] * 1000 / images:8.1f} ms/image  "
+                f"peak RSS {result['peak_kb'] / 1024:7.1f} MB "
+                f"(+{(result['peak_kb'] - result['baseline_kb']) / 1024:.1f} MB)  "
+                f"output {result['output_bytes'] / 1024 / 1024:.1f} MB"
+            )
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from gallery.gallery_api import invalidate_gallery
+from gallery.image_utils import create_modern_variants_from_file, supported_modern_formats
+from gallery.models import Photo
+
+
+def build_photo_variants(job):
+    """
+    Im Worker-Prozess: WebP/AVIF-Varianten eines Photos aus dem gespeicherten
+    Hauptbild erzeugen und die Dateien schreiben. Ohne Datenbankzugriff -
+    die Referenzen im StoredFile-Index zählt der Hauptprozess.
+
+    Returns:
+        (photo_id, image_variants oder None, [(Name, SHA-256, Größe)], Fehlermeldung oder None)
+    """
+    photo_id, image_name, formats = job
+    photo = Photo(id=photo_id)
+    storage = photo._meta.get_field('image').storage
+    try:
+        with storage.open(image_name, 'rb') as image_file:
+            variants = create_modern_variants_from_file(image_file, formats)
+        stored = photo.store_image_variants(variants, index=False)
+    except Exception as e:
+        return photo_id, None, [], str(e)
+    return photo_id, photo.image_variants, stored, None
+
+
+class Command(BaseCommand):
+    help = 'Erzeugt WebP/AVIF-Varianten für bestehende Gallery Photos (parallel)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Varianten für alle Photos neu erzeugen (Standard: nur fehlende)')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Anzahl Prozesse (Standard: Anzahl CPUs, 1 = ohne Prozess-Pool)')
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Anzahl Photos pro Update-Statement')
+
+    def handle(self, *args, **options):
+        formats = supported_modern_formats()
+        photos = Photo.objects.exclude(image='').exclude(
+            image_health__in=Photo.BROKEN_IMAGE_STATES).order_by('id')
+        if not options['all']:
+            photos = photos.filter(image_variants={})
+        rows = list(photos.values_list('id', 'image', 'image_variants'))
+        jobs = [(photo_id, name, formats) for photo_id, name, _ in rows]
+        # Bisherige Varianten werden nach dem Update freigegeben
+        old_variants = {photo_id: variants for photo_id, _, variants in rows}
+
+        total = len(jobs)
+        self.stdout.write(f'Gefunden: {total} Photos, Formate: {", ".join(formats) or "keine"}')
+        if not total or not formats:
+            return
+
+        workers = max(1, options['workers'])
+        if workers == 1:
+            results = map(build_photo_variants, jobs)
+        else:
+            # Die Worker schreiben nur Dateien; offene Verbindungen trotzdem
+            # nicht an sie vererben (außer in einer laufenden Transaktion, z.B. in Tests)
+            if not connection.in_atomic_block:
+                connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+            results = executor.map(build_photo_variants, jobs, chunksize=4)
+
+        storage = Photo._meta.get_field('image').storage
+        batch, done, errors = [], 0, 0
+        try:
+            for photo_id, variants, stored, error in results:
+                done += 1
+                if not error:
+                    error = self.register_files(storage, stored)
+                if error:
+                    errors += 1
+                    self.stdout.write(self.style.ERROR(f'Photo {photo_id}: {error}'))
+                    continue
+                batch.append(Photo(id=photo_id, image_variants=variants))
+                if len(batch) >= options['batch_size']:
+                    self.update_variants(batch, old_variants)
+                    batch = []
+                    self.stdout.write(f'Verarbeitet: {done}/{total}')
+            if batch:
+                self.update_variants(batch, old_variants)
+        finally:
+            if workers > 1:
+                executor.shutdown()
+            # bulk_update sendet keine Signale - Galerie-Seiten und Manifeste verwerfen
+            invalidate_gallery()
+
+        self.stdout.write(self.style.SUCCESS(f'Fertig! {done - errors} Photos, {errors} Fehler'))
+
+    def update_variants(self, batch, old_variants):
+        Photo.objects.bulk_update(batch, ['image_variants'])
+        storage = Photo._meta.get_field('image').storage
+        for photo in batch:
+            for name in Photo(image_variants=old_variants[photo.id]).variant_file_names():
+                storage.release(name)
+
+    def register_files(self, storage, stored):
+        """Von einem Worker geschriebene Dateien im Index zählen; Fehlermeldung oder None"""
+        registered = []
+        try:
+            for entry in stored:
+                registered.append(storage.register(*entry))
+        except FileNotFoundError as e:
+            for name in registered:
+                storage.release(name)
+            return 'Datei fehlt: %s' % e
+        return None
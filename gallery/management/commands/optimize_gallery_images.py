@@ -90,13 +90,11 @@ class Command(BaseCommand):
                     
                     # Update only if we got valid results
                     if processed_images['main']:
-                        photo.image = processed_images['main']
-                    
-                    if processed_images['thumbnail'] and (force or not photo.image_thumbnail):
-                        photo.image_thumbnail = processed_images['thumbnail']
-                    
-                    if processed_images['lazy'] and (force or not photo.image_lazy):
-                        photo.image_lazy = processed_images['lazy']
+                        photo.assign_processed_images(
+                            processed_images,
+                            thumbnail=force or not photo.image_thumbnail,
+                            lazy=force or not photo.image_lazy,
+                        )
                     
                     photo.save()
                     
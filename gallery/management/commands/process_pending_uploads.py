@@ -0,0 +1,45 @@
+import shutil
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gallery.models import UploadBatch, UploadItem
+from gallery.uploads import process_upload_item, spool_directory
+
+
+class Command(BaseCommand):
+    help = 'Verarbeitet liegengebliebene Dateien aus Mehrfach-Uploads und löscht alte Upload-Batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-minutes', type=int, default=30,
+            help='Dateien, die so lange "in Arbeit" sind, erneut verarbeiten')
+        parser.add_argument(
+            '--keep-days', type=int, default=7,
+            help='Batches nach so vielen Tagen löschen (auch abgebrochene Chunked Uploads)')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Worker, die beim Neustart des Web-Servers abgebrochen wurden
+        stale = UploadItem.objects.filter(
+            status=UploadItem.PROCESSING,
+            updated_at__lt=now - timedelta(minutes=options['stale_minutes']),
+        ).update(status=UploadItem.PENDING)
+
+        item_ids = list(UploadItem.objects.filter(status=UploadItem.PENDING).values_list('id', flat=True))
+        self.stdout.write(f'Gefunden: {len(item_ids)} wartende Dateien ({stale} abgebrochen)')
+        for index, item_id in enumerate(item_ids, 1):
+            process_upload_item(item_id)
+            self.stdout.write(f'Verarbeitet: {index}/{len(item_ids)}')
+
+        old_batches = UploadBatch.objects.filter(
+            created_at__lt=now - timedelta(days=options['keep_days']),
+        ).exclude(items__status__in=[UploadItem.PENDING, UploadItem.PROCESSING])
+        deleted = 0
+        for batch in old_batches:
+            shutil.rmtree(spool_directory(batch), ignore_errors=True)
+            batch.delete()
+            deleted += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Fertig! {deleted} alte Upload-Batches gelöscht'))
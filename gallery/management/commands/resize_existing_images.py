@@ -93,13 +93,7 @@ class Command(BaseCommand):
 
                         # Update the photo with processed images
                         if processed_images['main']:
-                            photo.image = processed_images['main']
-
-                        if processed_images['thumbnail']:
-                            photo.image_thumbnail = processed_images['thumbnail']
-
-                        if processed_images['lazy']:
-                            photo.image_lazy = processed_images['lazy']
+                            photo.assign_processed_images(processed_images)
 
                         photo.save()
 
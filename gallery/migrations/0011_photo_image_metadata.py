@@ -0,0 +1,38 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0010_auto_20220209_1202'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='image_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='image_health',
+            field=models.CharField(choices=[('unknown', 'Nicht geprüft'), ('ok', 'OK'), ('missing', 'Datei fehlt'), ('corrupt', 'Datei beschädigt')], default='unknown', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='image_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0011_photo_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
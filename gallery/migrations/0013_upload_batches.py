@@ -0,0 +1,51 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gallery', '0012_photo_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='gallery.photocategory')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload Batch',
+                'verbose_name_plural': 'Upload Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('spool_path', models.CharField(blank=True, max_length=500)),
+                ('original_size', models.PositiveIntegerField(default=0)),
+                ('ordering', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Wartet'), ('processing', 'In Arbeit'), ('done', 'Fertig'), ('error', 'Fehler')], default='pending', max_length=10)),
+                ('message', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='gallery.uploadbatch')),
+                ('photo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='gallery.photo')),
+            ],
+            options={
+                'verbose_name': 'Upload Item',
+                'verbose_name_plural': 'Upload Items',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0013_upload_batches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploaditem',
+            name='received',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='uploaditem',
+            name='status',
+            field=models.CharField(choices=[('uploading', 'Wird hochgeladen'), ('pending', 'Wartet'), ('processing', 'In Arbeit'), ('done', 'Fertig'), ('error', 'Fehler')], default='pending', max_length=10),
+        ),
+    ]
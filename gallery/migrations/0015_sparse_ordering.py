@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import F
+
+# gallery.ordering.ORDERING_GAP zum Zeitpunkt der Migration
+ORDERING_GAP = 1024
+# Größere Werte würden integer überlaufen und bleiben, wie sie sind
+LIMIT = (2 ** 31 - 1) // ORDERING_GAP
+
+
+def spread_ordering(apps, schema_editor):
+    """Vorhandene Werte auseinanderziehen, damit Verschieben nur eine Zeile ändert"""
+    for model_name in ('PhotoCategory', 'Photo'):
+        model = apps.get_model('gallery', model_name)
+        model.objects.filter(ordering__gte=-LIMIT, ordering__lte=LIMIT).update(ordering=F('ordering') * ORDERING_GAP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0014_uploaditem_received'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_ordering, migrations.RunPython.noop),
+    ]
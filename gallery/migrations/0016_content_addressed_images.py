@@ -0,0 +1,34 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:10
+
+from django.db import migrations, models
+import mks.media_storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0015_sparse_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='source_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='image',
+            field=models.ImageField(blank=True, default='gallery_imageDefault.jpg', storage=mks.media_storage.get_media_storage, upload_to='gallery/images/'),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='image_lazy',
+            field=models.ImageField(blank=True, default='gallery_lazy_imageDefault.jpg', storage=mks.media_storage.get_media_storage, upload_to='gallery/images/lazy/'),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, default='gallery_thumbnail_imageDefault.jpg', storage=mks.media_storage.get_media_storage, upload_to='gallery/images/thumbnail'),
+        ),
+    ]
@@ -1,7 +1,15 @@
+import os
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext as _
+from PIL import UnidentifiedImageError
 from sorl.thumbnail import ImageField
 
+from gallery.image_utils import process_uploaded_image, read_image_metadata
+from mks.media_storage import file_sha256, get_media_storage
+
 class PhotoCategory(models.Model):
     title = models.CharField(_(u'Project Name'), max_length=50)
     ordering = models.IntegerField(null=True, blank=True)
@@ -18,15 +26,32 @@ class PhotoCategory(models.Model):
         verbose_name_plural = u'Photo Categories'
 
 class Photo(models.Model):
+    # Zustand der Bilddatei, beim Upload bzw. per backfill_photo_metadata gesetzt
+    IMAGE_UNKNOWN = 'unknown'
+    IMAGE_OK = 'ok'
+    IMAGE_MISSING = 'missing'
+    IMAGE_CORRUPT = 'corrupt'
+    IMAGE_HEALTH_CHOICES = (
+        (IMAGE_UNKNOWN, 'Nicht geprüft'),
+        (IMAGE_OK, 'OK'),
+        (IMAGE_MISSING, 'Datei fehlt'),
+        (IMAGE_CORRUPT, 'Datei beschädigt'),
+    )
+    BROKEN_IMAGE_STATES = (IMAGE_MISSING, IMAGE_CORRUPT)
+    # WebP/AVIF-Varianten von Hauptbild, Lazy Image und Thumbnail
+    VARIANT_UPLOAD_TO = 'gallery/images/variants/'
+    IMAGE_FIELDS = ('image', 'image_lazy', 'image_thumbnail')
+    METADATA_FIELDS = ('image_width', 'image_height', 'image_size', 'image_hash', 'image_health')
+
     title = models.CharField(_(u'Title of the Photo'), max_length=50)
     image = models.ImageField(
-        upload_to='gallery/images/',
+        upload_to='gallery/images/', storage=get_media_storage,
         default='gallery_imageDefault.jpg', blank=True)
     image_thumbnail = models.ImageField(
-        upload_to='gallery/images/thumbnail',
+        upload_to='gallery/images/thumbnail', storage=get_media_storage,
         default='gallery_thumbnail_imageDefault.jpg', blank=True)
     image_lazy = models.ImageField(
-        upload_to='gallery/images/lazy/',
+        upload_to='gallery/images/lazy/', storage=get_media_storage,
         default='gallery_lazy_imageDefault.jpg', blank=True)
     description = models.TextField(null=True, blank=True, max_length=120)
     copyright_by = models.CharField(_(u'Copyright Owner of Photo'), max_length=100, null=True, blank=True)
@@ -34,10 +59,158 @@ class Photo(models.Model):
     category = models.ForeignKey(
         PhotoCategory,
         on_delete=models.CASCADE, blank=True, null=True)
+    # Metadaten des Hauptbilds, damit die Galerie keine Dateien öffnen muss
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_hash = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    image_health = models.CharField(
+        max_length=10, choices=IMAGE_HEALTH_CHOICES, default=IMAGE_UNKNOWN, editable=False)
+    # {'main'|'lazy'|'thumbnail': {'width': .., 'height': .., 'webp': Dateiname, 'avif': Dateiname}}
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # SHA-256 der hochgeladenen Originaldatei - gleiche Uploads verwenden die fertigen Bilder wieder
+    source_hash = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
 
     def __str__(self):
         return '%s: %s' % (self.category, self.title)
 
+    def save(self, *args, **kwargs):
+        # Neu zugewiesene Datei (Upload) - Metadaten vor dem Speichern lesen
+        if self.image and not self.image._committed:
+            self.set_image_metadata(self.image.file)
+            # Varianten eines vorherigen Bilds gelten nicht mehr
+            self.image_variants = {}
+            pending_variants = getattr(self, '_pending_variants', None)
+            if pending_variants:
+                self.store_image_variants(pending_variants)
+        self._pending_variants = None
+        reused_files, self._reused_files = getattr(self, '_reused_files', None), None
+        super().save(*args, **kwargs)
+        if reused_files:
+            storage = self._meta.get_field('image').storage
+            for name in reused_files:
+                storage.add_reference(name)
+
+    def assign_upload(self, uploaded_file):
+        """
+        Hochgeladene Datei übernehmen. Gibt es schon ein Photo aus derselben
+        Originaldatei, werden dessen Bilder und Varianten wiederverwendet,
+        sonst wird wie bisher verarbeitet (process_uploaded_image).
+
+        Returns:
+            True, wenn vorhandene Bilder wiederverwendet wurden
+        """
+        source_hash = file_sha256(uploaded_file)
+        known = Photo.objects.filter(source_hash=source_hash).exclude(
+            image_health__in=self.BROKEN_IMAGE_STATES).exclude(image='').exclude(pk=self.pk).first()
+        self.source_hash = source_hash
+        if known is not None and known.image.storage.exists(known.image.name):
+            self.reuse_images(known)
+            return True
+        self.assign_processed_images(process_uploaded_image(uploaded_file))
+        return False
+
+    def reuse_images(self, other):
+        """Dateien und Metadaten eines anderen Photos verwenden (beim save() mitgezählt)"""
+        for field in self.IMAGE_FIELDS + self.METADATA_FIELDS:
+            setattr(self, field, getattr(other, field))
+        self.image_variants = dict(other.image_variants)
+        self._pending_variants = None
+        self._reused_files = self.stored_file_names()
+
+    def variant_file_names(self):
+        return [
+            name for variant in self.image_variants.values()
+            for key, name in variant.items() if key not in ('width', 'height')
+        ]
+
+    def stored_file_names(self):
+        """Namen aller Dateien des Photos im Storage, inkl. WebP/AVIF-Varianten"""
+        names = [getattr(self, field).name for field in self.IMAGE_FIELDS if getattr(self, field)]
+        return names + self.variant_file_names()
+
+    def assign_processed_images(self, processed, thumbnail=True, lazy=True):
+        """
+        Ergebnis von process_uploaded_image übernehmen (Thumbnail und Lazy
+        Image optional). Die WebP/AVIF-Dateien werden beim nächsten save()
+        geschrieben.
+        """
+        self.image = processed['main']
+        if thumbnail and processed['thumbnail']:
+            self.image_thumbnail = processed['thumbnail']
+        if lazy and processed['lazy']:
+            self.image_lazy = processed['lazy']
+        self._pending_variants = processed.get('variants')
+
+    def store_image_variants(self, variants, index=True):
+        """
+        Varianten (siehe image_utils.create_modern_variants) speichern und vermerken.
+
+        Mit ``index=False`` werden die Dateien nur geschrieben, ohne
+        Datenbankzugriff (Worker-Prozesse). Zurück kommen dann die
+        (Name, SHA-256, Größe), die der Aufrufer mit storage.register() zählt.
+        """
+        storage = self._meta.get_field('image').storage
+        record, stored = {}, []
+        for role, variant in variants.items():
+            entry = {'width': variant['width'], 'height': variant['height']}
+            for key, content in variant['files'].items():
+                name = self.VARIANT_UPLOAD_TO + os.path.basename(content.name)
+                if index:
+                    entry[key] = storage.save(name, content)
+                else:
+                    stored.append(storage.write_content(name, content))
+                    entry[key] = stored[-1][0]
+            record[role] = entry
+        self.image_variants = record
+        return stored
+
+    def set_image_metadata(self, image_file):
+        try:
+            metadata = read_image_metadata(image_file)
+        except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+            self.clear_image_metadata(self.IMAGE_CORRUPT)
+            return
+        self.image_width = metadata['width']
+        self.image_height = metadata['height']
+        self.image_size = metadata['size']
+        self.image_hash = metadata['hash']
+        self.image_health = self.IMAGE_OK
+
+    def clear_image_metadata(self, health):
+        self.image_width = self.image_height = self.image_size = None
+        self.image_hash = ''
+        self.image_health = health
+
+    def refresh_image_metadata(self):
+        """Metadaten aus der gespeicherten Datei neu lesen (Backfill)"""
+        if not self.image or not self.image.storage.exists(self.image.name):
+            self.clear_image_metadata(self.IMAGE_MISSING)
+            return
+        with self.image.storage.open(self.image.name, 'rb') as image_file:
+            self.set_image_metadata(image_file)
+
+    @property
+    def has_dimensions(self):
+        return bool(self.image_width and self.image_height)
+
+    @property
+    def is_landscape(self):
+        # Ohne Metadaten (noch nicht geprüft) als Querformat darstellen
+        return not self.has_dimensions or self.image_width > self.image_height
+
+    @property
+    def is_portrait(self):
+        return self.has_dimensions and self.image_height > self.image_width
+
+    @property
+    def is_square(self):
+        return self.has_dimensions and self.image_width == self.image_height
+
+    @property
+    def missing_image(self):
+        return self.image_health in self.BROKEN_IMAGE_STATES
+
     class Meta:
         '''
         Meta class for Photo
@@ -45,3 +218,58 @@ class Photo(models.Model):
         ordering = ['category','-ordering']
         verbose_name = u'Photo'
         verbose_name_plural = u'Photos'
+
+
+class UploadBatch(models.Model):
+    """Mehrfach-Upload aus der Galerie-Verwaltung (siehe gallery.uploads)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    category = models.ForeignKey(PhotoCategory, on_delete=models.CASCADE)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return '%s (%s)' % (self.category, self.created_at)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = u'Upload Batch'
+        verbose_name_plural = u'Upload Batches'
+
+class UploadItem(models.Model):
+    """Eine Datei eines UploadBatch - wird hochgeladen, abgelegt, in Arbeit, fertig oder fehlerhaft"""
+    UPLOADING = 'uploading'
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    ERROR = 'error'
+    STATUS_CHOICES = (
+        (UPLOADING, 'Wird hochgeladen'),
+        (PENDING, 'Wartet'),
+        (PROCESSING, 'In Arbeit'),
+        (DONE, 'Fertig'),
+        (ERROR, 'Fehler'),
+    )
+    FINISHED_STATES = (DONE, ERROR)
+
+    batch = models.ForeignKey(UploadBatch, on_delete=models.CASCADE, related_name='items')
+    filename = models.CharField(max_length=255)
+    # Abgelegtes Original, bis ein Worker es verarbeitet hat
+    spool_path = models.CharField(max_length=500, blank=True)
+    original_size = models.PositiveIntegerField(default=0)
+    # Chunked Upload: bereits empfangene Bytes (= Offset des nächsten Blocks)
+    received = models.PositiveIntegerField(default=0)
+    ordering = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # Fehlermeldung bzw. Hinweis zur Komprimierung
+    message = models.TextField(blank=True)
+    photo = models.ForeignKey(Photo, on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '%s: %s' % (self.filename, self.status)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = u'Upload Item'
+        verbose_name_plural = u'Upload Items'
@@ -0,0 +1,126 @@
+"""
+Lückenbasierte Reihenfolge für Fotos und Kategorien
+
+``ordering`` ist eine ganze Zahl; neue Einträge bekommen Abstände von
+ORDERING_GAP. Wird ein Element verschoben, bekommt nur es einen neuen Wert
+zwischen seinen neuen Nachbarn - die übrigen behalten ihre Werte. Welche
+Elemente bleiben dürfen, bestimmt die längste Teilfolge, die schon richtig
+sortiert ist. Nur wenn zwischen zwei Nachbarn kein Platz mehr ist, wird die
+ganze Liste neu durchnummeriert. Beides ist ein einziges UPDATE mit
+CASE WHEN.
+
+Fotos werden absteigend angezeigt (oben = größter Wert), Kategorien
+aufsteigend.
+"""
+from bisect import bisect_left
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Value, When
+
+ORDERING_GAP = 1024
+# Grenzen von IntegerField (PostgreSQL integer)
+MIN_ORDERING = -2 ** 31
+MAX_ORDERING = 2 ** 31 - 1
+
+
+def next_ordering(queryset):
+    """Wert für einen neuen Eintrag hinter dem größten vorhandenen"""
+    return (queryset.aggregate(Max('ordering'))['ordering__max'] or 0) + ORDERING_GAP
+
+
+def _sorted_run(values):
+    """Indizes der längsten streng aufsteigenden Teilfolge (ohne None)"""
+    tails, tail_indices = [], []
+    previous = [None] * len(values)
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        position = bisect_left(tails, value)
+        if position:
+            previous[index] = tail_indices[position - 1]
+        if position == len(tails):
+            tails.append(value)
+            tail_indices.append(index)
+        else:
+            tails[position] = value
+            tail_indices[position] = index
+    run = set()
+    index = tail_indices[-1] if tail_indices else None
+    while index is not None:
+        run.add(index)
+        index = previous[index]
+    return run
+
+
+def plan_ordering(values):
+    """
+    Neue Werte für eine Liste in Zielreihenfolge (aufsteigend).
+
+    Args:
+        values: aktuelle ``ordering``-Werte der Elemente, None erlaubt
+
+    Returns:
+        {Index: neuer Wert} nur für die Elemente, die sich ändern müssen,
+        oder None, wenn die Liste neu durchnummeriert werden muss
+    """
+    keep = _sorted_run(values)
+    if not keep:
+        return None
+    changes = {}
+    index = 0
+    while index < len(values):
+        if index in keep:
+            index += 1
+            continue
+        start = index
+        while index < len(values) and index not in keep:
+            index += 1
+        count = index - start
+        lower = values[start - 1] if start else None
+        upper = values[index] if index < len(values) else None
+        if lower is None:
+            new_values = [upper - ORDERING_GAP * (count - offset) for offset in range(count)]
+        elif upper is None:
+            new_values = [lower + ORDERING_GAP * (offset + 1) for offset in range(count)]
+        else:
+            step = min((upper - lower) // (count + 1), ORDERING_GAP)
+            if step < 1:
+                return None
+            new_values = [lower + step * (offset + 1) for offset in range(count)]
+        if new_values[0] < MIN_ORDERING or new_values[-1] > MAX_ORDERING:
+            return None
+        changes.update(zip(range(start, index), new_values))
+    return changes
+
+
+def set_ordering(queryset, values):
+    """``values`` ({pk: ordering}) mit einem UPDATE ... CASE WHEN schreiben"""
+    if not values:
+        return 0
+    return queryset.filter(pk__in=values).update(ordering=Case(
+        *[When(pk=pk, then=Value(ordering)) for pk, ordering in values.items()],
+        output_field=IntegerField(),
+    ))
+
+
+def apply_order(queryset, ids, descending=False):
+    """
+    Reihenfolge ``ids`` (wie angezeigt) übernehmen. Unbekannte IDs werden
+    ignoriert.
+
+    Returns:
+        Anzahl geänderter Zeilen
+    """
+    ids = list(dict.fromkeys(ids))
+    with transaction.atomic():
+        current = dict(queryset.select_for_update().filter(pk__in=ids).values_list('pk', 'ordering'))
+        ascending = [pk for pk in (reversed(ids) if descending else ids) if pk in current]
+        changes = plan_ordering([current[pk] for pk in ascending])
+        if changes is None:
+            # Kein Platz mehr - neu durchnummerieren (selten)
+            changes = {index: ORDERING_GAP * (index + 1) for index in range(len(ascending))}
+        values = {
+            ascending[index]: ordering for index, ordering in changes.items()
+            if current[ascending[index]] != ordering
+        }
+        return set_ordering(queryset, values)
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+
+from .gallery_api import invalidate_gallery
+from .models import Photo, PhotoCategory
+
+# Models deren Änderungen Galerie-Seiten und Manifeste beeinflussen
+GALLERY_MODELS = (Photo, PhotoCategory)
+
+
+def invalidate_gallery_on_change(sender, **kwargs):
+    """
+    Signal handler - neue Galerie-Version, alte Manifeste und ETags verfallen
+    """
+    invalidate_gallery()
+
+
+for model in GALLERY_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_gallery_on_change, sender=model,
+        dispatch_uid='gallery_save_%s' % label)
+    post_delete.connect(
+        invalidate_gallery_on_change, sender=model,
+        dispatch_uid='gallery_delete_%s' % label)
+
+
+def release_variants_on_delete(sender, instance, **kwargs):
+    """
+    Signal handler - WebP/AVIF-Varianten eines gelöschten Photos freigeben
+    (die Bildfelder selbst gibt mks.signals frei)
+    """
+    storage = Photo._meta.get_field('image').storage
+    for name in instance.variant_file_names():
+        storage.release(name)
+
+
+post_delete.connect(
+    release_variants_on_delete, sender=Photo,
+    dispatch_uid='gallery_release_variants')
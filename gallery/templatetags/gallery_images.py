@@ -0,0 +1,39 @@
+from django import template
+
+from gallery.gallery_api import GALLERY_TILE_SIZES, build_srcsets
+
+register = template.Library()
+
+PLACEHOLDER = (
+    'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMjIwIiBoZWlnaHQ9IjIyMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48'
+    'cmVjdCB3aWR0aD0iMjIwIiBoZWlnaHQ9IjIyMCIgZmlsbD0iI2YwZjBmMCIvPjwvc3ZnPg=='
+)
+
+
+@register.inclusion_tag('gallery/photo_picture.html')
+def photo_picture(photo, lazy=False, sizes=GALLERY_TILE_SIZES, css_class='', style=''):
+    """
+    <picture> mit AVIF/WebP-Quellen und JPEG-Fallback für ein Photo.
+    Usage: {% photo_picture photo lazy=True %}
+
+    Mit lazy=True stehen srcset und Bild-URL in data-Attributen und werden
+    von gallery/js/lazy-loading.js gesetzt; bis dahin ist das Lazy Image
+    (bzw. ein Platzhalter) zu sehen.
+    """
+    names = {
+        'image': photo.image.name,
+        'image_lazy': photo.image_lazy.name,
+        'image_thumbnail': photo.image_thumbnail.name,
+    }
+    sources, srcset = build_srcsets(photo.image_variants, names)
+    return {
+        'photo': photo,
+        'lazy': lazy,
+        'sources': sources,
+        'srcset': srcset,
+        'sizes': sizes,
+        'css_class': css_class,
+        'style': style,
+        'image_url': photo.image.url,
+        'preview_url': photo.image_lazy.url if photo.image_lazy else PLACEHOLDER,
+    }
@@ -0,0 +1,418 @@
+"""
+Mehrfach-Uploads der Galerie-Verwaltung
+
+Der Request legt die Originale nur in GALLERY_UPLOAD_DIR ab und vermerkt
+sie als UploadItem eines UploadBatch; die Antwort enthält die Batch-ID.
+Verkleinern, Varianten und Speichern übernimmt ein begrenzter Prozess-Pool
+(GALLERY_UPLOAD_WORKERS pro Web-Prozess, Standard: 2). Jeder Worker
+schreibt den Status seiner Datei in die Datenbank; stürzt er ab, vermerkt
+der Web-Prozess einen Fehler. Die Verwaltung fragt den Fortschritt über
+batch_progress ab. Mit GALLERY_UPLOAD_WORKERS = 0
+(und in Tests) wird direkt im Request verarbeitet.
+
+Große Dateien kommen alternativ als Chunked Upload: start_chunked_batch
+legt die Items (Status "uploading") mit leerer Datei an, write_chunk
+schreibt Blöcke fester Größe (CHUNK_SIZE) an ihren Offset - mit
+SHA-256-Prüfsumme je Block. Nach einem Abbruch setzt der Client beim
+gespeicherten Offset (UploadItem.received) fort. Ist die Datei vollständig,
+wird sie wie ein normaler Upload verarbeitet. Ein Block wird erst geprüft
+und dann unter Sperre der Item-Zeile geschrieben; die Datei selbst wird
+nie komplett im Speicher gehalten.
+
+Dateien, die ein abgebrochener Web-Prozess nicht mehr verarbeitet hat,
+erledigt ``manage.py process_pending_uploads``.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from gallery.image_utils import get_image_info
+from gallery.models import Photo, UploadBatch, UploadItem
+from gallery.ordering import ORDERING_GAP, next_ordering
+
+logger = logging.getLogger(__name__)
+
+# Ab dieser Komprimierung (in Prozent) bzw. Restgröße (MB) gibt es einen Hinweis
+COMPRESSION_WARNING = 50
+LARGE_RESULT_MB = 5
+
+# Blockgröße der Chunked Uploads; jeder Block außer dem letzten hat genau diese Größe
+CHUNK_SIZE = 1024 * 1024
+
+# Worker-Prozesse pro Web-Prozess, wenn GALLERY_UPLOAD_WORKERS nicht gesetzt ist
+DEFAULT_UPLOAD_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ChunkError(ValueError):
+    """Block passt nicht zum Stand des Uploads; ``offset`` ist der gültige Offset"""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def upload_workers():
+    """Anzahl Worker-Prozesse, 0 = im Request verarbeiten"""
+    if 'test' in sys.argv:
+        return 0
+    workers = getattr(settings, 'GALLERY_UPLOAD_WORKERS', None)
+    if workers is None:
+        workers = DEFAULT_UPLOAD_WORKERS
+    return max(0, workers)
+
+
+def _init_worker():
+    # spawn statt fork: keine geerbten Datenbankverbindungen oder Threads des Web-Servers
+    import django
+    django.setup()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=upload_workers() or 1,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def spool_directory(batch):
+    return os.path.join(settings.GALLERY_UPLOAD_DIR, str(batch.pk))
+
+
+def spool_path(directory, index, name):
+    return os.path.join(directory, '%03d%s' % (index, os.path.splitext(name)[1].lower()))
+
+
+def spool_upload(uploaded_file, directory, index):
+    """Upload auf die Platte legen, Pfad zurückgeben"""
+    os.makedirs(directory, exist_ok=True)
+    path = spool_path(directory, index, uploaded_file.name)
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        # Django hat die Datei schon auf die Platte geschrieben - nur verschieben
+        shutil.move(uploaded_file.temporary_file_path(), path)
+        return path
+    with open(path, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+    return path
+
+
+def _new_batch(category, user):
+    # Neue Fotos kommen in Upload-Reihenfolge über die vorhandenen, mit Lücken (gallery.ordering)
+    first_ordering = next_ordering(Photo.objects.filter(category=category))
+    batch = UploadBatch.objects.create(
+        category=category, created_by=user if user and user.is_authenticated else None)
+    return batch, first_ordering
+
+
+def _new_item(batch, name, size, ordering, max_file_size):
+    """UploadItem für eine Datei; zu große Dateien gleich als Fehler vermerkt"""
+    item = UploadItem(
+        batch=batch,
+        filename=os.path.basename(name)[:255],
+        original_size=size,
+        ordering=ordering,
+    )
+    if max_file_size and size > max_file_size:
+        item.status = UploadItem.ERROR
+        item.message = (
+            f'Originaldatei zu groß (max. {max_file_size // (1024 * 1024)}MB). '
+            f'Datei ist {(size / 1024 / 1024):.2f}MB.'
+        )
+    return item
+
+
+def create_upload_batch(files, category, user=None, max_file_size=None):
+    """
+    Dateien ablegen und je Datei ein UploadItem anlegen. Zu große Dateien
+    werden gleich als Fehler vermerkt.
+    """
+    batch, first_ordering = _new_batch(category, user)
+    directory = spool_directory(batch)
+
+    items = []
+    for index, uploaded_file in enumerate(files):
+        item = _new_item(batch, uploaded_file.name, uploaded_file.size, first_ordering + index * ORDERING_GAP, max_file_size)
+        if item.status != UploadItem.ERROR:
+            item.spool_path = spool_upload(uploaded_file, directory, index)
+            item.received = uploaded_file.size
+        items.append(item)
+    UploadItem.objects.bulk_create(items)
+    return batch
+
+
+def start_chunked_batch(files, category, user=None, max_file_size=None):
+    """
+    Batch für einen Chunked Upload. ``files`` ist eine Liste von
+    (Dateiname, Größe in Bytes); die Items warten im Status "uploading" auf
+    ihre Blöcke.
+    """
+    batch, first_ordering = _new_batch(category, user)
+    directory = spool_directory(batch)
+    os.makedirs(directory, exist_ok=True)
+
+    items = []
+    for index, (name, size) in enumerate(files):
+        item = _new_item(batch, name, size, first_ordering + index * ORDERING_GAP, max_file_size)
+        if item.status != UploadItem.ERROR:
+            if size <= 0:
+                item.status = UploadItem.ERROR
+                item.message = 'Leere Datei'
+            else:
+                item.status = UploadItem.UPLOADING
+                item.spool_path = spool_path(directory, index, name)
+                open(item.spool_path, 'wb').close()
+        items.append(item)
+    UploadItem.objects.bulk_create(items)
+    return batch
+
+
+def write_chunk(item, offset, stream, checksum=None):
+    """
+    Einen Block aus ``stream`` an ``offset`` der abgelegten Datei schreiben.
+    Löst ChunkError aus, wenn Offset, Größe oder Prüfsumme (SHA-256, hex)
+    nicht stimmen - der Offset bleibt dann unverändert. Mit dem letzten
+    Block wird die Datei zur Verarbeitung freigegeben.
+
+    Returns:
+        Neuer Offset (empfangene Bytes)
+    """
+    if item.status != UploadItem.UPLOADING:
+        raise ChunkError('Upload ist bereits abgeschlossen', item.received)
+    if offset != item.received:
+        raise ChunkError(f'Unerwarteter Offset {offset}, erwartet {item.received}', item.received)
+
+    # Den Block erst vollständig lesen und prüfen (höchstens CHUNK_SIZE Bytes),
+    # damit ein fehlerhafter oder doppelter Block nie in der Datei landet
+    expected = min(CHUNK_SIZE, item.original_size - offset)
+    block = stream.read(expected + 1)
+    if len(block) != expected:
+        raise ChunkError(f'Block muss {expected} Bytes haben', item.received)
+    if checksum and checksum.lower() != hashlib.sha256(block).hexdigest():
+        raise ChunkError('Prüfsumme des Blocks stimmt nicht', item.received)
+
+    received = offset + expected
+    with transaction.atomic():
+        # Gleichzeitige Wiederholungen desselben Blocks warten hier aufeinander
+        current = UploadItem.objects.select_for_update().get(pk=item.pk)
+        if current.status != UploadItem.UPLOADING or current.received != offset:
+            item.received, item.status = current.received, current.status
+            raise ChunkError('Block wurde bereits empfangen', item.received)
+        with open(item.spool_path, 'r+b') as spooled:
+            spooled.seek(offset)
+            spooled.write(block)
+        UploadItem.objects.filter(pk=item.pk).update(received=received, updated_at=timezone.now())
+    item.received = received
+
+    if received == item.original_size:
+        UploadItem.objects.filter(pk=item.pk, status=UploadItem.UPLOADING).update(
+            status=UploadItem.PENDING, updated_at=timezone.now())
+        schedule_items([item.pk])
+        item.refresh_from_db(fields=['status', 'message', 'photo'])
+    return received
+
+
+def schedule_batch(batch):
+    """Wartende Dateien des Batches verarbeiten lassen (Pool oder sofort)"""
+    schedule_items(list(batch.items.filter(status=UploadItem.PENDING).values_list('id', flat=True)))
+
+
+def schedule_items(item_ids):
+    if not item_ids:
+        return
+    if not upload_workers():
+        for item_id in item_ids:
+            process_upload_item(item_id)
+        return
+    # Erst nach dem Commit - die Worker lesen die Items aus der Datenbank
+    transaction.on_commit(lambda: _submit(item_ids))
+
+
+def _submit(item_ids):
+    try:
+        executor = get_executor()
+        for item_id in item_ids:
+            _submit_item(executor, item_id)
+    except BrokenProcessPool:
+        # Ein Worker ist abgestürzt - neuen Pool anlegen; bereits übernommene
+        # Items überspringt process_upload_item
+        logger.warning('Upload process pool broken, restarting')
+        _reset_executor()
+        executor = get_executor()
+        for item_id in item_ids:
+            _submit_item(executor, item_id)
+
+
+def _submit_item(executor, item_id):
+    future = executor.submit(_process_in_worker, item_id)
+    future.add_done_callback(partial(_worker_finished, item_id))
+
+
+def _process_in_worker(item_id):
+    # Im langlebigen Worker wie pro Request: tote Verbindungen verwerfen
+    close_old_connections()
+    try:
+        process_upload_item(item_id)
+    finally:
+        close_old_connections()
+
+
+def _worker_finished(item_id, future):
+    """
+    Done-Callback im Web-Prozess. Ist der Worker abgestürzt oder mit einer
+    Exception ausgestiegen, bleibt das Item nicht "in Arbeit" hängen,
+    sondern wird als Fehler gemeldet.
+    """
+    if future.cancelled() or future.exception() is None:
+        return
+    error = future.exception()
+    logger.error(f"Upload item {item_id} failed in worker: {error!r}", exc_info=error)
+    close_old_connections()
+    try:
+        marked = UploadItem.objects.filter(
+            pk=item_id, status__in=[UploadItem.PENDING, UploadItem.PROCESSING],
+        ).update(
+            status=UploadItem.ERROR,
+            message=f'Verarbeitung abgebrochen: {error or type(error).__name__}',
+            updated_at=timezone.now(),
+        )
+        if marked:
+            remove_spooled_file(UploadItem.objects.select_related('batch').get(pk=item_id))
+    finally:
+        close_old_connections()
+
+
+def compression_warning(original_size, final_size):
+    """Hinweis bei starker Komprimierung oder großem Ergebnis, sonst ''"""
+    original_size_mb = original_size / (1024 * 1024)
+    final_size_mb = final_size / (1024 * 1024)
+    compression_ratio = 100 - (final_size_mb / original_size_mb * 100) if original_size_mb > 0 else 0
+    if compression_ratio > COMPRESSION_WARNING:
+        return (f'Stark komprimiert von {original_size_mb:.1f}MB auf {final_size_mb:.1f}MB '
+                f'(-{compression_ratio:.0f}%)')
+    if final_size_mb > LARGE_RESULT_MB:
+        return f'Verarbeitetes Bild ist noch {final_size_mb:.1f}MB groß'
+    return ''
+
+
+def create_photo(item):
+    """Abgelegtes Original verkleinern, Varianten erzeugen (oder wiederverwenden), als Photo speichern"""
+    with open(item.spool_path, 'rb') as spooled:
+        uploaded_file = File(spooled, name=item.filename)
+        image_info = get_image_info(uploaded_file)
+        if image_info:
+            logger.info(f"Processing {item.filename}: {image_info['width']}x{image_info['height']}, "
+                        f"{image_info['size_mb']}MB")
+        photo = Photo(
+            title=os.path.splitext(item.filename)[0][:50],
+            description='',
+            copyright_by='',
+            category_id=item.batch.category_id,
+            ordering=item.ordering,
+        )
+        if photo.assign_upload(uploaded_file):
+            logger.info(f"Known image {item.filename}, reusing stored files")
+        photo.save()
+    return photo
+
+
+def process_upload_item(item_id):
+    """Eine Datei verarbeiten; Items, die schon jemand übernommen hat, überspringen"""
+    claimed = UploadItem.objects.filter(pk=item_id, status=UploadItem.PENDING).update(
+        status=UploadItem.PROCESSING, updated_at=timezone.now())
+    if not claimed:
+        return
+    item = UploadItem.objects.select_related('batch').get(pk=item_id)
+    try:
+        photo = create_photo(item)
+    except Exception as e:
+        logger.error(f"Error processing {item.filename}: {str(e)}")
+        item.status = UploadItem.ERROR
+        item.message = str(e)
+    else:
+        final_size = photo.image.size if photo.image else 0
+        logger.info(f"Successfully processed {item.filename} -> {final_size / (1024 * 1024):.2f}MB")
+        item.status = UploadItem.DONE
+        item.photo = photo
+        item.message = compression_warning(item.original_size, final_size)
+    item.save(update_fields=['status', 'message', 'photo', 'updated_at'])
+    remove_spooled_file(item)
+
+
+def remove_spooled_file(item):
+    if item.spool_path:
+        try:
+            os.remove(item.spool_path)
+        except FileNotFoundError:
+            pass
+    # Letzte Datei des Batches - Verzeichnis aufräumen
+    if not item.batch.items.exclude(status__in=UploadItem.FINISHED_STATES).exists():
+        shutil.rmtree(spool_directory(item.batch), ignore_errors=True)
+
+
+def serialize_item(item):
+    data = {
+        'id': item.id,
+        'filename': item.filename,
+        'status': item.status,
+        'message': item.message,
+        'size': item.original_size,
+        'offset': item.received,
+    }
+    photo = item.photo
+    if photo is not None:
+        data['photo'] = {
+            'id': photo.id,
+            'title': photo.title,
+            'image_url': photo.image.url,
+            'ordering': photo.ordering,
+            'original_size_mb': round(item.original_size / (1024 * 1024), 2),
+            'final_size_mb': round(photo.image_size / (1024 * 1024), 2) if photo.image_size else 0,
+        }
+    return data
+
+
+def batch_progress(batch):
+    """Fortschritt eines Batches mit dem Status jeder Datei"""
+    items = list(batch.items.select_related('photo'))
+    counts = {status: 0 for status, label in UploadItem.STATUS_CHOICES}
+    for item in items:
+        counts[item.status] += 1
+    return {
+        'batch_id': str(batch.pk),
+        'total': len(items),
+        'uploading': counts[UploadItem.UPLOADING],
+        'pending': counts[UploadItem.PENDING],
+        'processing': counts[UploadItem.PROCESSING],
+        'done': counts[UploadItem.DONE],
+        'errors': counts[UploadItem.ERROR],
+        'finished': all(item.status in UploadItem.FINISHED_STATES for item in items),
+        'items': [serialize_item(item) for item in items],
+    }
@@ -8,13 +8,22 @@ urlpatterns = [
     # Support both with and without trailing slash
     path('galerie', views.gallery_view, name='gallery_view'),
     path('galerie/', views.gallery_view, name='gallery_view_slash'),
+
+    # JSON-API: Seiten mit Cursor, Manifeste je Kategorie
+    path('galerie/api/fotos/', views.gallery_api_photos, name='gallery_api_photos'),
+    path('galerie/api/manifest/', views.gallery_api_manifest, name='gallery_api_manifest'),
+    path('galerie/api/manifest/<int:category_id>/', views.gallery_api_manifest, name='gallery_api_category_manifest'),
     
     # Gallery admin views with drag and drop functionality
     path('galerie/admin/', gallery_admin_views.gallery_admin_view, name='gallery_admin'),
     path('galerie/admin/upload/', gallery_admin_views.upload_photo, name='gallery_upload'),
+    path('galerie/admin/upload/<uuid:batch_id>/', gallery_admin_views.upload_progress, name='gallery_upload_progress'),
+    path('galerie/admin/upload/chunked/', gallery_admin_views.start_chunked_upload, name='gallery_chunked_upload'),
+    path('galerie/admin/upload/chunk/<int:item_id>/', gallery_admin_views.upload_chunk, name='gallery_upload_chunk'),
     path('galerie/admin/delete/<int:photo_id>/', gallery_admin_views.delete_photo, name='gallery_delete_photo'),
     path('galerie/admin/edit/<int:photo_id>/', gallery_admin_views.edit_photo, name='gallery_edit_photo'),
     path('galerie/admin/order/', gallery_admin_views.update_order, name='gallery_update_order'),
+    path('galerie/admin/category/order/', gallery_admin_views.update_category_order, name='gallery_update_category_order'),
     path('galerie/admin/category/create/', gallery_admin_views.create_category, name='gallery_create_category'),
     path('galerie/admin/category/delete/<int:category_id>/', gallery_admin_views.delete_category, name='gallery_delete_category'),
     path('galerie/admin/category/edit/<int:category_id>/', gallery_admin_views.edit_category, name='gallery_edit_category'),
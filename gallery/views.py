@@ -1,10 +1,17 @@
+import hashlib
 import json
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.views.decorators.http import etag, require_GET
 from gallery.models import Photo, PhotoCategory
 import logging
 import os
 import sys
 from django.conf import settings
+from gallery.gallery_api import (
+    GALLERY_PAGE_SIZE, GALLERY_TILE_SIZES, PHOTO_FIELDS, InvalidCursor, gallery_photos, get_gallery_version,
+    get_manifest, get_photo_page, needs_generated_images, page_size, paginate, photo_details,
+)
 from gallery.image_utils import create_lazy_image, create_thumbnail
 from django.core.files.base import ContentFile
 from gallery.lazy_image_generator import generate_missing_images_async
@@ -12,61 +19,85 @@ from gallery.lazy_image_generator import generate_missing_images_async
 # Logger einrichten
 logger = logging.getLogger(__name__)
 
+
+def generate_missing_images(photo_ids):
+    """Fehlende Lazy Images/Thumbnails erzeugen - in Tests synchron, sonst im Hintergrund"""
+    if not photo_ids:
+        return
+    logger.info(f"Starte Hintergrund-Generierung für {len(photo_ids)} Fotos")
+    if 'test' in sys.argv:
+        from gallery.lazy_image_generator import process_images_sync
+        process_images_sync(photo_ids)
+    else:
+        generate_missing_images_async(photo_ids)
+
+
 # Create your views here.
 def gallery_view(request):
-    # Alle Fotos aus allen Kategorien laden (außer von E-Learning)
-    all_photos = Photo.objects.exclude(category__title="E-Learning").order_by('-ordering')
-    
-    # Listen für verschiedene Verarbeitungsschritte
-    photos = []
-    photos_needing_lazy = []
-    
-    # Filterung der Fotos und Sammlung der IDs die Lazy Images brauchen
-    for photo in all_photos:
-        # Prüfen, ob Bilddatei existiert
-        image_path = os.path.join(settings.MEDIA_ROOT, photo.image.name)
-        if os.path.exists(image_path):
-            photos.append(photo)
-            
-            # Sammle Photos die Lazy Images brauchen
-            if photo.image and (
-                not photo.image_lazy or photo.image_lazy.name == 'gallery_lazy_imageDefault.jpg' or
-                not photo.image_thumbnail or photo.image_thumbnail.name == 'gallery_thumbnail_imageDefault.jpg'
-            ):
-                photos_needing_lazy.append(photo.id)
-        else:
-            logger.warning(f"Bild nicht gefunden: {photo.image.name} (ID: {photo.id})")
-    
-    # Starte asynchrone Generierung im Hintergrund wenn nötig
-    if photos_needing_lazy:
-        logger.info(f"Starte Hintergrund-Generierung für {len(photos_needing_lazy)} Fotos")
-        # Für Tests: Synchrone Verarbeitung wenn 'test' in sys.argv
-        is_testing = 'test' in sys.argv
-        
-        if is_testing:
-            # Synchrone Verarbeitung für Tests
-            from gallery.lazy_image_generator import process_images_sync
-            process_images_sync(photos_needing_lazy)
-        else:
-            # Asynchrone Verarbeitung für Production
-            generate_missing_images_async(photos_needing_lazy)
-    
-    # Prepare photo data for JavaScript
-    json_photo = {}
-    for photo in photos:
-        photo_dict = {}
-        photo_dict["title"] = photo.title
-        photo_dict["description"] = photo.description
-        photo_dict["image"] = photo.image.url
-        if photo.copyright_by:
-            photo_dict["copyright_by"] = photo.copyright_by
-        json_photo[photo.id] = photo_dict
-
-    gallery_json_data = json.dumps(json_photo)
+    # Nur die erste Seite (ohne E-Learning, ohne fehlende/beschädigte Dateien) wird
+    # ausgeliefert, der Rest kommt beim Scrollen über gallery_api_photos
+    photos, next_cursor = paginate(gallery_photos().only(*PHOTO_FIELDS), limit=GALLERY_PAGE_SIZE)
+
+    # Fehlende Lazy Images für die angezeigten Fotos erzeugen
+    generate_missing_images([
+        photo.id for photo in photos
+        if needs_generated_images(photo.image.name, photo.image_lazy.name, photo.image_thumbnail.name)
+    ])
+
+    # Daten für die Großansicht (showImg) - nur für die erste Seite
+    gallery_json_data = json.dumps({photo.id: photo_details(photo) for photo in photos})
 
     context = {
         'gallery_json_data': gallery_json_data,
         'photos': photos,
+        'next_cursor': next_cursor,
+        'tile_sizes': GALLERY_TILE_SIZES,
         'show_all_mode': True,  # Neue Flag für "Alle Bilder" Modus
     }
-    return render(request, 'gallery/gallery.html', context)
\ No newline at end of file
+    return render(request, 'gallery/gallery.html', context)
+
+
+def _category_param(request):
+    category = request.GET.get('category')
+    return int(category) if category else None
+
+
+def _photos_etag(request):
+    key = '%s|%s|%s|%s' % (
+        get_gallery_version(), request.GET.get('category', ''),
+        request.GET.get('cursor', ''), page_size(request.GET.get('limit')),
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+@require_GET
+@etag(_photos_etag)
+def gallery_api_photos(request):
+    """
+    Eine Seite der Galerie als JSON: ?cursor= aus 'next' der vorherigen
+    Seite, optional ?category= und ?limit=
+    """
+    try:
+        category_id = _category_param(request)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Ungültige Kategorie'}, status=400)
+    try:
+        page = get_photo_page(category_id, request.GET.get('cursor'), page_size(request.GET.get('limit')))
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': 'Ungültiger Cursor'}, status=400)
+    generate_missing_images(page.pop('pending_ids'))
+    return JsonResponse(page)
+
+
+def _manifest_etag(request, category_id=None):
+    return '%s-%s' % (get_gallery_version(), 'all' if category_id is None else category_id)
+
+
+@require_GET
+@etag(_manifest_etag)
+def gallery_api_manifest(request, category_id=None):
+    """Foto-IDs der Kategorie (bzw. der ganzen Galerie) in Anzeige-Reihenfolge"""
+    manifest = get_manifest(category_id)
+    if manifest is None:
+        return JsonResponse({'status': 'error', 'message': 'Unbekannte Kategorie'}, status=404)
+    return JsonResponse(manifest)
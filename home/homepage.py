@@ -0,0 +1,108 @@
+"""
+Homepage payload assembler.
+
+Builds the context for ``home.views.home`` once and keeps it in the shared
+cache. The payload is rebuilt only after one of the models it is made of is
+saved or deleted (see ``home.signals``), so a homepage hit is served from
+the cache without touching the database.
+"""
+from datetime import datetime
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from school.models import MusicSchool
+from events.models import Event
+from teaching.models import Teacher
+from gallery.models import Photo
+from blog.models import BlogPost
+from home.models import IndexText, Alert, NewsItem
+from downloadsection.models import IndexDownload
+from home.slider_manifest import get_slider_manifest_digest
+
+HOMEPAGE_CACHE_KEY = 'home_payload'
+HOMEPAGE_VERSION_KEY = 'home_payload_version'
+# Events are filtered by date, so a payload is never kept longer than a day
+HOMEPAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Models whose changes invalidate the payload
+HOMEPAGE_MODELS = (
+    MusicSchool,
+    Event,
+    Teacher,
+    Photo,
+    BlogPost,
+    IndexText,
+    Alert,
+    NewsItem,
+    IndexDownload,
+)
+
+
+def _payload_key(today):
+    version = cache.get(HOMEPAGE_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(HOMEPAGE_VERSION_KEY, version, None)
+    return '%s:%s:%s' % (HOMEPAGE_CACHE_KEY, version, today.isoformat())
+
+
+def build_homepage_payload(today=None):
+    """
+    Run all homepage queries and return a picklable dict.
+    Querysets are evaluated into lists so the payload can be cached.
+    """
+    today = today or datetime.now().date()
+
+    school_data = MusicSchool.objects.all().first()
+
+    news_items = list(NewsItem.objects.filter(is_active=True)[:5])
+    # Keep blog posts as fallback if there are no news items
+    if not news_items:
+        blog = list(
+            BlogPost.objects.filter(published=True)
+            .exclude(category__category__name="Kunstschule")[:6]
+        )
+    else:
+        blog = None
+
+    active_alert = Alert.objects.filter(is_active=True).first()
+
+    return {
+        'index_text': IndexText.objects.all().first(),
+        'blog': blog,
+        'news_items': news_items,
+        'events': list(Event.objects.filter(date__gte=today).order_by('date')[:6]),
+        'material_data': list(IndexDownload.objects.all()),
+        'name': school_data.school_name if school_data else None,
+        'logo': school_data.school_logo if school_data else None,
+        'teacher_counter': Teacher.objects.count(),
+        'slider_manifest_url': reverse('slider_manifest', args=[get_slider_manifest_digest()]),
+        # Alert Mode
+        'alert_message': active_alert.message if active_alert else None,
+        'alert_title': active_alert.title if active_alert else None,
+    }
+
+
+def get_homepage_payload():
+    """
+    Return the cached homepage payload, building it on a cache miss.
+    """
+    today = datetime.now().date()
+    key = _payload_key(today)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_homepage_payload(today)
+        cache.set(key, payload, HOMEPAGE_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_homepage_payload():
+    """
+    Drop the cached payload by bumping its version.
+    Bumping instead of deleting also discards payloads of other dates.
+    """
+    try:
+        cache.incr(HOMEPAGE_VERSION_KEY)
+    except ValueError:
+        cache.set(HOMEPAGE_VERSION_KEY, 2, None)
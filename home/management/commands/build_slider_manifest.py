@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+
+    help = 'Writes the content hashed homepage slider manifest to MEDIA_ROOT'
+
+    def handle(self, *args, **options):
+        from home.slider_manifest import manifest_path, write_slider_manifest
+        digest = write_slider_manifest()
+        self.stdout.write(self.style.SUCCESS(f'Slider manifest written: {manifest_path(digest)}'))
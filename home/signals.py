@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+
+from gallery.models import Photo
+
+from .homepage import HOMEPAGE_MODELS, invalidate_homepage_payload
+from .slider_manifest import invalidate_slider_manifest
+
+
+def invalidate_homepage_on_change(sender, **kwargs):
+    """
+    Signal handler - rebuild the homepage payload on the next request
+    """
+    invalidate_homepage_payload()
+
+
+for model in HOMEPAGE_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_homepage_on_change, sender=model,
+        dispatch_uid='homepage_payload_save_%s' % label)
+    post_delete.connect(
+        invalidate_homepage_on_change, sender=model,
+        dispatch_uid='homepage_payload_delete_%s' % label)
+
+
+def invalidate_slider_on_change(sender, **kwargs):
+    """
+    Signal handler - rebuild the slider manifest on the next request
+    """
+    invalidate_slider_manifest()
+
+
+post_save.connect(invalidate_slider_on_change, sender=Photo, dispatch_uid='slider_manifest_save')
+post_delete.connect(invalidate_slider_on_change, sender=Photo, dispatch_uid='slider_manifest_delete')
@@ -0,0 +1,101 @@
+"""
+Versioned JSON manifest for the homepage slider.
+
+Instead of inlining every slider photo into the homepage HTML, the photo
+list is written once to ``MEDIA_ROOT/home/slider/slider.<hash>.json``.
+The file name contains a hash of its content, so it can be served with
+far-future cache headers and browsers reuse it until the photos change.
+
+The homepage only links it in a ``<meta name="slider-manifest">`` tag so
+far; the slider script that fetches it is still to come.
+"""
+import glob
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+
+from gallery.models import Photo
+
+# Gallery category whose photos make up the slider
+HERO_CATEGORY_ID = 1
+
+SLIDER_MANIFEST_CACHE_KEY = 'home_slider_manifest'
+SLIDER_MANIFEST_DIR = os.path.join('home', 'slider')
+SLIDER_MANIFEST_PATTERN = 'slider.%s.json'
+# Content hashed files never change, browsers may keep them for a year
+SLIDER_MANIFEST_MAX_AGE = 60 * 60 * 24 * 365
+# Older manifests are kept for pages that were rendered before a change
+SLIDER_MANIFEST_KEEP = 5
+
+
+def build_slider_manifest_data():
+    """
+    Return the slider entries (URLs of all variants plus dimensions).
+    The dimensions are the ones stored on upload - no image file is opened.
+    """
+    photos = Photo.objects.filter(category_id=HERO_CATEGORY_ID).only(
+        'id', 'title', 'image', 'image_lazy', 'image_thumbnail', 'image_width', 'image_height')
+    entries = []
+    for photo in photos:
+        entries.append({
+            'id': photo.id,
+            'title': photo.title,
+            'url': photo.image.url,
+            'lazy': photo.image_lazy.url if photo.image_lazy else None,
+            'thumbnail': photo.image_thumbnail.url if photo.image_thumbnail else None,
+            'width': photo.image_width,
+            'height': photo.image_height,
+        })
+    return entries
+
+
+def manifest_path(digest):
+    return os.path.join(settings.MEDIA_ROOT, SLIDER_MANIFEST_DIR, SLIDER_MANIFEST_PATTERN % digest)
+
+
+def write_slider_manifest():
+    """
+    Write the manifest file and return its content hash.
+    Only the newest SLIDER_MANIFEST_KEEP manifests are kept on disk.
+    """
+    content = json.dumps(
+        {'photos': build_slider_manifest_data()},
+        sort_keys=True, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    path = manifest_path(digest)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    old_paths = sorted(
+        (p for p in glob.glob(manifest_path('*')) if p != path),
+        key=os.path.getmtime, reverse=True)
+    for old_path in old_paths[SLIDER_MANIFEST_KEEP - 1:]:
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
+
+    cache.set(SLIDER_MANIFEST_CACHE_KEY, digest, None)
+    return digest
+
+
+def get_slider_manifest_digest():
+    """
+    Return the hash of the current manifest, writing it on a cache miss.
+    """
+    digest = cache.get(SLIDER_MANIFEST_CACHE_KEY)
+    if digest is None or not os.path.exists(manifest_path(digest)):
+        digest = write_slider_manifest()
+    return digest
+
+
+def invalidate_slider_manifest():
+    cache.delete(SLIDER_MANIFEST_CACHE_KEY)
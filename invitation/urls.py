@@ -7,6 +7,7 @@ urlpatterns = [
     path('', views.invitation_view, name='invitation_form'),
     path('danke/', views.thank_you_view, name='thank_you'),
     path('anmeldungen/', views.invitation_list_view, name='invitation_list'),
+    path('anmeldungen/export/', views.invitation_export_view, name='invitation_export'),
     
     # Admin-URLs
     path('admin/', admin_views.invitation_admin_dashboard, name='admin_dashboard'),
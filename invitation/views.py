@@ -6,8 +6,23 @@ from .models import Invitation
 from events.models import Event
 from collections import defaultdict
 from django.db.models import Sum, F, Value, IntegerField, ExpressionWrapper  
+from django.db.models.functions import Coalesce
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
 from datetime import datetime, timedelta
+from mks.exports import Column, streaming_export_response
+
+INVITATION_EXPORT_COLUMNS = (
+    Column('Veranstaltung', 'export_event_name'),
+    Column('Datum', 'event__date'),
+    Column('Uhrzeit', 'event__time'),
+    Column('Name', 'name'),
+    Column('Email', 'email'),
+    Column('Begleitpersonen', 'number_of_guests'),
+    Column('Personen gesamt', 'export_persons'),
+    Column('Anmeldedatum', 'timestamp', timezone.localtime),
+)
 
 def get_available_events():
     """Gibt verfügbare Events für Anmeldungen zurück"""
@@ -157,3 +172,19 @@ def invitation_list_view(request):
         'total_persons_by_event': dict(total_persons_by_event),
     }
     return render(request, 'invitation/invitation_list.html', context)
+
+@login_required(login_url='/team/login/')
+@staff_member_required
+def invitation_export_view(request):
+    """Alle Anmeldungen als XLSX (oder CSV mit ?format=csv)"""
+    invitations = Invitation.objects.annotate(
+        export_event_name=Coalesce('event__name', 'event_name'),
+        export_persons=ExpressionWrapper(
+            Coalesce('number_of_guests', Value(0)) + Value(1), output_field=IntegerField()
+        ),
+    ).order_by('event__date', 'timestamp')
+    file_name = 'Einladungen_' + datetime.now().strftime('%Y-%m-%d')
+    return streaming_export_response(
+        invitations, INVITATION_EXPORT_COLUMNS, file_name,
+        export_format=request.GET.get('format', 'xlsx'), sheet_name='Anmeldungen',
+    )
@@ -1,31 +1,13 @@
-from .models import MaintenanceMode
-from django.core.cache import cache
-import os
+from .state import is_maintenance_active
 
 def maintenance_context(request):
     """
     Context Processor um Maintenance Status in allen Templates verfügbar zu machen
     """
-    # Prüfe verschiedene Quellen für Maintenance Status
-    maintenance_active = False
-    
-    # 1. Environment Variable
-    if os.environ.get('MAINTENANCE_MODE', 'false').lower() == 'true':
-        maintenance_active = True
-    else:
-        # 2. Cache
-        cached_status = cache.get('maintenance_mode_status')
-        if cached_status is not None:
-            maintenance_active = cached_status
-        else:
-            # 3. Datenbank
-            try:
-                maintenance = MaintenanceMode.load()
-                maintenance_active = maintenance.is_active
-                # Cache für 60 Sekunden
-                cache.set('maintenance_mode_status', maintenance_active, 60)
-            except:
-                pass
+    # Status wurde meist schon von der MaintenanceModeMiddleware ermittelt
+    maintenance_active = getattr(request, 'maintenance_active', None)
+    if maintenance_active is None:
+        maintenance_active = is_maintenance_active()
     
     return {
         'maintenance_mode': maintenance_active,
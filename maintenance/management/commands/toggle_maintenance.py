@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
+from maintenance.state import invalidate_maintenance_state
 import os
 
 class Command(BaseCommand):
@@ -21,12 +21,12 @@ class Command(BaseCommand):
         if options['on']:
             # Setze Environment Variable
             os.environ['MAINTENANCE_MODE'] = 'true'
-            # Cache invalidieren
-            cache.delete('maintenance_mode_status')
+            # Status neu laden lassen
+            invalidate_maintenance_state()
             self.stdout.write(self.style.SUCCESS('Maintenance Mode aktiviert'))
         elif options['off']:
             os.environ['MAINTENANCE_MODE'] = 'false'
-            cache.delete('maintenance_mode_status')
+            invalidate_maintenance_state()
             self.stdout.write(self.style.SUCCESS('Maintenance Mode deaktiviert'))
         else:
             self.stdout.write(self.style.ERROR('Bitte --on oder --off angeben'))
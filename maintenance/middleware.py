@@ -1,12 +1,22 @@
 from django.shortcuts import render
-from django.core.cache import cache
-from django.db import connection, OperationalError
 from django.conf import settings
 import logging
-import os
+
+from mks.request_classification import get_prefix_matcher, is_bot
+from .state import is_maintenance_active
 
 logger = logging.getLogger(__name__)
 
+# Ausnahmen für Admin-Bereich und statische Dateien
+EXEMPT_PATHS = (
+    '/admin/',
+    '/static/',
+    '/media/',
+    '/maintenance/',
+    '/__debug__/',
+    '/favicon.ico',
+)
+
 class MaintenanceModeMiddleware:
     """
     Middleware die prüft ob Maintenance Mode aktiv ist
@@ -19,30 +29,15 @@ class MaintenanceModeMiddleware:
     """
     def __init__(self, get_response):
         self.get_response = get_response
-        # Fallback auf Environment Variable für Deployment
-        self.env_maintenance = os.environ.get('MAINTENANCE_MODE', 'false').lower() == 'true'
 
     def __call__(self, request):
-        # Ausnahmen für Admin-Bereich und statische Dateien
-        exempt_paths = [
-            '/admin/',
-            '/static/',
-            '/media/',
-            '/maintenance/',
-            '/__debug__/',
-            '/favicon.ico',
-        ]
-        
-        # API Endpoints die während Maintenance erreichbar sein sollen
-        if hasattr(settings, 'MAINTENANCE_EXEMPT_PATHS'):
-            exempt_paths.extend(settings.MAINTENANCE_EXEMPT_PATHS)
-        
         # Prüfe ob der Pfad ausgenommen ist
-        if any(request.path.startswith(path) for path in exempt_paths):
+        if self._get_exempt_matcher()(request.path):
             return self.get_response(request)
         
-        # Prüfe Maintenance Status
+        # Prüfe Maintenance Status - wird für den Context Processor gemerkt
         is_maintenance = self._check_maintenance_status()
+        request.maintenance_active = is_maintenance
         
         if is_maintenance:
             # Bot Detection - Bots bekommen auch Maintenance Page
@@ -76,23 +71,13 @@ class MaintenanceModeMiddleware:
     
     def _is_bot(self, user_agent):
         """Erkennt Bots anhand des User-Agent"""
-        bot_indicators = [
-            'bot', 'crawler', 'spider', 'scraper', 'crawl',
-            'slurp', 'mediapartners', 'adsbot', 'feedfetcher',
-            'facebookexternalhit', 'whatsapp', 'slack',
-            'twitterbot', 'linkedinbot', 'pinterest',
-            'googlebot', 'bingbot', 'yandex', 'baidu',
-            'duckduckbot', 'sogou', 'exabot', 'ia_archiver',
-            'curl', 'wget', 'python-requests', 'axios',
-            'go-http-client', 'java/', 'apache-httpclient',
-            'postmanruntime', 'insomnia', 'paw/', 'httpie',
-            'scrapy', 'nutch', 'phpcrawl', 'larbin',
-            'libwww', 'lwp-trivial', 'httrack', 'harvest',
-            'archiver', 'monitor', 'downloader', 'checker',
-            'validator', 'fetcher', 'analyzer', 'extractor'
-        ]
-        
-        return any(indicator in user_agent for indicator in bot_indicators)
+        return is_bot(user_agent)
+    
+    def _get_exempt_matcher(self):
+        """Matcher für Admin-Bereich, statische Dateien und MAINTENANCE_EXEMPT_PATHS"""
+        # API Endpoints die während Maintenance erreichbar sein sollen
+        extra_paths = tuple(getattr(settings, 'MAINTENANCE_EXEMPT_PATHS', ()))
+        return get_prefix_matcher(EXEMPT_PATHS + extra_paths)
     
     def _get_client_ip(self, request):
         """Ermittelt die Client IP-Adresse"""
@@ -104,59 +89,8 @@ class MaintenanceModeMiddleware:
         return ip
     
     def _check_maintenance_status(self):
-        """Prüft den Maintenance Status mit mehreren Fallbacks"""
-        
-        # 1. Priorität: Environment Variable (für schnelles Ein-/Ausschalten)
-        if self.env_maintenance:
-            return True
-        
-        # 2. Priorität: Settings Variable
-        if hasattr(settings, 'MAINTENANCE_MODE') and settings.MAINTENANCE_MODE:
-            return True
-        
-        # 3. Priorität: Cache
-        maintenance_status = cache.get('maintenance_mode_status')
-        if maintenance_status is not None:
-            return maintenance_status
-        
-        # 4. Priorität: Datenbank (mit Fehlerbehandlung)
-        try:
-            from .models import MaintenanceMode
-            
-            # Prüfe ob Tabelle existiert
-            with connection.cursor() as cursor:
-                if connection.vendor == 'postgresql':
-                    cursor.execute("""
-                        SELECT EXISTS (
-                            SELECT FROM information_schema.tables 
-                            WHERE table_name = 'maintenance_maintenancemode'
-                        );
-                    """)
-                    table_exists = cursor.fetchone()[0]
-                elif connection.vendor == 'sqlite':
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name='maintenance_maintenancemode';
-                    """)
-                    result = cursor.fetchone()
-                    table_exists = result is not None
-                else:
-                    # Andere Datenbanken - versuche es einfach
-                    table_exists = True
-                
-                if table_exists:
-                    maintenance = MaintenanceMode.load()
-                    maintenance_status = maintenance.is_active
-                    # Cache für 60 Sekunden
-                    cache.set('maintenance_mode_status', maintenance_status, 60)
-                    return maintenance_status
-                    
-        except (OperationalError, Exception) as e:
-            logger.warning(f"Konnte Maintenance Status nicht aus DB laden: {str(e)}")
-            # Bei Datenbankfehlern auf Environment/Settings zurückfallen
-            pass
-        
-        return False
+        """Prüft den Maintenance Status (siehe maintenance.state)"""
+        return is_maintenance_active()
     
     def _render_maintenance_page(self, request):
         """Rendert die Maintenance Seite mit Fallback-Werten"""
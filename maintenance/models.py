@@ -1,5 +1,6 @@
 from django.db import models
-from django.core.cache import cache
+
+from .state import publish_maintenance_state
 
 class MaintenanceMode(models.Model):
     """Singleton Model für Maintenance Mode Einstellungen"""
@@ -33,8 +34,8 @@ class MaintenanceMode(models.Model):
         # Singleton Pattern - nur eine Instanz erlaubt
         self.pk = 1
         super().save(*args, **kwargs)
-        # Cache invalidieren wenn Status geändert wird
-        cache.delete('maintenance_mode_status')
+        # Neuen Status an alle Prozesse verteilen
+        publish_maintenance_state(self.is_active)
 
     def delete(self, *args, **kwargs):
         # Verhindere das Löschen
@@ -0,0 +1,94 @@
+"""
+Prozessweiter Maintenance Status
+
+Middleware und Context Processor teilen sich einen Status pro Prozess.
+Pro Request wird nur ein kleiner Versions-Stempel aus dem Cache gelesen;
+die Datenbank wird nur abgefragt, wenn der Stempel fehlt oder der lokale
+Status älter als MAINTENANCE_STATE_MAX_AGE ist. Damit erreichen
+Änderungen alle Worker spätestens nach MAINTENANCE_STATE_MAX_AGE Sekunden,
+mit einem gemeinsamen Cache (z.B. FileBasedCache) sofort.
+"""
+import logging
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_STATE_CACHE_KEY = 'maintenance_mode_state'
+DEFAULT_MAX_AGE = 60
+
+# (version, is_active, geladen_um) - wird als Ganzes ersetzt
+_local_state = (None, False, 0.0)
+
+
+def _max_age():
+    return getattr(settings, 'MAINTENANCE_STATE_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def _load_from_db():
+    """Liest den Status ohne get_or_create; fehlende Tabelle = inaktiv"""
+    from .models import MaintenanceMode
+    try:
+        is_active = MaintenanceMode.objects.filter(pk=1).values_list('is_active', flat=True).first()
+    except DatabaseError as e:
+        logger.warning(f"Konnte Maintenance Status nicht aus DB laden: {str(e)}")
+        return False
+    return bool(is_active)
+
+
+def publish_maintenance_state(is_active):
+    """
+    Schreibt einen neuen Versions-Stempel mit dem Status in den Cache
+    und übernimmt ihn sofort für diesen Prozess.
+    """
+    global _local_state
+    version = uuid.uuid4().hex
+    cache.set(MAINTENANCE_STATE_CACHE_KEY, (version, is_active), None)
+    _local_state = (version, is_active, time.monotonic())
+
+
+def invalidate_maintenance_state():
+    """Entfernt den Stempel - der nächste Request lädt aus der DB"""
+    global _local_state
+    cache.delete(MAINTENANCE_STATE_CACHE_KEY)
+    _local_state = (None, False, 0.0)
+
+
+def get_maintenance_status():
+    """Liefert den Status aus DB/Cache, ohne Environment und Settings"""
+    global _local_state
+    version, is_active, loaded_at = _local_state
+    shared = cache.get(MAINTENANCE_STATE_CACHE_KEY)
+
+    if shared is not None:
+        shared_version, shared_active = shared
+        if shared_version != version:
+            # Anderer Prozess hat umgeschaltet - Status übernehmen
+            _local_state = (shared_version, shared_active, time.monotonic())
+            return shared_active
+        if time.monotonic() - loaded_at < _max_age():
+            return is_active
+
+    is_active = _load_from_db()
+    if shared is not None and shared[1] == is_active:
+        _local_state = (shared[0], is_active, time.monotonic())
+    else:
+        publish_maintenance_state(is_active)
+    return is_active
+
+
+def is_maintenance_active():
+    """
+    Prüft den Maintenance Status mit mehreren Fallbacks:
+    Environment Variable, Settings, dann Cache/Datenbank.
+    """
+    if os.environ.get('MAINTENANCE_MODE', 'false').lower() == 'true':
+        return True
+    if getattr(settings, 'MAINTENANCE_MODE', False):
+        return True
+    return get_maintenance_status()
@@ -14,6 +14,7 @@ class MksConfig(AppConfig):
         other apps try to import it.
         """
         self._setup_allauth_compatibility()
+        import mks.signals
     
     def _setup_allauth_compatibility(self):
         """Setup allauth middleware compatibility for older versions."""
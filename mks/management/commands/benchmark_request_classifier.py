@@ -0,0 +1,69 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from mks.request_classification import (
+    BOT_INDICATORS, BOT_PATTERN, PathPrefixMatcher, is_bot,
+)
+from maintenance.middleware import EXEMPT_PATHS
+
+SAMPLE_USER_AGENTS = (
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 '
+    '(KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36',
+    'Googlebot/2.1 (+http://www.google.com/bot.html)',
+    'facebookexternalhit/1.1',
+    'curl/8.5.0',
+)
+
+SAMPLE_PATHS = (
+    '/', '/lehrende/', '/static/css/main.css', '/media/gallery/images/a.jpg',
+    '/controlling/', '/admin/', '/blog/2024/konzert',
+)
+
+
+def substring_is_bot(user_agent):
+    user_agent = user_agent.lower()
+    return any(indicator in user_agent for indicator in BOT_INDICATORS)
+
+
+def list_is_exempt(path):
+    exempt_paths = list(EXEMPT_PATHS)
+    return any(path.startswith(prefix) for prefix in exempt_paths)
+
+
+class Command(BaseCommand):
+    help = 'Misst die Kosten der Bot-Erkennung und Pfad-Ausnahmen pro Request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000,
+                            help='Anzahl simulierter Requests')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        user_agents = [random.choice(SAMPLE_USER_AGENTS) for _ in range(count)]
+        paths = [random.choice(SAMPLE_PATHS) for _ in range(count)]
+        matcher = PathPrefixMatcher(EXEMPT_PATHS)
+        is_bot.cache_clear()
+
+        def regex_is_bot(user_agent):
+            return BOT_PATTERN.search(user_agent.lower()) is not None
+
+        # Beide Varianten müssen dasselbe Ergebnis liefern
+        for user_agent in SAMPLE_USER_AGENTS:
+            assert substring_is_bot(user_agent) == is_bot(user_agent)
+
+        benchmarks = [
+            ('Bot: Substring-Scan', lambda: [substring_is_bot(ua) for ua in user_agents]),
+            ('Bot: Regex', lambda: [regex_is_bot(ua) for ua in user_agents]),
+            ('Bot: Regex + LRU', lambda: [is_bot(ua) for ua in user_agents]),
+            ('Pfad: Liste + any()', lambda: [list_is_exempt(p) for p in paths]),
+            ('Pfad: PathPrefixMatcher', lambda: [matcher(p) for p in paths]),
+        ]
+        for label, func in benchmarks:
+            seconds = min(timeit.repeat(func, number=1, repeat=3))
+            self.stdout.write(f'{label:<26} {seconds / count * 1e9:8.0f} ns/Request')
@@ -0,0 +1,18 @@
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectstaticCommand
+
+from mks.static_manifest import write_static_manifest
+
+
+class Command(CollectstaticCommand):
+    """
+    collectstatic that also writes the content hash manifest used by
+    the versioned_static template tag.
+    """
+
+    def handle(self, **options):
+        result = super().handle(**options)
+        if not options['dry_run']:
+            path, count = write_static_manifest()
+            if self.verbosity >= 1:
+                self.stdout.write(f'Static manifest with {count} entries written to {path}')
+        return result
@@ -0,0 +1,190 @@
+"""
+Content-addressed media storage.
+
+Uploaded images are stored under the SHA-256 of their content:
+``<upload_to>/<first two hex digits>/<sha256><ext>``. The hash is computed
+while the upload is streamed to a temporary file, so identical bytes end
+up in the same file and are written to disk only once. Every save of a
+file adds a reference in the StoredFile index, every delete removes one;
+the file itself is only removed with its last reference, once the
+deleting transaction has committed. Files stored
+before (or by other storages) are not in the index and are deleted as
+usual.
+
+Fields opt in with ``storage=get_media_storage``. Model rows holding
+content-addressed files release their references when they are deleted
+(see mks.signals).
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F, FileField
+from django.utils.deconstruct import deconstructible
+
+SHARD_LENGTH = 2
+TEMP_PREFIX = '.upload-'
+
+
+def file_sha256(file):
+    """SHA-256 (hex) of a Django File, read in chunks"""
+    digest = hashlib.sha256()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def _index(self):
+        return apps.get_model('mks', 'StoredFile')
+
+    def content_name(self, name, sha256):
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, sha256[:SHARD_LENGTH], sha256 + extension)
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content and is chosen in _save()
+        return name
+
+    def _spool(self, content):
+        """Write content to a temporary file next to the media files, hashing it"""
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.location, prefix=TEMP_PREFIX)
+        with os.fdopen(fd, 'wb') as temp_file:
+            if hasattr(content, 'seek'):
+                content.seek(0)
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temp_file.write(chunk)
+                size += len(chunk)
+        return temp_path, digest.hexdigest(), size
+
+    def _save(self, name, content):
+        temp_path, sha256, size = self._spool(content)
+        try:
+            name = self.content_name(name, sha256)
+            StoredFile = self._index()
+
+            with transaction.atomic():
+                entry, created = StoredFile.objects.select_for_update().get_or_create(
+                    name=name, defaults={'sha256': sha256, 'size': size})
+                # Known content: nothing to write (unless the file went missing)
+                if created or not self.exists(name):
+                    self._move_into_place(temp_path, name)
+                StoredFile.objects.filter(pk=entry.pk).update(references=F('references') + 1)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def write_content(self, name, content):
+        """
+        Store a file without touching the database, e.g. in a worker process.
+        The caller has to ``register()`` the returned (name, sha256, size)
+        for the file to be referenced.
+        """
+        temp_path, sha256, size = self._spool(content)
+        try:
+            name = self.content_name(name, sha256)
+            if not self.exists(name):
+                self._move_into_place(temp_path, name)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name, sha256, size
+
+    def register(self, name, sha256, size):
+        """Add a reference to a file stored with ``write_content()``"""
+        StoredFile = self._index()
+        with transaction.atomic():
+            entry, created = StoredFile.objects.select_for_update().get_or_create(
+                name=name, defaults={'sha256': sha256, 'size': size})
+            if not self.exists(name):
+                # Deleted with its last reference in the meantime
+                raise FileNotFoundError(name)
+            StoredFile.objects.filter(pk=entry.pk).update(references=F('references') + 1)
+        return name
+
+    def _move_into_place(self, temp_path, name):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        os.chmod(temp_path, self.file_permissions_mode if self.file_permissions_mode is not None else 0o644)
+        os.replace(temp_path, full_path)
+
+    def add_reference(self, name):
+        """Another row uses an already stored file; unknown names are ignored"""
+        return self._index().objects.filter(name=name).update(references=F('references') + 1)
+
+    def release(self, name):
+        """
+        Drop one reference and delete the file with the last one. Returns
+        False for names that are not in the index.
+        """
+        StoredFile = self._index()
+        with transaction.atomic():
+            entry = StoredFile.objects.select_for_update().filter(name=name).first()
+            if entry is None:
+                return False
+            if entry.references > 1:
+                StoredFile.objects.filter(pk=entry.pk).update(references=F('references') - 1)
+                return True
+            entry.delete()
+            # A rollback brings the row back - the file has to survive it
+            transaction.on_commit(lambda: self._delete_unreferenced(name))
+        return True
+
+    def _delete_unreferenced(self, name):
+        with transaction.atomic():
+            # Unless the same content was stored again meanwhile
+            if not self._index().objects.select_for_update().filter(name=name).exists():
+                super().delete(name)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        if not self.release(name):
+            super().delete(name)
+
+
+media_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    return media_storage
+
+
+def content_addressed_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def media_models():
+    """Models with at least one content-addressed file field"""
+    return [model for model in apps.get_models() if content_addressed_fields(model)]
+
+
+def release_files(instance):
+    """Release the content-addressed files of a deleted row"""
+    for field in content_addressed_fields(type(instance)):
+        name = getattr(instance, field.attname)
+        name = getattr(name, 'name', name)
+        if name:
+            field.storage.release(name)
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class StoredFile(models.Model):
+    """
+    Index entry of a file in the content-addressed media storage
+    (mks.media_storage): one row per stored file, counting the
+    references to it.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return '%s (%s)' % (self.name, self.references)
+
+    class Meta:
+        verbose_name = 'Stored File'
+        verbose_name_plural = 'Stored Files'
@@ -11,7 +11,7 @@ ALLOWED_HOSTS = ['your-domain.com', 'www.your-domain.com']  # Add your actual do
 DATABASES['default']['CONN_MAX_AGE'] = 600
 
 # File upload limits for PDF generation
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
+# (FILE_UPLOAD_MAX_MEMORY_SIZE from settings: larger uploads are spooled to disk)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 
@@ -72,5 +72,15 @@ CACHES = {
         'OPTIONS': {
             'MAX_ENTRIES': 1000
         }
+    },
+    # Student data sheets (controlling.student_pdf): separate so that large
+    # PDF batches do not cull the page and reference data entries above
+    'student_pdfs': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/var/tmp/django_cache_student_pdfs',
+        'TIMEOUT': 60 * 60 * 24 * 30,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000
+        }
     }
 }
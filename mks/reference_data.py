@@ -0,0 +1,182 @@
+"""
+In-process cache for small reference tables.
+
+Gender, AcademicTitle, Country, Location, LessonForm, Subject and
+SubjectCategory change a few times a year but are read on almost every
+form, export and profile page. Each table is loaded once per process on
+first use and served from memory afterwards: ``rows()`` for lists,
+``get()``/``find()`` for lookups, ``choices()`` and
+``ReferenceModelChoiceField`` for forms.
+
+Saving or deleting a row of any reference table stores a new random
+version stamp in the shared cache (see ``mks.signals``); every process
+compares its stamp on access and drops its tables when it differs.
+Without a shared cache backend the tables are reloaded after
+REFERENCE_DATA_MAX_AGE seconds at the latest.
+"""
+import threading
+import time
+import uuid
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+
+REFERENCE_VERSION_KEY = 'reference_data_version'
+DEFAULT_MAX_AGE = 300
+
+# model label -> related fields loaded with the table
+REFERENCE_TABLES = {
+    'students.gender': (),
+    'students.academictitle': (),
+    'location.country': (),
+    'location.location': ('country',),
+    'teaching.lessonform': ('subject',),
+    'teaching.subject': ('category',),
+    'teaching.subjectcategory': (),
+}
+
+# (version, {label: ReferenceTable}, loaded_at) - replaced as a whole
+_state = (None, {}, 0.0)
+_lock = threading.Lock()
+
+
+class ReferenceTable:
+    """All rows of one model in default ordering, indexed by primary key"""
+
+    def __init__(self, model, select_related=()):
+        self.model = model
+        self.rows = list(model._default_manager.select_related(*select_related))
+        self.by_pk = {row.pk: row for row in self.rows}
+
+
+def reference_models():
+    return [apps.get_model(label) for label in REFERENCE_TABLES]
+
+
+def get_reference_version():
+    version = cache.get(REFERENCE_VERSION_KEY)
+    if version is None:
+        # Random stamp, so a cleared cache never matches an old version
+        version = uuid.uuid4().hex
+        if not cache.add(REFERENCE_VERSION_KEY, version, None):
+            version = cache.get(REFERENCE_VERSION_KEY, version)
+    return version
+
+
+def invalidate_reference_data():
+    cache.set(REFERENCE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _current_tables():
+    global _state
+    version = get_reference_version()
+    local_version, tables, loaded_at = _state
+    max_age = getattr(settings, 'REFERENCE_DATA_MAX_AGE', DEFAULT_MAX_AGE)
+    if local_version != version or time.monotonic() - loaded_at >= max_age:
+        with _lock:
+            if _state[0] != version or time.monotonic() - _state[2] >= max_age:
+                _state = (version, {}, time.monotonic())
+            tables = _state[1]
+    return tables
+
+
+def get_table(model):
+    label = model._meta.label_lower
+    if label not in REFERENCE_TABLES:
+        raise ValueError('%s is not a reference table' % label)
+    tables = _current_tables()
+    table = tables.get(label)
+    if table is None:
+        with _lock:
+            table = tables.get(label)
+            if table is None:
+                table = tables[label] = ReferenceTable(model, REFERENCE_TABLES[label])
+    return table
+
+
+def rows(model):
+    """All rows in the model's default ordering (a new list each call)"""
+    return list(get_table(model).rows)
+
+
+def get(model, pk):
+    """Row by primary key; raises model.DoesNotExist like the ORM"""
+    table = get_table(model)
+    try:
+        return table.by_pk[int(pk)]
+    except (KeyError, TypeError, ValueError):
+        raise model.DoesNotExist('%s matching pk=%r does not exist.' % (model.__name__, pk)) from None
+
+
+def find(model, **attrs):
+    """First row whose attributes equal ``attrs``, or None"""
+    for row in get_table(model).rows:
+        if all(getattr(row, name) == value for name, value in attrs.items()):
+            return row
+    return None
+
+
+def choices(model, label=str, predicate=None, key=None):
+    result = [row for row in get_table(model).rows if predicate is None or predicate(row)]
+    if key is not None:
+        result.sort(key=key)
+    return [(row.pk, label(row)) for row in result]
+
+
+class ReferenceChoiceIterator(ModelChoiceIterator):
+    """Yields the choices from the in-process table instead of the queryset"""
+
+    def rows(self):
+        field = self.field
+        result = [row for row in get_table(field.queryset.model).rows
+                  if field.predicate is None or field.predicate(row)]
+        if field.sort_key is not None:
+            result.sort(key=field.sort_key)
+        return result
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for row in self.rows():
+            yield self.choice(row)
+
+    def __len__(self):
+        return len(self.rows()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.rows())
+
+
+class ReferenceModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField for a reference table. Choices and validation are
+    served from memory; ``predicate`` and ``sort_key`` replace queryset
+    filtering and ordering.
+    """
+    iterator = ReferenceChoiceIterator
+
+    def __init__(self, model, predicate=None, sort_key=None, **kwargs):
+        self.predicate = predicate
+        self.sort_key = sort_key
+        super().__init__(queryset=model._default_manager.all(), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        try:
+            row = get(self.queryset.model, value)
+        except self.queryset.model.DoesNotExist:
+            row = None
+        if row is None or (self.predicate is not None and not self.predicate(row)):
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return row
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django.contrib.sites',
     'django_extensions',
     #'debug_toolbar',
@@ -75,8 +76,6 @@ INSTALLED_APPS = [
     'sorl.thumbnail',
     #user-agents
     'django_user_agents',
-    #excel-export
-    'xlwt',
 ]
 
 MIDDLEWARE = [
@@ -275,13 +274,38 @@ USER_AGENTS_CACHE = 'default'
 
 APPEND_SLASH = True
 
+# Student data sheets (controlling.student_pdf) get their own cache, so large
+# PDF batches never evict entries from the default cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'student_pdfs': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'student_pdfs',
+    },
+}
+
+# Gallery multi-file uploads: originals are spooled here and processed by a
+# process pool. The limit applies per web process (each gunicorn/uwsgi worker
+# starts its own pool); 0 = process inside the request
+GALLERY_UPLOAD_DIR = os.path.join(BASE_DIR, 'tmp', 'gallery_uploads')
+GALLERY_UPLOAD_WORKERS = 2
+
 if os.path.isfile(os.path.join(BASE_DIR, 'local_settings.py')):
     from local_settings import *
 
+# local_settings may bring its own CACHES - keep it, only add the PDF cache
+CACHES.setdefault('student_pdfs', {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'student_pdfs',
+})
+
 # Additional Blog Settings - Add these to the end of settings.py
 
 # File Upload Settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+# Larger files are written to a temporary file instead of being held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(2.5 * 1024 * 1024)  # 2.5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000  # For formsets with many fields
 
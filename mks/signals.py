@@ -0,0 +1,35 @@
+from django.db.models.signals import post_save, post_delete
+
+from .media_storage import media_models, release_files
+from .reference_data import invalidate_reference_data, reference_models
+
+
+def invalidate_reference_data_on_change(sender, **kwargs):
+    """
+    Signal handler - reload the reference tables in every process
+    """
+    invalidate_reference_data()
+
+
+for model in reference_models():
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_reference_data_on_change, sender=model,
+        dispatch_uid='reference_data_save_%s' % label)
+    post_delete.connect(
+        invalidate_reference_data_on_change, sender=model,
+        dispatch_uid='reference_data_delete_%s' % label)
+
+
+def release_media_on_delete(sender, instance, **kwargs):
+    """
+    Signal handler - drop the references of a deleted row to its
+    content-addressed files
+    """
+    release_files(instance)
+
+
+for model in media_models():
+    post_delete.connect(
+        release_media_on_delete, sender=model,
+        dispatch_uid='media_release_%s' % model._meta.label_lower)
@@ -0,0 +1,100 @@
+"""
+Content hash manifest for static files.
+
+Maps each static path to a short hash of its content. The manifest is
+written to STATIC_ROOT by ``collectstatic`` and loaded once per process;
+paths missing from it are hashed on first use and remembered (except with
+DEBUG, so edited files show up right away). Asset URLs therefore only
+change when the file itself changes.
+"""
+import hashlib
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+logger = logging.getLogger(__name__)
+
+STATIC_MANIFEST_NAME = 'static-versions.json'
+HASH_LENGTH = 12
+
+_manifest = None
+
+
+def file_hash(path):
+    digest = hashlib.md5(usedforsecurity=False)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def manifest_path():
+    return os.path.join(settings.STATIC_ROOT, STATIC_MANIFEST_NAME)
+
+
+def build_static_manifest(root=None):
+    """
+    Hash every file below ``root`` (STATIC_ROOT by default).
+    """
+    root = root or settings.STATIC_ROOT
+    manifest = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full_path, root).replace(os.sep, '/')
+            if rel_path == STATIC_MANIFEST_NAME:
+                continue
+            manifest[rel_path] = file_hash(full_path)
+    return manifest
+
+
+def write_static_manifest(root=None):
+    manifest = build_static_manifest(root)
+    path = os.path.join(root or settings.STATIC_ROOT, STATIC_MANIFEST_NAME)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, sort_keys=True)
+    reset_static_manifest()
+    return path, len(manifest)
+
+
+def load_static_manifest():
+    """
+    Return the process wide manifest, reading it from disk only once.
+    """
+    global _manifest
+    if _manifest is None:
+        manifest = {}
+        try:
+            with open(manifest_path()) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load static manifest: {e}")
+        _manifest = manifest
+    return _manifest
+
+
+def reset_static_manifest():
+    global _manifest
+    _manifest = None
+
+
+def get_static_version(path):
+    """
+    Return the content hash for a static path, or None if the file
+    cannot be found.
+    """
+    manifest = load_static_manifest()
+    version = manifest.get(path)
+    if version is None:
+        found = finders.find(path)
+        if not found:
+            return None
+        version = file_hash(found)
+        if not settings.DEBUG:
+            manifest[path] = version
+    return version
@@ -1,6 +1,7 @@
 from django import template
 from django.templatetags.static import static
-import time
+
+from mks.static_manifest import get_static_version
 
 register = template.Library()
 
@@ -8,8 +9,11 @@ register = template.Library()
 def versioned_static(path):
     """
     Add a version query parameter to the static file URL to bust cache.
-    The version is the current timestamp to ensure browsers always load the latest version.
+    The version is a hash of the file content (see mks.static_manifest), so the
+    URL stays stable until the file changes and can be cached as immutable.
     """
-    version = int(time.time())
     static_url = static(path)
+    version = get_static_version(path)
+    if version is None:
+        return static_url
     return f"{static_url}?v={version}"
@@ -50,6 +50,7 @@ urlpatterns = [
     path('impressum/', home.views.impressum, name='impressum'),
     path('geschichte/', home.views.history, name='history'),
     path('logo/', home.views.logo, name='logo'),
+    path('slider/<slug:digest>.json', home.views.slider_manifest, name='slider_manifest'),
     path('team/', include('users.urls', namespace='users')),
     path('controlling/', include('controlling.urls', namespace='controlling')),
     path('', include('contact.urls')),
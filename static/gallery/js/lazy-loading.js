@@ -1,38 +1,74 @@
 // Lazy Loading for Gallery Images
-document.addEventListener('DOMContentLoaded', function() {
-    console.log("Lazy Loading für Galerie initialisiert");
-    
+(function() {
     // Optionen für Intersection Observer
     const imageObserverOptions = {
         rootMargin: '50px 0px', // Lade Bilder 50px bevor sie sichtbar werden
         threshold: 0.01
     };
-    
+
+    // srcset aus data-srcset übernehmen (<source>-Elemente eines <picture> und das <img>)
+    function applySrcset(img) {
+        const picture = img.parentElement && img.parentElement.tagName === 'PICTURE' ? img.parentElement : null;
+        const elements = picture ? Array.from(picture.querySelectorAll('source[data-srcset]')) : [];
+        if (img.dataset.srcset) {
+            elements.push(img);
+        }
+        elements.forEach(element => {
+            element.srcset = element.dataset.srcset;
+            element.removeAttribute('data-srcset');
+        });
+    }
+
+    function showImage(img) {
+        applySrcset(img);
+        img.src = img.dataset.src;
+        img.classList.remove('lazy');
+        img.classList.add('loaded');
+        const galleryItem = img.closest('.gallery-item');
+        if (galleryItem) {
+            galleryItem.classList.remove('loading');
+        }
+    }
+
+    // Mit srcset wählt der Browser die passende Datei (AVIF/WebP/JPEG) selbst
+    function showResponsiveImage(img, observer) {
+        observer.unobserve(img);
+        const galleryItem = img.closest('.gallery-item');
+        const done = () => {
+            img.classList.remove('lazy');
+            img.classList.add('loaded');
+            if (galleryItem) {
+                galleryItem.classList.remove('loading');
+            }
+        };
+        img.addEventListener('load', done, {once: true});
+        img.addEventListener('error', done, {once: true});
+        applySrcset(img);
+        img.src = img.dataset.src;
+    }
+
     // Intersection Observer erstellen
-    const imageObserver = new IntersectionObserver((entries, observer) => {
+    const imageObserver = ('IntersectionObserver' in window) ? new IntersectionObserver((entries, observer) => {
         entries.forEach(entry => {
             if (entry.isIntersecting) {
                 const img = entry.target;
                 const galleryItem = img.closest('.gallery-item');
-                
+
+                if (img.dataset.srcset || (img.parentElement && img.parentElement.querySelector('source[data-srcset]'))) {
+                    showResponsiveImage(img, observer);
+                    return;
+                }
+
                 // Temporäres Bild zum Vorabladen
                 const tempImg = new Image();
-                
+
                 tempImg.onload = function() {
-                    // Ersetze src mit data-src
-                    img.src = img.dataset.src;
-                    img.classList.remove('lazy');
-                    img.classList.add('loaded');
-                    
-                    // Entferne Loading-Animation
-                    if (galleryItem) {
-                        galleryItem.classList.remove('loading');
-                    }
-                    
+                    // Ersetze src mit data-src, entferne Loading-Animation
+                    showImage(img);
                     // Beobachtung beenden
                     observer.unobserve(img);
                 };
-                
+
                 tempImg.onerror = function() {
                     console.error('Fehler beim Laden des Bildes:', img.dataset.src);
                     if (galleryItem) {
@@ -40,31 +76,34 @@ document.addEventListener('DOMContentLoaded', function() {
                     }
                     observer.unobserve(img);
                 };
-                
+
                 // Starte das Laden
                 tempImg.src = img.dataset.src;
             }
         });
-    }, imageObserverOptions);
-    
-    // Alle Bilder mit data-src finden und beobachten
-    const lazyImages = document.querySelectorAll('img[data-src]');
-    lazyImages.forEach(img => {
-        img.classList.add('lazy');
-        imageObserver.observe(img);
-    });
-    
-    // Fallback für Browser ohne Intersection Observer
-    if (!('IntersectionObserver' in window)) {
-        console.log('Intersection Observer nicht unterstützt - lade alle Bilder sofort');
+    }, imageObserverOptions) : null;
+
+    // Alle Bilder mit data-src unterhalb von root beobachten - auch für nachgeladene Kacheln
+    function observeLazyImages(root) {
+        const lazyImages = (root || document).querySelectorAll('img[data-src]:not(.loaded)');
         lazyImages.forEach(img => {
-            img.src = img.dataset.src;
-            img.classList.remove('lazy');
-            img.classList.add('loaded');
-            const galleryItem = img.closest('.gallery-item');
-            if (galleryItem) {
-                galleryItem.classList.remove('loading');
+            if (imageObserver) {
+                img.classList.add('lazy');
+                imageObserver.observe(img);
+            } else {
+                // Fallback für Browser ohne Intersection Observer - sofort laden
+                showImage(img);
             }
         });
     }
-});
\ No newline at end of file
+
+    window.observeLazyImages = observeLazyImages;
+
+    document.addEventListener('DOMContentLoaded', function() {
+        console.log("Lazy Loading für Galerie initialisiert");
+        if (!imageObserver) {
+            console.log('Intersection Observer nicht unterstützt - lade alle Bilder sofort');
+        }
+        observeLazyImages(document);
+    });
+})();
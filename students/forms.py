@@ -2,7 +2,9 @@ from django.utils.translation import gettext as _
 from django import forms
 from django.forms import ModelChoiceField
 from teaching.subject import Subject
+from mks.reference_data import ReferenceModelChoiceField
 from datetime import datetime
+from operator import attrgetter
 from phone_field import PhoneField
 
 def get_years_signinform():
@@ -23,9 +25,10 @@ class SignInForm(forms.Form):
     from_email = forms.EmailField(label="E-Mailadresse",
                                   max_length=100,
                                   required=True)
-    subject = forms.ModelChoiceField(queryset=Subject.objects.all().order_by('subject')
-                                     .exclude(hidden_subject=True,)
-                                     .exclude(complementary_subject=True))
+    subject = ReferenceModelChoiceField(
+        Subject,
+        predicate=lambda subject: not subject.hidden_subject and not subject.complementary_subject,
+        sort_key=attrgetter('subject'))
     adress_line = forms.CharField(label="street", max_length=80, required=True)
     house_number = forms.CharField(label="house_number", max_length=80, required=True)
     postal_code = forms.CharField(label="postal_code", max_length=30, required=True)
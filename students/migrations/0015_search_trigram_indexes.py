@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# (Tabelle, Spalte) für die Schüler-/Eltern-Suche (controlling.student_search)
+TRIGRAM_INDEXES = (
+    ('students_student', 'first_name'),
+    ('students_student', 'last_name'),
+    ('students_parent', 'first_name'),
+    ('students_parent', 'last_name'),
+    ('students_parent', 'email'),
+    ('students_parent', 'phone'),
+    ('students_parent', 'postal_code'),
+)
+
+
+def index_name(table, column):
+    return '%s_%s_trgm' % (table, column)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Nur PostgreSQL - andere Datenbanken nutzen den Index im Prozess
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS %s ON %s USING gin (%s gin_trgm_ops)' % (
+                schema_editor.quote_name(index_name(table, column)),
+                schema_editor.quote_name(table),
+                schema_editor.quote_name(column),
+            )
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS %s' % schema_editor.quote_name(index_name(table, column)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0014_alter_parent_phone'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -15,6 +15,7 @@ from django.http import HttpResponse, HttpResponseRedirect
 from .models import Student, Parent
 from .forms import SignInForm
 from teaching.subject import Subject
+from mks import reference_data
 
 def mail_new_student(from_email, student_context, send_mail=True):
     '''
@@ -144,7 +145,7 @@ def signInView(request):
             '''
             now = datetime.datetime.now()
             today = now.date()
-            instrument = Subject.objects.get(id=subject).subject
+            instrument = reference_data.get(Subject, subject).subject
             student_context = {
                 'first_name': first_name,
                 'last_name': last_name,
@@ -2,6 +2,7 @@ from django.contrib import admin
 from .models import Teacher, GroupPhoto
 from .lesson_form import LessonForm
 from .subject import Subject, SubjectCategory
+from .fachgruppe import Fachgruppe
 
 # Register your models here.
 admin.site.register(SubjectCategory)
@@ -9,3 +10,11 @@ admin.site.register(Subject)
 admin.site.register(Teacher)
 admin.site.register(LessonForm)
 admin.site.register(GroupPhoto)
+
+
+@admin.register(Fachgruppe)
+class FachgruppeAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'ordering', 'hidden')
+    list_editable = ('ordering', 'hidden')
+    prepopulated_fields = {'slug': ('name',)}
+    filter_horizontal = ('categories',)
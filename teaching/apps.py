@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TeachingConfig(AppConfig):
     name = 'teaching'
+
+    def ready(self):
+        import teaching.signals
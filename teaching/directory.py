@@ -0,0 +1,144 @@
+"""
+Lehrer-Verzeichnis nach Fachgruppen
+
+Die Seite "Über uns" und die Fachgruppen-Seiten zeigen Lehrende je
+Fachgruppe (SubjectCategory) samt ihren Fächern. Statt pro Fachgruppe und
+pro Lehrer:in abzufragen, wird das Verzeichnis aus einer einzigen Abfrage
+über die Zuordnung Lehrer:in <-> Fach aufgebaut und im Cache gehalten.
+Jede Lehrer:in trägt ihre Fächer in ``subject_list``.
+
+Die Fachgruppen selbst (teaching.fachgruppe) kommen ebenfalls aus einer
+Abfrage: Fachgruppe, zugeordnete Kategorien und deren sichtbare Fächer.
+
+Bei Änderungen an Lehrenden, Fächern, Fachgruppen oder der Zuordnung wird
+das jeweilige Verzeichnis verworfen (teaching.signals).
+"""
+from django.core.cache import cache
+
+from teaching.models import Fachgruppe, Subject, Teacher
+
+DIRECTORY_CACHE_KEY = 'teacher_directory'
+DIRECTORY_CACHE_TIMEOUT = 60 * 60 * 24
+FACHGRUPPEN_CACHE_KEY = 'fachgruppen_registry'
+
+FACHGRUPPE_FIELDS = ('pk', 'name', 'slug', 'intro_text', 'teaser', 'youtube_ids', 'ordering', 'hidden')
+SUBJECT_FIELDS = ('pk', 'subject', 'category_id', 'ordering', 'complementary_subject', 'hidden_subject')
+
+# In der Direktion steht die Direktorin/der Direktor vorne
+DIRECTION_CATEGORY = 'Direktion'
+DIRECTOR_SUBJECT = 'Direktor'
+
+
+def _teacher_sort_key(teacher):
+    return (teacher.last_name, teacher.first_name, teacher.pk)
+
+
+def _director_sort_key(teacher):
+    is_director = any(subject.subject == DIRECTOR_SUBJECT for subject in teacher.subject_list)
+    return (not is_director, *_teacher_sort_key(teacher))
+
+
+def build_teacher_directory():
+    """
+    {Fachgruppe: [Teacher, ...]} aus einer Abfrage. Die Fächer je
+    Lehrer:in sind wie Subject.Meta.ordering sortiert.
+    """
+    assignments = Teacher.subject.through.objects.select_related(
+        'teacher', 'subject__category',
+    ).order_by('subject__ordering', '-subject__complementary_subject', 'subject__subject')
+
+    teachers = {}
+    directory = {}
+    for assignment in assignments:
+        teacher = teachers.get(assignment.teacher_id)
+        if teacher is None:
+            teacher = teachers[assignment.teacher_id] = assignment.teacher
+            teacher.subject_list = []
+        teacher.subject_list.append(assignment.subject)
+        members = directory.setdefault(assignment.subject.category.name, {})
+        members[teacher.pk] = teacher
+
+    return {
+        name: sorted(
+            members.values(),
+            key=_director_sort_key if name == DIRECTION_CATEGORY else _teacher_sort_key,
+        )
+        for name, members in directory.items()
+    }
+
+
+def get_teacher_directory():
+    directory = cache.get(DIRECTORY_CACHE_KEY)
+    if directory is None:
+        directory = build_teacher_directory()
+        cache.set(DIRECTORY_CACHE_KEY, directory, DIRECTORY_CACHE_TIMEOUT)
+    return directory
+
+
+def invalidate_teacher_directory():
+    cache.delete(DIRECTORY_CACHE_KEY)
+
+
+def teachers_in(*category_names, directory=None):
+    """
+    Lehrende einer oder mehrerer Fachgruppen ohne Duplikate, nach Name
+    sortiert (bei einer einzelnen Fachgruppe in deren Reihenfolge)
+    """
+    directory = get_teacher_directory() if directory is None else directory
+    if len(category_names) == 1:
+        return list(directory.get(category_names[0], ()))
+    teachers = {}
+    for name in category_names:
+        for teacher in directory.get(name, ()):
+            teachers.setdefault(teacher.pk, teacher)
+    return sorted(teachers.values(), key=_teacher_sort_key)
+
+
+def build_fachgruppen():
+    """
+    {slug: Fachgruppe} in Anzeige-Reihenfolge. Jede Fachgruppe trägt
+    ``category_ids``, ``category_names`` und ``subject_list`` (ohne
+    versteckte und Ergänzungsfächer).
+    """
+    rows = Fachgruppe.objects.filter(hidden=False).order_by(
+        'ordering', 'name', 'pk', 'categories__name',
+        'categories__subject__ordering', '-categories__subject__complementary_subject',
+        'categories__subject__subject',
+    ).values_list(
+        *FACHGRUPPE_FIELDS, 'categories__pk', 'categories__name',
+        *('categories__subject__' + field for field in SUBJECT_FIELDS),
+    )
+
+    fachgruppen = {}
+    field_count = len(FACHGRUPPE_FIELDS)
+    for row in rows:
+        group_values, (category_id, category_name), subject_values = (
+            row[:field_count], row[field_count:field_count + 2], row[field_count + 2:])
+        fachgruppe = fachgruppen.get(group_values[2])
+        if fachgruppe is None:
+            fachgruppe = Fachgruppe(**dict(zip(('id',) + FACHGRUPPE_FIELDS[1:], group_values)))
+            fachgruppe.category_ids = []
+            fachgruppe.category_names = []
+            fachgruppe.subject_list = []
+            fachgruppen[fachgruppe.slug] = fachgruppe
+        if category_id is not None and category_id not in fachgruppe.category_ids:
+            fachgruppe.category_ids.append(category_id)
+            fachgruppe.category_names.append(category_name)
+        if subject_values[0] is None:
+            continue
+        subject = Subject(**dict(zip(('id',) + SUBJECT_FIELDS[1:], subject_values)))
+        if not subject.hidden_subject and not subject.complementary_subject:
+            fachgruppe.subject_list.append(subject)
+    return fachgruppen
+
+
+def get_fachgruppen():
+    fachgruppen = cache.get(FACHGRUPPEN_CACHE_KEY)
+    if fachgruppen is None:
+        fachgruppen = build_fachgruppen()
+        cache.set(FACHGRUPPEN_CACHE_KEY, fachgruppen, DIRECTORY_CACHE_TIMEOUT)
+    return fachgruppen
+
+
+def invalidate_fachgruppen():
+    cache.delete(FACHGRUPPEN_CACHE_KEY)
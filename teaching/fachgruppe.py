@@ -0,0 +1,35 @@
+from django.db import models
+
+from teaching.subject import SubjectCategory
+
+class Fachgruppe(models.Model):
+    '''
+    Fachgruppe des Bildungsangebots, kann mehrere Kategorien zusammenfassen
+    (z.B. Blasinstrumente = Holz- und Blechblasinstrumente)
+    '''
+    name = models.CharField(max_length=60)
+    slug = models.SlugField(max_length=60, unique=True)
+    categories = models.ManyToManyField(SubjectCategory, blank=True)
+    intro_text = models.TextField(blank=True)
+    # Kurzbeschreibung für die Übersicht, falls keine Fächer angelegt sind
+    teaser = models.CharField(max_length=200, blank=True)
+    youtube_ids = models.CharField(
+        max_length=255, blank=True,
+        help_text='YouTube Video IDs, durch Komma getrennt')
+    ordering = models.IntegerField(default=0)
+    hidden = models.BooleanField(default=False)
+
+    @property
+    def youtube_videos(self):
+        return [video_id.strip() for video_id in self.youtube_ids.split(',') if video_id.strip()]
+
+    def __str__(self):
+        return "%s" % (self.name)
+
+    class Meta: # pylint: disable=too-few-public-methods
+        '''
+        Meta class for Fachgruppe
+        '''
+        ordering = ('ordering', 'name')
+        verbose_name = u'Fachgruppe'
+        verbose_name_plural = u'Fachgruppen'
@@ -1,6 +1,7 @@
 from django.shortcuts import render
 from students.models import Student
 from students.gender import Gender
+from mks import reference_data
 from teaching.models import Teacher
 
 
@@ -24,8 +25,8 @@ def get_all_students(request):
 def get_alibi_pic(image, gender, student):
     gender = str(gender)
     image_url = str(image)
-    gender_male = Gender.objects.get(gender="Male")
-    gender_female = Gender.objects.get(gender="Female")
+    gender_male = reference_data.find(Gender, gender="Male")
+    gender_female = reference_data.find(Gender, gender="Female")
     if image_url == '/media/student_imageDefault' and gender == str(gender_male):
         image = '/media/students/images/signup_male.jpg'
         return image
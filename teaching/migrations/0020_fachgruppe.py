@@ -0,0 +1,32 @@
+# Generated by Django 4.2.21 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0019_remove_teacher_bic_remove_teacher_iban_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Fachgruppe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=60)),
+                ('slug', models.SlugField(max_length=60, unique=True)),
+                ('intro_text', models.TextField(blank=True)),
+                ('teaser', models.CharField(blank=True, max_length=200)),
+                ('youtube_ids', models.CharField(blank=True, help_text='YouTube Video IDs, durch Komma getrennt', max_length=255)),
+                ('ordering', models.IntegerField(default=0)),
+                ('hidden', models.BooleanField(default=False)),
+                ('categories', models.ManyToManyField(blank=True, to='teaching.subjectcategory')),
+            ],
+            options={
+                'verbose_name': 'Fachgruppe',
+                'verbose_name_plural': 'Fachgruppen',
+                'ordering': ('ordering', 'name'),
+            },
+        ),
+    ]
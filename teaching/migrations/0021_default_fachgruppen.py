@@ -0,0 +1,199 @@
+from django.db import migrations
+
+# Bisher fest in teaching.views hinterlegte Fachgruppen
+FACHGRUPPEN = (
+    {
+        'name': 'Blasinstrumente',
+        'slug': 'blasinstrumente',
+        'categories': ('Blechblasinstrumente', 'Holzblasinstrumente'),
+        'teaser': 'Holzblasinstrumente und Blechblasinstrumente',
+        'youtube_ids': 'aOCC8U4ldBI,HeTdrvqdkzg,AkXkj-1mOgg,GP04_HEJwvM,mYLesCKiU8E',
+        'intro_text': (
+            'Die Fachgruppe der Blasinstrumente umfasst ein breites Spektrum, von '
+            'Holzblasinstrumenten wie Querflöte, Klarinette und Saxophon bis hin zu '
+            'Blechblasinstrumenten wie Trompete, Posaune und Horn. Der Unterricht, konzipiert '
+            'nach dem in Österreich gültigen KOMU-Lehrplan (Konferenz der österreichischen '
+            'Musikschulwerke) gemäß unseres vom Ministerium für Bildung genehmigten '
+            'Organisationsstatuts, vermittelt den Studierenden eine solide technische Basis, '
+            'einschließlich korrekter Atemführung, Tonbildung und musikalischer Gestaltung. Das '
+            'Repertoire erstreckt sich von klassischen Werken über Jazzstandards bis hin zu '
+            'zeitgenössischer Musik. Ziel ist die Entwicklung sowohl solistischer Fähigkeiten als '
+            'auch der Kompetenz im Ensemblespiel, um eine aktive Teilnahme am vielfältigen '
+            'Musikleben zu ermöglichen.'
+        ),
+    },
+    {
+        'name': 'Elementare Musikerziehung',
+        'slug': 'elementare-musikerziehung',
+        'categories': ('Elementare Musikerziehung', 'Musikalische Früherziehung'),
+        'teaser': 'Eltern-Kind-Gruppen und Musikunterricht für Kinder',
+        'youtube_ids': '',
+        'intro_text': (
+            'Die Elementare Musikerziehung (EMP) bildet die Basis für eine nachhaltige '
+            'musikalische Entwicklung im Kindesalter, entsprechend den pädagogischen Richtlinien '
+            'des in Österreich gültigen KOMU-Lehrplans (Konferenz der österreichischen '
+            'Musikschulwerke) gemäß unseres vom Ministerium für Bildung genehmigten '
+            'Organisationsstatuts. Im Zentrum steht die spielerische Annäherung an Musik durch '
+            'Singen, rhythmische Bewegung, Tanz und den Umgang mit dem Orff-Instrumentarium. '
+            'Dieses Fach fördert grundlegende musikalische Fertigkeiten, stimuliert die '
+            'Kreativität und unterstützt die Entwicklung sozialer Kompetenzen. Die EMP verfolgt '
+            'einen ganzheitlichen Ansatz, der die natürliche Musikalität der Kinder fördert und '
+            'eine optimale Vorbereitung auf den weiterführenden Instrumental- oder '
+            'Vokalunterricht darstellt.'
+        ),
+    },
+    {
+        'name': 'Musikkunde',
+        'slug': 'musikkunde',
+        'categories': ('Musikkunde', 'Theorie'),
+        'teaser': 'Elementar, Unterstufe, Mittelstufe, Oberstufe',
+        'youtube_ids': '',
+        'intro_text': (
+            'Das Fach Musikkunde bietet eine umfassende Einführung in die Grundlagen der '
+            'Musiktheorie und Gehörbildung, orientiert am in Österreich gültigen KOMU-Lehrplan '
+            '(Konferenz der österreichischen Musikschulwerke) gemäß unseres vom Ministerium für '
+            'Bildung genehmigten Organisationsstatuts. Die Lerninhalte umfassen Notationskunde, '
+            'Rhythmusschulung, Harmonielehre sowie die Analyse musikalischer Formen und '
+            'Strukturen. Darüber hinaus werden Einblicke in die Musikgeschichte und verschiedene '
+            'Stilrichtungen vermittelt. Ziel des Musikkundeunterrichts ist es, das praktische '
+            'Musizieren durch theoretisches Wissen zu ergänzen, das Hörvermögen zu schulen und '
+            'ein tiefergehendes Verständnis für musikalische Zusammenhänge zu entwickeln, was für '
+            'eine umfassende musikalische Bildung unerlässlich ist.'
+        ),
+    },
+    {
+        'name': 'Schlaginstrumente',
+        'slug': 'schlaginstrumente',
+        'categories': ('Schlaginstrumente', 'Schlagwerk'),
+        'teaser': 'Drumset, Jazz Mallets, Percussion, Stabspiele',
+        'youtube_ids': 'w8yg-ZHYYAA',
+        'intro_text': (
+            'Die Ausbildung an Schlaginstrumenten, basierend auf dem in Österreich gültigen '
+            'KOMU-Lehrplan (Konferenz der österreichischen Musikschulwerke) gemäß unseres vom '
+            'Ministerium für Bildung genehmigten Organisationsstatuts, umfasst ein vielseitiges '
+            'Instrumentarium, darunter das klassische Orchester-Schlagwerk (z.B. Pauken, kleine '
+            'Trommel), Mallet-Instrumente (Xylophon, Marimbaphon, Vibraphon) und das Drumset für '
+            'Popularmusik und Jazz. Der Unterricht fokussiert auf die Entwicklung rhythmischer '
+            'Präzision, technischer Fertigkeiten, koordinativer Fähigkeiten und musikalischer '
+            'Ausdruckskraft. Die Studierenden werden auf das solistische Spiel sowie auf das '
+            'Mitwirken in diversen Ensembles und Orchestern vorbereitet, wobei ein breites '
+            'stilistisches Spektrum abgedeckt wird.'
+        ),
+    },
+    {
+        'name': 'Gesang',
+        'slug': 'stimmbildung',
+        'categories': ('Stimmbildung', 'Gesang'),
+        'teaser': 'Klassischer Gesang, Rock/Pop-Gesang, Jazz-Gesang, Chöre',
+        'youtube_ids': 'ESVykNyE3tY,64DIUyJyXeM',
+        'intro_text': (
+            'Das Fach Stimmbildung und Gesang zielt auf die Kultivierung der Stimme als '
+            'persönliches Musikinstrument ab, im Einklang mit den gesangspädagogischen Prinzipien '
+            'gemäß dem in Österreich gültigen KOMU-Lehrplan (Konferenz der österreichischen '
+            'Musikschulwerke) und unserem vom Ministerium für Bildung genehmigten '
+            'Organisationsstatut. Im Vordergrund stehen die Erarbeitung einer gesunden '
+            'Gesangstechnik durch Schulung von Atmung, Körperhaltung, Stütze, Artikulation und '
+            'Resonanz. Das Repertoire umfasst verschiedene Epochen und Stilrichtungen. Der '
+            'Unterricht fördert die Erweiterung des stimmlichen Umfangs, die Verbesserung der '
+            'Intonation und die Entwicklung der interpretatorischen Fähigkeiten, um sowohl '
+            'solistischen als auch chorischen Anforderungen gerecht zu werden.'
+        ),
+    },
+    {
+        'name': 'Streichinstrumente',
+        'slug': 'streichinstrumente',
+        'categories': ('Streichinstrumente',),
+        'teaser': 'Kontrabass, Viola, Violine, Violoncello',
+        'youtube_ids': 'rVTWes-vLL4,cI4jhzFOBoQ',
+        'intro_text': (
+            'Die Streichinstrumente – Violine, Viola, Violoncello und Kontrabass – bilden eine '
+            'zentrale Säule der abendländischen Musiktradition. Der Unterricht, ausgerichtet an '
+            'den Standards des in Österreich gültigen KOMU-Lehrplans (Konferenz der '
+            'österreichischen Musikschulwerke) gemäß unserem vom Ministerium für Bildung '
+            'genehmigten Organisationsstatut, legt Wert auf eine fundierte technische Ausbildung, '
+            'die Aspekte wie Haltung, Bogenführung, Intonation und Klanggestaltung umfasst. Die '
+            'Studierenden erarbeiten ein breit gefächertes Repertoire, das solistische Literatur '
+            'ebenso wie Kammermusik und Orchesterpartien einschließt. Ziel ist die Heranbildung '
+            'versierter Instrumentalisten, die zur aktiven Teilnahme am Musikleben befähigt sind.'
+        ),
+    },
+    {
+        'name': 'Tanz und Bewegung',
+        'slug': 'tanz-und-bewegung',
+        'categories': ('Tanz und Bewegung',),
+        'teaser': 'Tanz- und Bewegungsprogramm',
+        'youtube_ids': '',
+        'intro_text': '',
+    },
+    {
+        'name': 'Tasteninstrumente',
+        'slug': 'tasteninstrumente',
+        'categories': ('Tasteninstrumente',),
+        'teaser': 'Akkordeon, Cembalo, Klavier, Pfeifenorgel',
+        'youtube_ids': 'fi8ZGiB-lSc,NaTwXuR4VwM,Wh-uAzNYsLU,XhqeetX6NFo',
+        'intro_text': (
+            'Die Fachgruppe der Tasteninstrumente, zu der Klavier, Orgel, Cembalo, Akkordeon und '
+            'elektronische Tasteninstrumente zählen, eröffnet den Zugang zu einem umfangreichen '
+            'musikalischen Repertoire. Gemäß dem in Österreich gültigen KOMU-Lehrplan (Konferenz '
+            'der österreichischen Musikschulwerke) und unserem vom Ministerium für Bildung '
+            'genehmigten Organisationsstatut werden im Unterricht fundierte spieltechnische '
+            'Fertigkeiten, musiktheoretisches Wissen sowie Kenntnisse in verschiedenen '
+            'Stilrichtungen von der Alten Musik bis zur Moderne vermittelt. Die Ausbildung zielt '
+            'darauf ab, die Studierenden sowohl zu solistischen Leistungen als auch zur '
+            'kompetenten Liedbegleitung und zum Ensemblespiel zu befähigen.'
+        ),
+    },
+    {
+        'name': 'Zupfinstrumente',
+        'slug': 'zupfinstrumente',
+        'categories': ('Zupfinstrumente',),
+        'teaser': 'E-Gitarre, E-Bass, Gitarre, Harfe, Zither',
+        'youtube_ids': 'v30Zs04SwTU,CO9peHPN-_Q,jQUk2C51T5c,2kBBFfEORmw',
+        'intro_text': (
+            'Die Fachgruppe der Zupfinstrumente umfasst Instrumente wie Gitarre, E-Gitarre, '
+            'Harfe, Hackbrett und Zither, die sich durch eine charakteristische Tonerzeugung und '
+            'klangliche Vielfalt auszeichnen. Der Unterricht, orientiert am in Österreich '
+            'gültigen KOMU-Lehrplan (Konferenz der österreichischen Musikschulwerke) gemäß '
+            'unserem vom Ministerium für Bildung genehmigten Organisationsstatut, vermittelt die '
+            'instrumentenspezifischen Spieltechniken und führt in ein breites musikalisches '
+            'Spektrum ein, das von Volksmusik über Klassik bis hin zu Jazz und Pop reicht. Die '
+            'Ausbildung fördert die musikalische Ausdrucksfähigkeit, die interpretatorische '
+            'Kompetenz und die Vorbereitung auf solistische Darbietungen sowie das Musizieren in '
+            'verschiedenen Ensembleformen.'
+        ),
+    },
+)
+
+
+def create_fachgruppen(apps, schema_editor):
+    Fachgruppe = apps.get_model('teaching', 'Fachgruppe')
+    SubjectCategory = apps.get_model('teaching', 'SubjectCategory')
+    for ordering, data in enumerate(FACHGRUPPEN):
+        fachgruppe, created = Fachgruppe.objects.get_or_create(
+            slug=data['slug'],
+            defaults={
+                'name': data['name'],
+                'teaser': data['teaser'],
+                'youtube_ids': data['youtube_ids'],
+                'intro_text': data['intro_text'],
+                'ordering': ordering,
+            },
+        )
+        if created:
+            fachgruppe.categories.set(SubjectCategory.objects.filter(name__in=data['categories']))
+
+
+def delete_fachgruppen(apps, schema_editor):
+    Fachgruppe = apps.get_model('teaching', 'Fachgruppe')
+    Fachgruppe.objects.filter(slug__in=[data['slug'] for data in FACHGRUPPEN]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0020_fachgruppe'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fachgruppen, delete_fachgruppen),
+    ]
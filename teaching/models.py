@@ -9,6 +9,7 @@ from phone_field import PhoneField
 from location.models import Location, Country
 from users.models import CustomUser
 from teaching.subject import Subject, SubjectCategory
+from teaching.fachgruppe import Fachgruppe
 
 
 class GroupPhoto(models.Model):
@@ -1,77 +1,35 @@
-from django.shortcuts import render, redirect
-from django.db.models import Case, When, Value, IntegerField
+from django.shortcuts import render
 
-from teaching.models import Teacher, GroupPhoto
-from teaching.subject import SubjectCategory, Subject
+from teaching.models import GroupPhoto
+from teaching.subject import SubjectCategory
+from teaching.directory import get_teacher_directory, teachers_in
 
 def get_teachers_from_category(subject_name):
-    i = 1
-    y = None  # Initialisiere y
-    from django.core.exceptions import ObjectDoesNotExist
-    try:
-        category = SubjectCategory.objects.get(name=subject_name)
-        subjects = category.subject_set.all()
-        
-        if not subjects.exists():  # Wenn keine Subjects vorhanden sind
-            from django.db.models import QuerySet
-            return Teacher.objects.none()  # Leeres QuerySet zurückgeben
-        
-        for x in subjects:
-            ''''
-            y = new query set
-            '''
-            z = x.teacher_set.all()
-            if i > 1:
-                y = y | z
-            else:
-                y = z
-            i += 1
-        return y.distinct() if y is not None else Teacher.objects.none()
-    except ObjectDoesNotExist:
-        return Teacher.objects.none()  # Statt None ein leeres QuerySet zurückgeben
-        
+    '''
+    Lehrende einer Fachgruppe aus dem Lehrer-Verzeichnis (teaching.directory)
+    '''
+    return teachers_in(subject_name)
+
 def show_teacher_view(request):
     group_photo = GroupPhoto.objects.all().first()
     categories = SubjectCategory.objects.all()
-    teacher_picked = get_teachers_from_category("Zupfinstrumente")
-    teacher_keys = get_teachers_from_category("Tasteninstrumente")
-    teacher_strings = get_teachers_from_category("Streichinstrumente")
-    teacher_brass = get_teachers_from_category("Blechblasinstrumente")
-    teacher_drums = get_teachers_from_category("Schlagwerk")
-    teacher_vocal = get_teachers_from_category("Gesang")
-    teacher_wood = get_teachers_from_category("Holzblasinstrumente")
-    teacher_dance = get_teachers_from_category("Tanz")
-    
-    # Retrieve the QuerySet for the Direktion group
-    director_qs = get_teachers_from_category("Direktion")
-    
-    # Annotate each teacher with a flag 'is_director'
-    # Check if any subject has the name "Direktor"
-    director = director_qs.annotate(
-        is_director=Case(
-            When(subject__subject="Direktor", then=Value(0)),
-            default=Value(1),
-            output_field=IntegerField()
-        )
-    ).order_by("is_director", "last_name")
-    
-    secretary = get_teachers_from_category("Sekretariat")
-    elementary_teaching = get_teachers_from_category("Musikalische Früherziehung")
-    
+    # Ein Verzeichnis für alle Abschnitte der Seite
+    directory = get_teacher_directory()
+
     context = {
         'group_photo': group_photo,
         'categories': categories,
-        'director': director,
-        'secretary': secretary,
-        'teacher_picked': teacher_picked,
-        'teacher_keys': teacher_keys,
-        'teacher_strings': teacher_strings,
-        'teacher_brass': teacher_brass,
-        'teacher_drums': teacher_drums,
-        'teacher_vocal': teacher_vocal,
-        'teacher_wood': teacher_wood,
-        'teacher_dance': teacher_dance,
-        'elementary_teaching': elementary_teaching,
+        # Direktor:in zuerst, dann nach Nachname
+        'director': teachers_in("Direktion", directory=directory),
+        'secretary': teachers_in("Sekretariat", directory=directory),
+        'teacher_picked': teachers_in("Zupfinstrumente", directory=directory),
+        'teacher_keys': teachers_in("Tasteninstrumente", directory=directory),
+        'teacher_strings': teachers_in("Streichinstrumente", directory=directory),
+        'teacher_brass': teachers_in("Blechblasinstrumente", directory=directory),
+        'teacher_drums': teachers_in("Schlagwerk", directory=directory),
+        'teacher_vocal': teachers_in("Gesang", directory=directory),
+        'teacher_wood': teachers_in("Holzblasinstrumente", directory=directory),
+        'teacher_dance': teachers_in("Tanz", directory=directory),
+        'elementary_teaching': teachers_in("Musikalische Früherziehung", directory=directory),
     }
     return render(request, 'teaching/all_teachers.html', context)
-
@@ -0,0 +1,53 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from .directory import invalidate_fachgruppen, invalidate_teacher_directory
+from .fachgruppe import Fachgruppe
+from .models import Teacher
+from .subject import Subject, SubjectCategory
+
+# Models deren Änderungen das Lehrer-Verzeichnis beeinflussen
+DIRECTORY_MODELS = (Teacher, Subject, SubjectCategory)
+# Models deren Änderungen die Fachgruppen beeinflussen
+FACHGRUPPEN_MODELS = (Fachgruppe, Subject, SubjectCategory)
+
+
+def invalidate_directory_on_change(sender, **kwargs):
+    """
+    Signal handler - Lehrer-Verzeichnis beim nächsten Aufruf neu aufbauen
+    """
+    invalidate_teacher_directory()
+
+
+for model in DIRECTORY_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_directory_on_change, sender=model,
+        dispatch_uid='teacher_directory_save_%s' % label)
+    post_delete.connect(
+        invalidate_directory_on_change, sender=model,
+        dispatch_uid='teacher_directory_delete_%s' % label)
+
+m2m_changed.connect(
+    invalidate_directory_on_change, sender=Teacher.subject.through,
+    dispatch_uid='teacher_directory_subjects')
+
+
+def invalidate_fachgruppen_on_change(sender, **kwargs):
+    """
+    Signal handler - Fachgruppen beim nächsten Aufruf neu laden
+    """
+    invalidate_fachgruppen()
+
+
+for model in FACHGRUPPEN_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(
+        invalidate_fachgruppen_on_change, sender=model,
+        dispatch_uid='fachgruppen_save_%s' % label)
+    post_delete.connect(
+        invalidate_fachgruppen_on_change, sender=model,
+        dispatch_uid='fachgruppen_delete_%s' % label)
+
+m2m_changed.connect(
+    invalidate_fachgruppen_on_change, sender=Fachgruppe.categories.through,
+    dispatch_uid='fachgruppen_categories')
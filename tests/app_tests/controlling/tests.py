@@ -1,3 +1,336 @@
+import datetime
+import io
+import os
+import tempfile
+import zipfile
+from unittest import mock
+
+from PyPDF2 import PdfReader
+
 from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+
+from controlling.pdf import link_callback, reset_resource_cache
+from controlling.roster import roster_page, roster_queryset, roster_row
+from controlling.statistics import get_statistics, teacher_counts
+from controlling.student_pdf import pdf_cache, render_student_pdf, render_student_pdfs
+from controlling.student_search import search_students
+from controlling.teacher_search import TEACHER_PAGE_SIZE, annotate_teacher_flags, search_teachers
+from students.gender import Gender
+from students.models import Parent, Student
+from teaching.models import Teacher
+from teaching.subject import Subject, SubjectCategory
+from users.models import CustomUser
+
+
+class ControllingStatisticsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        gender = Gender.objects.create(gender='w')
+        self.strings = SubjectCategory.objects.create(name='Streicher')
+        self.brass = SubjectCategory.objects.create(name='Blechbläser')
+        violin = Subject.objects.create(subject='Violine', category=self.strings)
+        trumpet = Subject.objects.create(subject='Trompete', category=self.brass)
+        Student.objects.create(first_name='Anna', last_name='A', subject=violin)
+        Student.objects.create(first_name='Ben', last_name='B', subject=violin)
+        Student.objects.create(first_name='Cleo', last_name='C', subject=trumpet)
+        coordinator = Teacher.objects.create(
+            first_name='Eva', last_name='E', gender=gender, email='eva@example.com', phone='')
+        coordinator.subject_coordinator.add(self.strings, self.brass)
+        Teacher.objects.create(first_name='Max', last_name='M', gender=gender, email='', phone='')
+
+    def test_statistics_use_one_query_per_model(self):
+        with self.assertNumQueries(3):
+            statistics = get_statistics()
+        self.assertEqual(statistics['total_students'], 3)
+        self.assertEqual(statistics['students_by_category'][self.strings.id], 2)
+        self.assertEqual(statistics['students_by_category'][self.brass.id], 1)
+        self.assertEqual(statistics['total_subjects'], 2)
+        self.assertEqual(statistics['teachers'], {
+            'total': 2, 'coordinators': 1, 'with_email': 1, 'with_phone': 0,
+        })
+        with self.assertNumQueries(0):
+            get_statistics()
+
+    def test_statistics_invalidated_on_change(self):
+        get_statistics()
+        Student.objects.create(first_name='Dora', last_name='D')
+        self.assertEqual(get_statistics()['total_students'], 4)
+        Teacher.objects.get(first_name='Max').subject_coordinator.add(self.brass)
+        self.assertEqual(get_statistics()['teachers']['coordinators'], 2)
+
+    def test_teacher_counts_for_filtered_queryset(self):
+        counts = teacher_counts(Teacher.objects.filter(first_name='Eva').distinct())
+        self.assertEqual(counts['total'], 1)
+        self.assertEqual(counts['coordinators'], 1)
+
+
+class StudentRosterTestCase(TestCase):
+    def setUp(self):
+        category = SubjectCategory.objects.create(name='Streicher')
+        other = SubjectCategory.objects.create(name='Tasten')
+        violin = Subject.objects.create(subject='Violine', category=category)
+        piano = Subject.objects.create(subject='Klavier', category=other)
+        gender = Gender.objects.create(gender='m')
+        parent = Parent.objects.create(first_name='P', last_name='P', gender=gender, phone='0123')
+        teacher = Teacher.objects.create(first_name='T', last_name='T', gender=gender)
+        start = datetime.date(2024, 9, 1)
+        for i in range(7):
+            Student.objects.create(
+                first_name='S%d' % i, last_name='L', subject=violin if i % 2 else piano,
+                teacher=teacher, parent=parent,
+                start_date=start + datetime.timedelta(days=i // 2))
+        self.category = category
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+
+    def fetch_all(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=3)
+            if cursor:
+                query['cursor'] = cursor
+            data = self.client.get(reverse('controlling:student_roster_api'), query).json()
+            ids.extend(row['id'] for row in data['students'])
+            cursor = data['next_cursor']
+            if not cursor:
+                return ids
+
+    def test_keyset_pages_cover_all_students_in_order(self):
+        expected = list(Student.objects.order_by('-start_date', '-id').values_list('id', flat=True))
+        self.assertEqual(self.fetch_all(), expected)
+
+    def test_filter_by_category(self):
+        expected = list(Student.objects.filter(subject__category=self.category)
+                        .order_by('-start_date', '-id').values_list('id', flat=True))
+        self.assertEqual(self.fetch_all(category=self.category.id), expected)
+
+    def test_page_costs_one_query(self):
+        with self.assertNumQueries(1):
+            students, cursor = roster_page(roster_queryset(), page_size=3)
+            rows = [roster_row(student) for student in students]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['parent_phone'], '0123')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('controlling:student_roster_api'), {'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_html_view_renders_first_page(self):
+        response = self.client.get(reverse('controlling:get_controlling_students'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-next-cursor')
+
+
+class StudentExportTestCase(TestCase):
+    def setUp(self):
+        category = SubjectCategory.objects.create(name='Streicher')
+        violin = Subject.objects.create(subject='Violine', category=category)
+        gender = Gender.objects.create(gender='w')
+        parent = Parent.objects.create(first_name='Paula', last_name='P', gender=gender, email='p@example.com')
+        Student.objects.create(first_name='Anna', last_name='A & B', subject=violin, parent=parent,
+                               start_date=datetime.date(2024, 9, 1))
+        Student.objects.create(first_name='Ben', last_name='B', start_date=datetime.date(2024, 9, 2))
+        self.category = category
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+
+    def test_xlsx_export_streams_a_valid_workbook(self):
+        response = self.client.get(reverse('controlling:export_students_xls'))
+        self.assertTrue(response.streaming)
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        content = b''.join(response.streaming_content)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('Anmeldedatum', sheet)
+        self.assertIn('A &amp; B', sheet)
+
+    def test_csv_export_filtered_by_category(self):
+        response = self.client.get(reverse('controlling:export_students_xls'),
+                                   {'id': self.category.id, 'format': 'csv'})
+        self.assertIn('_FG_Streicher_', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('Anmeldedatum;Eltern Vorname'))
+        self.assertTrue(lines[1].startswith('2024-09-01;Paula;P;Anna;A & B;p@example.com'))
+
+    def test_teacher_export(self):
+        Teacher.objects.create(first_name='Eva', last_name='E', gender=Gender.objects.get())
+        response = self.client.get(reverse('controlling:export_teachers'), {'format': 'csv'})
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[1].split(';')[1:3], ['Eva', 'E'])
+
+
+class StudentPdfTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        pdf_cache().clear()
+        category = SubjectCategory.objects.create(name='Streicher')
+        violin = Subject.objects.create(subject='Violine', category=category)
+        gender = Gender.objects.create(gender='w')
+        self.parent = Parent.objects.create(first_name='Paula', last_name='P', gender=gender)
+        self.students = [
+            Student.objects.create(first_name='Anna', last_name='A', subject=violin, parent=self.parent),
+            Student.objects.create(first_name='Ben', last_name='B', subject=violin, parent=self.parent),
+        ]
+        self.category = category
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+
+    def test_pdf_cached_until_data_changes(self):
+        student = Student.objects.select_related('parent').get(pk=self.students[0].pk)
+        with mock.patch('controlling.student_pdf.html_to_pdf', return_value=b'%PDF') as html_to_pdf:
+            render_student_pdf(student)
+            render_student_pdf(student)
+            self.assertEqual(html_to_pdf.call_count, 1)
+            # Nicht im Standard-Cache
+            cache.clear()
+            render_student_pdf(student)
+            self.assertEqual(html_to_pdf.call_count, 1)
+            student.parent.city = 'St. Pölten'
+            render_student_pdf(student)
+            self.assertEqual(html_to_pdf.call_count, 2)
+
+    def test_batch_renders_in_process_pool(self):
+        pdfs = render_student_pdfs(Student.objects.select_related('parent'), workers=2)
+        self.assertEqual([student.pk for student, pdf in pdfs], [s.pk for s in self.students])
+        self.assertTrue(all(pdf.startswith(b'%PDF') for student, pdf in pdfs))
+        with mock.patch('controlling.student_pdf.html_to_pdf') as html_to_pdf:
+            render_student_pdfs(Student.objects.select_related('parent'))
+            html_to_pdf.assert_not_called()
+
+    def test_batch_view_zip_and_merged_pdf(self):
+        url = reverse('controlling:generate_students_pdf_batch')
+        response = self.client.get(url, {'category': self.category.id})
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(len(archive.namelist()), 2)
+        response = self.client.get(url, {'category': self.category.id, 'format': 'pdf'})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(len(PdfReader(io.BytesIO(response.content)).pages), 2)
+
+    def test_single_pdf_reports_server_timing(self):
+        url = reverse('controlling:generate_student_pdf', args=[self.students[0].pk])
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('template;dur=', response['Server-Timing'])
+        self.assertIn('pdf;dur=', response['Server-Timing'])
+        response = self.client.get(url)
+        self.assertNotIn('pdf;dur=', response['Server-Timing'])
+
+
+class PdfResourceTestCase(TestCase):
+    def setUp(self):
+        reset_resource_cache()
+
+    def test_resource_resolved_once(self):
+        with tempfile.TemporaryDirectory() as root, self.settings(STATIC_ROOT=root, STATIC_URL='/static/'):
+            with open(os.path.join(root, 'logo.png'), 'wb') as f:
+                f.write(b'png')
+            with mock.patch('controlling.pdf.os.path.isfile', wraps=os.path.isfile) as isfile:
+                for _ in range(3):
+                    self.assertEqual(link_callback('/static/logo.png', None), os.path.join(root, 'logo.png'))
+                self.assertEqual(isfile.call_count, 1)
+            self.assertEqual(link_callback('https://example.com/a.png', None), 'https://example.com/a.png')
+            with self.assertRaises(Exception):
+                link_callback('/static/missing.png', None)
+
+
+class StudentSearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        gender = Gender.objects.create(gender='w')
+        huber = Parent.objects.create(first_name='Maria', last_name='Huber', gender=gender,
+                                      email='maria.huber@example.com', phone='0664 1234567', postal_code='3100')
+        gruber = Parent.objects.create(first_name='Karl', last_name='Gruber', gender=gender, postal_code='3500')
+        self.anna = Student.objects.create(first_name='Anna', last_name='Huber', parent=huber)
+        self.lukas = Student.objects.create(first_name='Lukas', last_name='Huber', parent=huber)
+        self.johanna = Student.objects.create(first_name='Johanna', last_name='Gruber', parent=gruber)
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+
+    def ids(self, query):
+        return [student.id for student, score in search_students(query)]
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.ids('anna huber'), [self.anna.id])
+        self.assertEqual(set(self.ids('huber')), {self.anna.id, self.lukas.id})
+
+    def test_typo_and_prefix(self):
+        self.assertIn(self.johanna.id, self.ids('johana'))
+        self.assertEqual(self.ids('luk'), [self.lukas.id])
+
+    def test_parent_fields(self):
+        self.assertEqual(set(self.ids('maria.huber@example.com')), {self.anna.id, self.lukas.id})
+        self.assertEqual(self.ids('3500'), [self.johanna.id])
+        self.assertEqual(set(self.ids('1234567')), {self.anna.id, self.lukas.id})
+
+    def test_exact_match_ranks_first(self):
+        results = search_students('gruber')
+        self.assertEqual(results[0][0].id, self.johanna.id)
+        self.assertEqual(results[0][1], 1.0)
+
+    def test_index_updated_on_change(self):
+        self.assertEqual(self.ids('karl'), [self.johanna.id])
+        Student.objects.create(first_name='Karla', last_name='Berger')
+        self.assertEqual(len(self.ids('karl')), 2)
+        self.johanna.parent.first_name = 'Peter'
+        self.johanna.parent.save()
+        self.assertEqual(len(self.ids('karl')), 1)
+
+    def test_api(self):
+        response = self.client.get(reverse('controlling:student_search_api'), {'q': 'Huber Lukas'})
+        results = response.json()['results']
+        self.assertEqual([row['id'] for row in results], [self.lukas.id])
+        self.assertEqual(results[0]['parent_email'], 'maria.huber@example.com')
+        response = self.client.get(reverse('controlling:student_search_api'), {'q': 'h'})
+        self.assertEqual(response.json()['results'], [])
+
+
+class TeacherListTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        gender = Gender.objects.create(gender='w')
+        strings = SubjectCategory.objects.create(name='Streicher')
+        self.violin = Subject.objects.create(subject='Violine', category=strings)
+        self.viola = Subject.objects.create(subject='Viola', category=strings)
+        for i in range(30):
+            teacher = Teacher.objects.create(first_name='T%02d' % i, last_name='Lehrer', gender=gender,
+                                             email='t%d@example.com' % i if i % 2 else '', phone='')
+            teacher.subject.add(self.violin, self.viola)
+        self.coordinator = Teacher.objects.get(first_name='T00')
+        self.coordinator.subject_coordinator.add(strings)
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+
+    def test_subject_search_without_duplicates(self):
+        teachers = search_teachers(query='Viol')
+        self.assertEqual(teachers.count(), 30)
+        self.assertEqual(len(list(teachers)), 30)
+        self.assertEqual(search_teachers(query='T01').get().first_name, 'T01')
+
+    def test_flags_annotated(self):
+        teacher = annotate_teacher_flags(Teacher.objects.filter(pk=self.coordinator.pk)).get()
+        self.assertTrue(teacher.is_coordinator)
+        self.assertFalse(teacher.has_email)
+        self.assertEqual(teacher_counts(search_teachers(query='Viol', subject_id=self.violin.id)), {
+            'total': 30, 'coordinators': 1, 'with_email': 15, 'with_phone': 0,
+        })
+
+    def test_list_is_paginated(self):
+        url = reverse('controlling:get_controlling_teachers')
+        response = self.client.get(url, {'search': 'Viol'})
+        self.assertEqual(len(response.context['teachers']), TEACHER_PAGE_SIZE)
+        self.assertEqual(response.context['total_count'], 30)
+        self.assertContains(response, 'Seite 1 von 2')
+        self.assertContains(response, 'search=Viol&amp;page=2')
+        response = self.client.get(url, {'search': 'Viol', 'page': 2})
+        self.assertEqual(len(response.context['teachers']), 30 - TEACHER_PAGE_SIZE)
 
-# Create your tests here.
+    def test_api_search(self):
+        response = self.client.get(reverse('controlling:teacher_api_search'), {'q': 'viola'})
+        teachers = response.json()['teachers']
+        self.assertEqual(len(teachers), 10)
+        self.assertEqual(teachers[0]['name'], 'T00 Lehrer')
+        self.assertCountEqual(teachers[0]['subjects'], ['Violine', 'Viola'])
@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from gallery.gallery_api import decode_cursor, encode_cursor, get_manifest, get_photo_page
+from gallery.models import Photo, PhotoCategory
+
+
+class GalleryApiTestCase(TestCase):
+    """Cursor-Pagination, Manifeste und ETags der Galerie-API"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = PhotoCategory.objects.create(title='Konzerte', ordering=1)
+        self.other = PhotoCategory.objects.create(title='Feste', ordering=2)
+        self.elearning = PhotoCategory.objects.create(title='E-Learning', ordering=3)
+
+    def create_photo(self, name, ordering, category=None, **kwargs):
+        # Dateinamen ohne Dateien - Lazy Image und Thumbnail gelten als vorhanden
+        fields = {
+            'image_width': 800, 'image_height': 600, 'image_health': Photo.IMAGE_OK,
+            **kwargs,
+        }
+        return Photo.objects.create(
+            title=name,
+            image='gallery/images/%s.jpg' % name,
+            image_lazy='gallery/images/lazy/%s.jpg' % name,
+            image_thumbnail='gallery/images/thumbnail/%s.jpg' % name,
+            ordering=ordering, category=category or self.category, **fields,
+        )
+
+    def fetch(self, **params):
+        response = self.client.get(reverse('gallery_api_photos'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages_cover_all_photos_in_order(self):
+        photos = [self.create_photo('foto%s' % i, i % 3) for i in range(7)]
+        self.create_photo('ohne', None)
+        self.create_photo('elearning', 99, category=self.elearning)
+        self.create_photo('fehlt', 50, image_health=Photo.IMAGE_MISSING)
+
+        seen = []
+        page = self.fetch(limit=3)
+        while True:
+            seen.extend(photo['title'] for photo in page['photos'])
+            if not page['next']:
+                break
+            page = self.fetch(limit=3, cursor=page['next'])
+
+        expected = [p.title for p in sorted(photos, key=lambda p: (-p.ordering, -p.id))] + ['ohne']
+        self.assertEqual(seen, expected)
+
+    def test_page_uses_stored_dimensions(self):
+        self.create_photo('hoch', 1, image_width=600, image_height=900)
+        photo = self.fetch()['photos'][0]
+        self.assertEqual(photo['orientation'], 'portrait')
+        self.assertEqual((photo['width'], photo['height']), (600, 900))
+        self.assertTrue(photo['image'].endswith('gallery/images/hoch.jpg'))
+        self.assertTrue(photo['lazy'].endswith('gallery/images/lazy/hoch.jpg'))
+
+    def test_page_needs_no_count_query(self):
+        for i in range(5):
+            self.create_photo('foto%s' % i, i)
+        with self.assertNumQueries(1):
+            page = get_photo_page(limit=2)
+        self.assertEqual(len(page['photos']), 2)
+        self.assertIsNotNone(page['next'])
+
+    def test_category_filter(self):
+        self.create_photo('konzert', 1)
+        self.create_photo('fest', 2, category=self.other)
+        titles = [photo['title'] for photo in self.fetch(category=self.other.pk)['photos']]
+        self.assertEqual(titles, ['fest'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('gallery_api_photos'), {'cursor': 'kaputt'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(5, 12)), (5, 12))
+        self.assertEqual(decode_cursor(encode_cursor(None, 3)), (None, 3))
+
+    def test_manifest_is_cached_and_etagged(self):
+        first = self.create_photo('eins', 1)
+        second = self.create_photo('zwei', 2)
+        url = reverse('gallery_api_category_manifest', args=[self.category.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['ids'], [second.pk, first.pk])
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_manifest(self.category.pk)['ids'], [second.pk, first.pk])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Jede Änderung setzt eine neue Version
+        first.ordering = 3
+        first.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ids'], [first.pk, second.pk])
+
+    def test_unknown_or_hidden_category_manifest(self):
+        for category_id in (self.elearning.pk, 9999):
+            response = self.client.get(reverse('gallery_api_category_manifest', args=[category_id]))
+            self.assertEqual(response.status_code, 404)
+
+    def test_gallery_view_ships_first_page_only(self):
+        for i in range(30):
+            self.create_photo('foto%s' % i, i)
+        response = self.client.get(reverse('gallery_view'))
+        self.assertEqual(len(response.context['photos']), 24)
+        self.assertEqual(decode_cursor(response.context['next_cursor']), (6, response.context['photos'][-1].pk))
+        self.assertContains(response, 'data-next="%s"' % response.context['next_cursor'])
+
+        rest = self.fetch(cursor=response.context['next_cursor'])
+        self.assertEqual([photo['title'] for photo in rest['photos']], ['foto%s' % i for i in range(5, -1, -1)])
+        self.assertIsNone(rest['next'])
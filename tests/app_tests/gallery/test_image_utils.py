@@ -1,10 +1,16 @@
 import os
+import tempfile
+from unittest import mock
+from django.core.management import call_command
 from django.test import TestCase
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 import io
 
-from gallery.image_utils import create_lazy_image, create_thumbnail, process_uploaded_image
+from gallery.image_utils import (
+    MIN_JPEG_QUALITY, PROGRESSIVE_JPEG, create_lazy_image, create_thumbnail, encode_jpeg,
+    encode_to_size, process_uploaded_image,
+)
 
 class ImageUtilsTestCase(TestCase):
     """Test cases für image_utils.py Funktionen"""
@@ -45,4 +51,62 @@ class ImageUtilsTestCase(TestCase):
         self.assertIn('lazy', processed)
         self.assertIsNotNone(processed['main'])
         self.assertIsNotNone(processed['thumbnail'])
-        self.assertIsNotNone(processed['lazy'])
\ No newline at end of file
+        self.assertIsNotNone(processed['lazy'])
+
+class ImagePipelineTestCase(TestCase):
+    """Einmal dekodieren, alle Varianten aus dem Bild im Speicher"""
+
+    def create_jpeg(self, width, height, exif_orientation=None, name='handy.jpg'):
+        img = Image.new('RGB', (width, height), color='blue')
+        img_io = io.BytesIO()
+        options = {}
+        if exif_orientation:
+            exif = Image.Exif()
+            exif[0x0112] = exif_orientation
+            options['exif'] = exif
+        img.save(img_io, format='JPEG', **options)
+        return SimpleUploadedFile(name=name, content=img_io.getvalue(), content_type='image/jpeg')
+
+    def test_upload_is_decoded_once(self):
+        upload = self.create_jpeg(3000, 2000)
+        with mock.patch('gallery.image_utils.Image.open', wraps=Image.open) as image_open:
+            processed = process_uploaded_image(upload)
+        self.assertEqual(image_open.call_count, 1)
+        self.assertEqual(Image.open(processed['main']).size, (2048, 1365))
+        self.assertEqual(Image.open(processed['lazy']).size, (800, 533))
+        self.assertEqual(Image.open(processed['thumbnail']).size, (400, 266))
+        self.assertEqual(processed['thumbnail'].name, 'handy_thumb.jpg')
+
+    def test_phone_photo_is_decoded_at_reduced_scale(self):
+        processed = process_uploaded_image(self.create_jpeg(4032, 3024))
+        self.assertEqual(Image.open(processed['main']).size, (2016, 1512))
+
+    def test_exif_rotation_is_applied_to_all_variants(self):
+        processed = process_uploaded_image(self.create_jpeg(1600, 1200, exif_orientation=6))
+        self.assertEqual(Image.open(processed['main']).size, (1200, 1600))
+        self.assertEqual(Image.open(processed['lazy']).size, (450, 600))
+        self.assertEqual(Image.open(processed['thumbnail']).size, (300, 400))
+
+    def test_quality_search_hits_size_target(self):
+        img = Image.effect_noise((1024, 1024), 100).convert('RGB')
+        sizes = {quality: len(encode_jpeg(img, quality, PROGRESSIVE_JPEG)) for quality in (85, 80, 75)}
+        data, quality, encoded = encode_to_size(img, max_bytes=sizes[80])
+        self.assertEqual((quality, len(data)), (80, sizes[80]))
+
+        data, quality, encoded = encode_to_size(img, max_bytes=20 * 1024)
+        # Auch bei Qualität 50 zu groß - verkleinert und erneut gesucht
+        self.assertLessEqual(len(data), 20 * 1024)
+        self.assertLess(encoded.width, img.width)
+        self.assertGreater(len(encode_jpeg(img, MIN_JPEG_QUALITY, PROGRESSIVE_JPEG)), 20 * 1024)
+
+    def test_benchmark_command(self):
+        with tempfile.TemporaryDirectory() as corpus:
+            for index in range(2):
+                with open(os.path.join(corpus, 'foto%s.jpg' % index), 'wb') as image_file:
+                    image_file.write(self.create_jpeg(1200, 900).read())
+            out = io.StringIO()
+            call_command('benchmark_image_pipeline', corpus, stdout=out)
+        output = out.getvalue()
+        self.assertIn('legacy', output)
+        self.assertIn('current', output)
+        self.assertIn('peak RSS', output)
@@ -0,0 +1,120 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from gallery.image_utils import process_uploaded_image, supported_modern_formats
+from gallery.models import Photo, PhotoCategory
+from mks.models import StoredFile
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_upload(width=1600, height=1200, name='konzert.jpg'):
+    img = Image.new('RGB', (width, height), color='orange')
+    img_io = io.BytesIO()
+    img.save(img_io, format='JPEG')
+    return SimpleUploadedFile(name, img_io.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantsTestCase(TestCase):
+    """WebP/AVIF-Varianten beim Upload, im Template und per Backfill"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.category = PhotoCategory.objects.create(title='Konzerte', ordering=1)
+
+    def create_uploaded_photo(self, **kwargs):
+        photo = Photo(title='Konzert', category=self.category, ordering=1, **kwargs)
+        photo.assign_processed_images(process_uploaded_image(jpeg_upload()))
+        photo.save()
+        return photo
+
+    def test_upload_writes_webp_variants(self):
+        self.assertIn('webp', supported_modern_formats())
+        photo = self.create_uploaded_photo()
+        photo.refresh_from_db()
+
+        self.assertEqual(set(photo.image_variants), {'main', 'lazy', 'thumbnail'})
+        lazy = photo.image_variants['lazy']
+        self.assertEqual((lazy['width'], lazy['height']), (800, 600))
+        self.assertTrue(lazy['webp'].startswith(Photo.VARIANT_UPLOAD_TO))
+        with photo.image.storage.open(lazy['webp']) as variant_file:
+            with Image.open(variant_file) as img:
+                self.assertEqual((img.format, img.size), ('WEBP', (800, 600)))
+
+    def test_new_image_drops_old_variants(self):
+        photo = self.create_uploaded_photo()
+        photo.image = jpeg_upload(name='neu.jpg')
+        photo.save()
+        self.assertEqual(photo.image_variants, {})
+
+    def test_picture_tag(self):
+        photo = self.create_uploaded_photo()
+        template = Template('{% load gallery_images %}{% photo_picture photo lazy=lazy %}')
+
+        html = template.render(Context({'photo': photo, 'lazy': False}))
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn(' 800w', html)
+        self.assertIn('src="%s"' % photo.image.url, html)
+
+        html = template.render(Context({'photo': photo, 'lazy': True}))
+        self.assertIn('<source type="image/webp" data-srcset="', html)
+        self.assertIn('class="lazy"', html)
+        self.assertIn('data-src="%s"' % photo.image.url, html)
+
+    def test_picture_tag_without_variants(self):
+        photo = Photo.objects.create(title='Alt', image='gallery/images/alt.jpg', category=self.category)
+        html = Template('{% load gallery_images %}{% photo_picture photo %}').render(Context({'photo': photo}))
+        self.assertNotIn('<source', html)
+        self.assertNotIn('srcset', html)
+
+    def test_gallery_and_api_offer_webp(self):
+        photo = self.create_uploaded_photo()
+        response = self.client.get(reverse('gallery_view'))
+        self.assertContains(response, 'type="image/webp"')
+
+        data = self.client.get(reverse('gallery_api_photos')).json()['photos'][0]
+        self.assertEqual(data['sources'][0]['type'], 'image/webp')
+        self.assertIn(photo.image_variants['thumbnail']['webp'], data['sources'][0]['srcset'])
+
+    def test_backfill_command(self):
+        photos = []
+        for index in range(3):
+            photo = Photo(title='Foto %s' % index, category=self.category, ordering=index)
+            photo.image = jpeg_upload(name='foto%s.jpg' % index)
+            photo.save()
+            photos.append(photo)
+        broken = Photo.objects.create(title='Fehlt', image='gallery/images/fehlt.jpg',
+                                      image_health=Photo.IMAGE_MISSING, category=self.category)
+
+        for workers in ('1', '2'):
+            Photo.objects.update(image_variants={})
+            call_command('generate_image_variants', '--workers', workers, stdout=io.StringIO())
+            for photo in photos:
+                photo.refresh_from_db()
+                self.assertEqual(photo.image_variants['main']['width'], 1600)
+                self.assertTrue(photo.image.storage.exists(photo.image_variants['thumbnail']['webp']))
+            broken.refresh_from_db()
+            self.assertEqual(broken.image_variants, {})
+
+        # Neu erzeugen zählt neue Referenzen im Hauptprozess und gibt die alten frei
+        names = photos[0].variant_file_names()
+        references = dict(StoredFile.objects.filter(name__in=names).values_list('name', 'references'))
+        call_command('generate_image_variants', '--all', '--workers', '2', stdout=io.StringIO())
+        self.assertEqual(
+            dict(StoredFile.objects.filter(name__in=names).values_list('name', 'references')), references)
+        self.assertEqual(set(references), set(names))
@@ -71,7 +71,8 @@ class LazyLoadingTestCase(TestCase):
         # Prüfe dass Lazy Image gespeichert wurde (nicht mehr default)
         self.assertTrue(photo.image_lazy)
         self.assertNotEqual(photo.image_lazy.name, 'gallery_lazy_imageDefault.jpg')
-        self.assertIn('_lazy.jpg', photo.image_lazy.name)
+        self.assertTrue(photo.image_lazy.name.startswith('gallery/images/lazy/'))
+        self.assertNotEqual(photo.image_lazy.name, photo.image.name)
     
     def test_thumbnail_creation(self):
         """Test ob Thumbnails korrekt erstellt werden"""
@@ -96,7 +97,8 @@ class LazyLoadingTestCase(TestCase):
         
         # Prüfe dass Thumbnail gespeichert wurde
         self.assertTrue(photo.image_thumbnail)
-        self.assertIn('_thumb.jpg', photo.image_thumbnail.name)    
+        self.assertTrue(photo.image_thumbnail.name.startswith('gallery/images/thumbnail/'))
+        self.assertTrue(photo.image_thumbnail.storage.exists(photo.image_thumbnail.name))    
     def test_process_uploaded_image(self):
         """Test die komplette Bildverarbeitung"""
         # Erstelle großes Test-Bild
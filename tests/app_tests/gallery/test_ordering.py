@@ -0,0 +1,121 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from gallery.models import Photo, PhotoCategory
+from gallery.ordering import ORDERING_GAP, apply_order, next_ordering, plan_ordering
+from users.models import CustomUser
+
+
+class PlanOrderingTestCase(TestCase):
+    """Neue Werte nur für verschobene Elemente"""
+
+    def test_single_move(self):
+        # Letztes Element an die zweite Stelle
+        self.assertEqual(plan_ordering([1024, 4096, 2048, 3072]), {1: 1536})
+        self.assertEqual(plan_ordering([3072, 1024, 2048]), {0: 0})
+        self.assertEqual(plan_ordering([2048, 3072, 1024]), {2: 3072 + ORDERING_GAP})
+
+    def test_sorted_list_is_unchanged(self):
+        self.assertEqual(plan_ordering([1, 5, 9]), {})
+
+    def test_missing_values(self):
+        self.assertEqual(plan_ordering([1024, None, 2048]), {1: 1536})
+        self.assertIsNone(plan_ordering([None, None]))
+
+    def test_no_gap_left(self):
+        self.assertIsNone(plan_ordering([1, 3, 2]))
+
+
+class ApplyOrderTestCase(TestCase):
+    def setUp(self):
+        self.category = PhotoCategory.objects.create(title='Konzerte', ordering=ORDERING_GAP)
+        self.photos = [
+            Photo.objects.create(title='Foto %s' % index, image='gallery/images/%s.jpg' % index,
+                                 category=self.category, ordering=(index + 1) * ORDERING_GAP)
+            for index in range(6)
+        ]
+
+    def displayed(self):
+        return list(Photo.objects.filter(category=self.category).order_by('-ordering').values_list('id', flat=True))
+
+    def update_statements(self, context):
+        return [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+
+    def test_move_updates_one_row(self):
+        order = self.displayed()
+        order.insert(1, order.pop())
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(apply_order(Photo.objects.all(), order, descending=True), 1)
+        self.assertEqual(len(self.update_statements(context)), 1)
+        self.assertEqual(self.displayed(), order)
+
+    def test_rebalance_in_one_statement(self):
+        # Alte Nummerierung ohne Lücken
+        for index, photo in enumerate(self.photos):
+            Photo.objects.filter(pk=photo.pk).update(ordering=index + 1)
+        order = self.displayed()
+        order.insert(3, order.pop(0))
+
+        with CaptureQueriesContext(connection) as context:
+            apply_order(Photo.objects.all(), order, descending=True)
+        statements = self.update_statements(context)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('CASE WHEN', statements[0])
+        self.assertEqual(self.displayed(), order)
+        self.assertEqual(
+            sorted(Photo.objects.values_list('ordering', flat=True)),
+            [ORDERING_GAP * (index + 1) for index in range(6)])
+
+    def test_next_ordering(self):
+        self.assertEqual(next_ordering(Photo.objects.filter(category=self.category)), 7 * ORDERING_GAP)
+        self.assertEqual(next_ordering(Photo.objects.none()), ORDERING_GAP)
+
+
+class OrderViewsTestCase(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json')
+
+    def test_photo_order(self):
+        category = PhotoCategory.objects.create(title='Konzerte', ordering=ORDERING_GAP)
+        first, second = [
+            Photo.objects.create(title=title, image='gallery/images/%s.jpg' % title,
+                                 category=category, ordering=ordering)
+            for title, ordering in (('Oben', 2 * ORDERING_GAP), ('Unten', ORDERING_GAP))
+        ]
+        data = self.post('gallery_update_order', {'photos': [second.id, first.id]}).json()
+        self.assertEqual((data['status'], data['updated']), ('success', 1))
+        self.assertEqual(
+            list(Photo.objects.order_by('-ordering').values_list('title', flat=True)), ['Unten', 'Oben'])
+
+    def test_category_order(self):
+        categories = [PhotoCategory.objects.create(title=title, ordering=(index + 1) * ORDERING_GAP)
+                      for index, title in enumerate(('A', 'B', 'C'))]
+        order = [categories[2].id, categories[0].id, categories[1].id]
+        data = self.post('gallery_update_category_order', {'categories': order}).json()
+        self.assertEqual((data['status'], data['updated']), ('success', 1))
+        self.assertEqual(list(PhotoCategory.objects.values_list('id', flat=True)), order)
+
+        data = self.post('gallery_create_category', {'title': 'D'}).json()
+        self.assertEqual(data['category']['ordering'], 3 * ORDERING_GAP)
+
+    def test_admin_page_wires_category_order(self):
+        category = PhotoCategory.objects.create(title='Konzerte', ordering=ORDERING_GAP)
+        response = self.client.get(reverse('gallery_admin'))
+        self.assertContains(response, 'data-category-id="%s"' % category.id)
+        self.assertContains(response, 'draggable="true"')
+        self.assertContains(response, reverse('gallery_update_category_order'))
+
+    def test_category_order_requires_post_and_login(self):
+        url = reverse('gallery_update_category_order')
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.client.logout()
+        self.assertEqual(self.post('gallery_update_category_order', {'categories': []}).status_code, 302)
@@ -0,0 +1,94 @@
+import hashlib
+import io
+import os
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from PIL import Image
+
+from gallery.image_utils import read_image_metadata
+from gallery.models import Photo, PhotoCategory
+
+
+def image_bytes(width, height, exif_orientation=None):
+    img = Image.new('RGB', (width, height), color='green')
+    img_io = io.BytesIO()
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        img.save(img_io, format='JPEG', exif=exif)
+    else:
+        img.save(img_io, format='JPEG')
+    return img_io.getvalue()
+
+
+class PhotoMetadataTestCase(TestCase):
+    """Metadaten am Photo statt Dateizugriffen beim Rendern"""
+
+    def setUp(self):
+        self.category = PhotoCategory.objects.create(title='Konzerte', ordering=1)
+
+    def create_photo(self, width=800, height=600, title='Foto'):
+        content = image_bytes(width, height)
+        photo = Photo.objects.create(
+            title=title,
+            image=SimpleUploadedFile('%s.jpg' % title, content, content_type='image/jpeg'),
+            category=self.category,
+            ordering=1,
+        )
+        self.addCleanup(photo.image.storage.delete, photo.image.name)
+        return photo, content
+
+    def test_metadata_is_stored_on_upload(self):
+        photo, content = self.create_photo(600, 900)
+        photo.refresh_from_db()
+        self.assertEqual((photo.image_width, photo.image_height), (600, 900))
+        self.assertEqual(photo.image_size, len(content))
+        self.assertEqual(photo.image_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(photo.image_health, Photo.IMAGE_OK)
+        self.assertTrue(photo.is_portrait)
+        self.assertFalse(photo.is_landscape)
+
+    def test_exif_rotation_swaps_dimensions(self):
+        metadata = read_image_metadata(io.BytesIO(image_bytes(800, 600, exif_orientation=6)))
+        self.assertEqual((metadata['width'], metadata['height']), (600, 800))
+
+    def test_corrupt_upload_is_flagged(self):
+        photo = Photo(title='Kaputt', category=self.category,
+                      image=SimpleUploadedFile('kaputt.jpg', b'not an image', content_type='image/jpeg'))
+        photo.save()
+        self.addCleanup(photo.image.storage.delete, photo.image.name)
+        self.assertEqual(photo.image_health, Photo.IMAGE_CORRUPT)
+        self.assertIsNone(photo.image_width)
+
+    def test_backfill_command(self):
+        ok_photo, content = self.create_photo(title='Vorhanden')
+        missing_photo, _ = self.create_photo(640, 480, title='Geloescht')
+        with self.captureOnCommitCallbacks(execute=True):
+            missing_photo.image.storage.delete(missing_photo.image.name)
+        Photo.objects.update(image_width=None, image_height=None, image_size=None,
+                             image_hash='', image_health=Photo.IMAGE_UNKNOWN)
+
+        out = io.StringIO()
+        call_command('backfill_photo_metadata', stdout=out)
+
+        ok_photo.refresh_from_db()
+        missing_photo.refresh_from_db()
+        self.assertEqual(ok_photo.image_health, Photo.IMAGE_OK)
+        self.assertEqual(ok_photo.image_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(missing_photo.image_health, Photo.IMAGE_MISSING)
+        self.assertIn('1 ok, 1 missing', out.getvalue())
+
+    def test_gallery_renders_from_stored_metadata(self):
+        portrait, _ = self.create_photo(600, 900, title='Hochformat')
+        missing, _ = self.create_photo(title='Fehlt')
+        Photo.objects.filter(pk=missing.pk).update(image_health=Photo.IMAGE_MISSING)
+        # Datei weg, Metadaten bleiben - die Ansicht darf die Datei nicht brauchen
+        os.remove(portrait.image.path)
+
+        response = self.client.get(reverse('gallery_view'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([photo.pk for photo in response.context['photos']], [portrait.pk])
+        self.assertContains(response, 'class="portrait gallery-item')
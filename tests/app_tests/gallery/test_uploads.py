@@ -0,0 +1,303 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from gallery.image_utils import process_uploaded_image
+from gallery.models import Photo, PhotoCategory, UploadBatch, UploadItem
+from gallery.uploads import (
+    ChunkError, batch_progress, create_upload_batch, process_upload_item, spool_directory, start_chunked_batch,
+    write_chunk, _worker_finished,
+)
+from mks.models import StoredFile
+from users.models import CustomUser
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_DIR = tempfile.mkdtemp()
+
+
+def jpeg_upload(name='konzert.jpg', width=1200, height=900):
+    img = Image.new('RGB', (width, height), color='teal')
+    img_io = io.BytesIO()
+    img.save(img_io, format='JPEG')
+    return SimpleUploadedFile(name, img_io.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, GALLERY_UPLOAD_DIR=UPLOAD_DIR, GALLERY_UPLOAD_WORKERS=0)
+class UploadBatchTestCase(TestCase):
+    """Mehrfach-Upload: Dateien ablegen, verarbeiten, Fortschritt abfragen"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.category = PhotoCategory.objects.create(title='Konzerte', ordering=1)
+        Photo.objects.create(title='Alt', image='gallery/images/alt.jpg', category=self.category, ordering=5)
+        self.user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(self.user)
+
+    def upload(self, *files):
+        return self.client.post(reverse('gallery_upload'), {
+            'is_multiple': 'true',
+            'category_id': self.category.id,
+            'images': list(files),
+        })
+
+    def test_multiple_upload_returns_batch(self):
+        response = self.upload(jpeg_upload('eins.jpg'), jpeg_upload('zwei.jpg'))
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['status'], 'accepted')
+        self.assertEqual(data['progress_url'], reverse('gallery_upload_progress', args=[data['batch_id']]))
+
+        progress = self.client.get(data['progress_url']).json()
+        self.assertTrue(progress['finished'])
+        self.assertEqual((progress['total'], progress['done'], progress['errors']), (2, 2, 0))
+        self.assertEqual([item['filename'] for item in progress['items']], ['eins.jpg', 'zwei.jpg'])
+
+        photos = Photo.objects.exclude(title='Alt')
+        self.assertEqual(
+            sorted(photos.values_list('title', 'ordering')), [('eins', 5 + 1024), ('zwei', 5 + 2048)])
+        item = progress['items'][0]['photo']
+        self.assertEqual(item['title'], 'eins')
+        self.assertEqual(Photo.objects.get(pk=item['id']).image_health, Photo.IMAGE_OK)
+
+        # Abgelegte Originale sind nach der Verarbeitung weg
+        self.assertFalse(os.path.exists(spool_directory(UploadBatch.objects.get())))
+
+    def test_too_large_file_is_reported(self):
+        small = jpeg_upload('klein.jpg', 40, 30)
+        with mock.patch('gallery.gallery_admin_views.MAX_FILE_SIZE', small.size):
+            response = self.upload(small, jpeg_upload('gross.jpg'))
+        self.assertEqual(response.status_code, 202)
+        items = {item['filename']: item for item in response.json()['items']}
+        self.assertEqual(items['gross.jpg']['status'], UploadItem.ERROR)
+        self.assertIn('zu groß', items['gross.jpg']['message'])
+        self.assertEqual(items['klein.jpg']['status'], UploadItem.DONE)
+
+    def test_all_files_rejected(self):
+        batch = create_upload_batch([jpeg_upload('gross.jpg')], self.category, self.user, max_file_size=10)
+        progress = batch_progress(batch)
+        self.assertEqual(progress['errors'], 1)
+        self.assertTrue(progress['finished'])
+        self.assertEqual(batch.items.get().spool_path, '')
+
+    def test_item_is_processed_once(self):
+        batch = create_upload_batch([jpeg_upload()], self.category, self.user)
+        item = batch.items.get()
+        self.assertTrue(os.path.exists(item.spool_path))
+
+        process_upload_item(item.id)
+        process_upload_item(item.id)
+        item.refresh_from_db()
+        self.assertEqual(item.status, UploadItem.DONE)
+        self.assertEqual(Photo.objects.filter(title='konzert').count(), 1)
+
+    def test_crashed_worker_marks_item_as_error(self):
+        batch = create_upload_batch([jpeg_upload()], self.category, self.user)
+        item = batch.items.get()
+        UploadItem.objects.filter(pk=item.pk).update(status=UploadItem.PROCESSING)
+        future = Future()
+        future.set_exception(BrokenProcessPool('Worker beendet'))
+        with self.assertLogs('gallery.uploads', 'ERROR'):
+            _worker_finished(item.pk, future)
+
+        item.refresh_from_db()
+        self.assertEqual(item.status, UploadItem.ERROR)
+        self.assertIn('Worker beendet', item.message)
+        self.assertFalse(os.path.exists(item.spool_path))
+
+        # Erfolgreiche Worker ändern nichts
+        done = Future()
+        done.set_result(None)
+        _worker_finished(item.pk, done)
+
+    def test_pending_uploads_command(self):
+        batch = create_upload_batch([jpeg_upload()], self.category, self.user)
+        call_command('process_pending_uploads', stdout=io.StringIO())
+        self.assertEqual(batch.items.get().status, UploadItem.DONE)
+
+        UploadBatch.objects.update(created_at=batch.created_at.replace(year=2000))
+        call_command('process_pending_uploads', stdout=io.StringIO())
+        self.assertFalse(UploadBatch.objects.exists())
+
+    def test_progress_endpoint(self):
+        response = self.client.get(reverse(
+            'gallery_upload_progress', args=['00000000-0000-0000-0000-000000000000']))
+        self.assertEqual(response.status_code, 404)
+
+        batch = create_upload_batch([jpeg_upload()], self.category, self.user)
+        self.client.logout()
+        response = self.client.get(reverse('gallery_upload_progress', args=[batch.pk]))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, GALLERY_UPLOAD_DIR=UPLOAD_DIR, GALLERY_UPLOAD_WORKERS=0)
+@mock.patch('gallery.uploads.CHUNK_SIZE', 4096)
+@mock.patch('gallery.gallery_admin_views.CHUNK_SIZE', 4096)
+class ChunkedUploadTestCase(TestCase):
+    """Chunked Upload: Blöcke fester Größe, Fortsetzen am Offset, Prüfsumme"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = PhotoCategory.objects.create(title='Konzerte', ordering=1)
+        self.user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(self.user)
+        # Rauschen, damit das JPEG mehrere Blöcke groß ist
+        img_io = io.BytesIO()
+        Image.frombytes('RGB', (400, 300), os.urandom(400 * 300 * 3)).save(img_io, format='JPEG')
+        self.data = img_io.getvalue()
+
+    def start(self, files):
+        return self.client.post(reverse('gallery_chunked_upload'), json.dumps({
+            'category_id': self.category.id,
+            'files': [{'name': name, 'size': size} for name, size in files],
+        }), content_type='application/json')
+
+    def put_chunk(self, url, offset, chunk, checksum=None):
+        headers = {}
+        if checksum is not False:
+            headers['HTTP_X_CHUNK_CHECKSUM'] = checksum or hashlib.sha256(chunk).hexdigest()
+        return self.client.put('%s?offset=%s' % (url, offset), chunk,
+                               content_type='application/octet-stream', **headers)
+
+    def test_chunked_upload(self):
+        response = self.start([('chunks.jpg', len(self.data))])
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['chunk_size'], 4096)
+        item = data['items'][0]
+        self.assertEqual((item['status'], item['offset']), (UploadItem.UPLOADING, 0))
+        url = item['upload_url']
+
+        # Falscher Offset und falsche Prüfsumme ändern nichts
+        response = self.put_chunk(url, 4096, self.data[4096:8192])
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 0))
+        response = self.put_chunk(url, 0, self.data[:4096], checksum='0' * 64)
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 0))
+        # Blöcke müssen die volle Größe haben
+        response = self.put_chunk(url, 0, self.data[:100])
+        self.assertEqual(response.status_code, 409)
+
+        response = self.put_chunk(url, 0, self.data[:4096])
+        self.assertEqual(response.json()['offset'], 4096)
+        # Wiederholter Block nach Abbruch: Server meldet, wo es weitergeht
+        response = self.put_chunk(url, 0, self.data[:4096])
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 4096))
+        self.assertEqual(self.client.get(url).json()['offset'], 4096)
+
+        offset = 4096
+        while offset < len(self.data):
+            response = self.put_chunk(url, offset, self.data[offset:offset + 4096], checksum=False)
+            self.assertEqual(response.status_code, 200)
+            offset = response.json()['offset']
+        self.assertEqual(response.json()['status'], UploadItem.DONE)
+
+        photo = Photo.objects.get(title='chunks')
+        self.assertEqual((photo.image_width, photo.image_height), (400, 300))
+        progress = self.client.get(data['progress_url']).json()
+        self.assertTrue(progress['finished'])
+        self.assertEqual(progress['items'][0]['photo']['id'], photo.id)
+
+        response = self.put_chunk(url, offset, b'x')
+        self.assertEqual(response.status_code, 409)
+
+    def test_late_duplicate_does_not_overwrite(self):
+        batch = start_chunked_batch([('chunks.jpg', len(self.data))], self.category, self.user)
+        stale = batch.items.get()
+        item = batch.items.get()
+        write_chunk(item, 0, io.BytesIO(self.data[:4096]))
+
+        # Wiederholung der ersten Anfrage mit anderem Inhalt, die den alten Stand gelesen hat
+        with self.assertRaises(ChunkError) as raised:
+            write_chunk(stale, 0, io.BytesIO(b'x' * 4096))
+        self.assertEqual(raised.exception.offset, 4096)
+        with self.assertRaises(ChunkError):
+            write_chunk(batch.items.get(), 4096, io.BytesIO(b'x' * 4096), checksum='0' * 64)
+        with open(stale.spool_path, 'rb') as spooled:
+            self.assertEqual(spooled.read(), self.data[:4096])
+
+    def test_start_validation(self):
+        self.assertEqual(self.client.post(
+            reverse('gallery_chunked_upload'), 'kein json', content_type='application/json').status_code, 400)
+        self.assertEqual(self.start([]).status_code, 400)
+
+        with mock.patch('gallery.gallery_admin_views.MAX_FILE_SIZE', 1000):
+            items = self.start([('gross.jpg', 5000), ('klein.jpg', 500), ('leer.jpg', 0)]).json()['items']
+        self.assertEqual([item['status'] for item in items],
+                         [UploadItem.ERROR, UploadItem.UPLOADING, UploadItem.ERROR])
+
+    def test_unfinished_upload_is_not_finished(self):
+        batch = start_chunked_batch([('eins.jpg', 10)], self.category, self.user)
+        self.assertFalse(batch_progress(batch)['finished'])
+        self.assertEqual(os.path.getsize(batch.items.get().spool_path), 0)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, GALLERY_UPLOAD_DIR=UPLOAD_DIR, GALLERY_UPLOAD_WORKERS=0)
+class DuplicateUploadTestCase(TestCase):
+    """Gleiche Datei in mehreren Kategorien: Bilder werden wiederverwendet"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.konzerte = PhotoCategory.objects.create(title='Konzerte', ordering=1)
+        self.archiv = PhotoCategory.objects.create(title='Archiv', ordering=2)
+
+    def upload(self, category, name='konzert.jpg'):
+        batch = create_upload_batch([jpeg_upload(name)], category, self.user)
+        item = batch.items.get()
+        process_upload_item(item.id)
+        item.refresh_from_db()
+        return item.photo
+
+    def test_known_upload_reuses_images(self):
+        first = self.upload(self.konzerte)
+        with mock.patch('gallery.models.process_uploaded_image') as process:
+            second = self.upload(self.archiv, 'kopie.jpg')
+        process.assert_not_called()
+
+        self.assertEqual(second.source_hash, first.source_hash)
+        self.assertEqual(second.title, 'kopie')
+        self.assertEqual(second.stored_file_names(), first.stored_file_names())
+        self.assertEqual(second.image_variants, first.image_variants)
+        self.assertEqual((second.image_width, second.image_health), (first.image_width, Photo.IMAGE_OK))
+        for name in first.stored_file_names():
+            self.assertEqual(StoredFile.objects.get(name=name).references, 2)
+
+    def test_deleting_a_photo_releases_its_files(self):
+        first = self.upload(self.konzerte)
+        second = self.upload(self.archiv)
+        names = first.stored_file_names()
+        storage = first.image.storage
+
+        first.delete()
+        self.assertTrue(all(storage.exists(name) for name in names))
+        self.assertEqual(set(StoredFile.objects.values_list('references', flat=True)), {1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(any(storage.exists(name) for name in names))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_missing_images_are_processed_again(self):
+        first = self.upload(self.konzerte)
+        Photo.objects.filter(pk=first.pk).update(image_health=Photo.IMAGE_MISSING)
+        with mock.patch('gallery.models.process_uploaded_image', wraps=process_uploaded_image) as process:
+            self.upload(self.archiv)
+        process.assert_called_once()
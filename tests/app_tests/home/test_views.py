@@ -13,3 +13,65 @@ class ImpressumViewTestCase(TestCase):
         self.assertTemplateUsed(response, 'home/impressum.html')
         #Check template
         self.assertTemplateUsed(response, 'templates/base.html')
+
+
+class HomePayloadTestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_second_request_served_from_cache(self):
+        response = self.client.get(reverse('home_view'))
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home_view'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_payload_rebuilt_after_save(self):
+        from home.models import NewsItem
+        self.client.get(reverse('home_view'))
+        NewsItem.objects.create(title='Neues Semester', content='Anmeldung offen')
+        response = self.client.get(reverse('home_view'))
+        self.assertContains(response, 'Neues Semester')
+
+
+class SliderManifestTestCase(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+        from django.core.cache import cache
+        from django.test import override_settings
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_manifest_served_with_far_future_headers(self):
+        from home.slider_manifest import get_slider_manifest_digest
+        digest = get_slider_manifest_digest()
+        response = self.client.get(reverse('slider_manifest', args=[digest]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), b'{"photos":[]}')
+
+    def test_manifest_uses_stored_dimensions(self):
+        from gallery.models import Photo, PhotoCategory
+        from home.slider_manifest import build_slider_manifest_data
+        category = PhotoCategory.objects.create(id=1, title='Startseite')
+        # Die Datei existiert nicht - die Maße kommen aus der Datenbank
+        Photo.objects.create(title='Konzert', image='gallery/images/konzert.jpg', category=category,
+                             image_width=1600, image_height=900)
+        entry = build_slider_manifest_data()[0]
+        self.assertEqual((entry['width'], entry['height']), (1600, 900))
+
+    def test_homepage_links_manifest(self):
+        from home.slider_manifest import get_slider_manifest_digest
+        response = self.client.get(reverse('home_view'))
+        self.assertContains(response, reverse('slider_manifest', args=[get_slider_manifest_digest()]))
+
+    def test_unknown_manifest_is_not_served(self):
+        # Unknown pages are redirected to the homepage by handler404
+        response = self.client.get(reverse('slider_manifest', args=['0123456789ab']))
+        self.assertRedirects(response, reverse('home_view'), fetch_redirect_response=False)
@@ -1,3 +1,39 @@
+import datetime
+
 from django.test import TestCase
+from django.urls import reverse
+
+from events.models import Event
+from invitation.models import Invitation
+from users.models import CustomUser
+
+
+class InvitationExportTestCase(TestCase):
+    def setUp(self):
+        event = Event.objects.create(name='Hexe Rabaukel', date=datetime.date(2024, 12, 18))
+        Invitation.objects.create(name='Anna', email='anna@example.com', event=event, number_of_guests=2)
+        Invitation.objects.create(name='Ben', email='ben@example.com', event_name='Legacy', number_of_guests=None)
+
+    def test_requires_login(self):
+        response = self.client.get(reverse('invitation:invitation_export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_requires_staff(self):
+        user = CustomUser.objects.create_user(username='lehrer', password='pass12345')
+        self.client.force_login(user)
+        response = self.client.get(reverse('invitation:invitation_export'), {'format': 'csv'})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(response.streaming)
 
-# Create your tests here.
+    def test_csv_export(self):
+        user = CustomUser.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.force_login(user)
+        response = self.client.get(reverse('invitation:invitation_export'), {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 3)
+        rows = {line.split(';')[3]: line.split(';') for line in lines[1:]}
+        self.assertEqual(rows['Anna'][0], 'Hexe Rabaukel')
+        self.assertEqual(rows['Anna'][6], '3')
+        self.assertEqual(rows['Ben'][0], 'Legacy')
+        self.assertEqual(rows['Ben'][6], '1')
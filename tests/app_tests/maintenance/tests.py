@@ -301,3 +301,56 @@ class MaintenanceModeTestCase(TestCase):
         # POST von Superuser
         response = self.superuser_client.post('/', {'test': 'data'})
         self.assertEqual(response.status_code, 200)
+
+
+class MaintenanceStateTestCase(TestCase):
+    """Tests für den prozessweiten Maintenance Status"""
+    
+    def setUp(self):
+        cache.clear()
+        os.environ.pop('MAINTENANCE_MODE', None)
+        
+    def tearDown(self):
+        cache.clear()
+        
+    def test_status_check_without_db_queries(self):
+        """Nach dem ersten Laden wird die Datenbank nicht mehr abgefragt"""
+        from maintenance.state import is_maintenance_active
+        is_maintenance_active()
+        with self.assertNumQueries(0):
+            self.assertFalse(is_maintenance_active())
+            
+    def test_toggle_from_other_process_is_picked_up(self):
+        """Ein neuer Versions-Stempel im Cache wird ohne DB übernommen"""
+        from maintenance.state import MAINTENANCE_STATE_CACHE_KEY, is_maintenance_active
+        self.assertFalse(is_maintenance_active())
+        cache.set(MAINTENANCE_STATE_CACHE_KEY, ('other-worker', True), None)
+        with self.assertNumQueries(0):
+            self.assertTrue(is_maintenance_active())
+            
+    def test_missing_stamp_reloads_from_db(self):
+        """Fehlt der Stempel, wird der Status aus der DB geladen"""
+        from maintenance.state import is_maintenance_active
+        maintenance = MaintenanceMode.load()
+        maintenance.is_active = True
+        maintenance.save()
+        cache.clear()
+        self.assertTrue(is_maintenance_active())
+
+
+class RequestClassificationTestCase(TestCase):
+    """Tests für mks.request_classification"""
+    
+    def test_bot_detection_matches_indicators(self):
+        from mks.request_classification import is_bot
+        self.assertTrue(is_bot('Mozilla/5.0 (compatible; Googlebot/2.1)'))
+        self.assertTrue(is_bot('python-requests/2.31'))
+        self.assertFalse(is_bot('Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X)'))
+        self.assertFalse(is_bot(''))
+        
+    def test_prefix_matcher(self):
+        from mks.request_classification import get_prefix_matcher
+        matcher = get_prefix_matcher(('/admin/', '/static/'))
+        self.assertTrue(matcher('/static/css/main.css'))
+        self.assertFalse(matcher('/lehrende/'))
+        self.assertIs(matcher, get_prefix_matcher(('/admin/', '/static/')))
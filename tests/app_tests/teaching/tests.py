@@ -1,4 +1,6 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 from teaching.models import Teacher
 from students.models import Student
 from students.gender import Gender
@@ -6,6 +8,9 @@ from students.academic_title import AcademicTitle
 from users.models import CustomUser
 from location.models import Country, Location
 from teaching.get_students import request_teacher_id, get_alibi_pic
+from teaching.directory import get_fachgruppen, get_teacher_directory, teachers_in
+from teaching.fachgruppe import Fachgruppe
+from teaching.subject import Subject, SubjectCategory
 
 def create_teacher(self, first_name='Maria', last_name='Musterfrau',
                    image='teacher_imageDefault', email='teacher@teacher.at',
@@ -77,3 +82,131 @@ class RequestTeacherIdTest(TestCase):
     def test_request_if_user_id_is_four(self):
         x = self.create_teacher()
         self.assertEqual(request_teacher_id(x), 4)
+
+
+class TeacherDirectoryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.gender = Gender.objects.create(gender='Female')
+        self.direction = SubjectCategory.objects.create(name='Direktion')
+        self.brass = SubjectCategory.objects.create(name='Blechblasinstrumente')
+        self.wood = SubjectCategory.objects.create(name='Holzblasinstrumente')
+        self.director_subject = Subject.objects.create(subject='Direktor', category=self.direction)
+        self.deputy_subject = Subject.objects.create(subject='Stellvertretung', category=self.direction)
+        self.trumpet = Subject.objects.create(subject='Trompete', category=self.brass)
+        self.clarinet = Subject.objects.create(subject='Klarinette', category=self.wood)
+
+        self.anna = self.create_teacher('Anna', 'Zeller', self.director_subject, self.trumpet)
+        self.bernd = self.create_teacher('Bernd', 'Adler', self.deputy_subject)
+        self.clara = self.create_teacher('Clara', 'Berger', self.trumpet, self.clarinet)
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_teacher(self, first_name, last_name, *subjects):
+        teacher = Teacher.objects.create(gender=self.gender, first_name=first_name, last_name=last_name)
+        teacher.subject.set(subjects)
+        return teacher
+
+    def test_directory_is_built_with_one_query(self):
+        with self.assertNumQueries(1):
+            directory = get_teacher_directory()
+            subjects = [
+                [subject.subject for subject in teacher.subject_list]
+                for teachers in directory.values() for teacher in teachers
+            ]
+        self.assertIn(['Direktor', 'Trompete'], subjects)
+        with self.assertNumQueries(0):
+            get_teacher_directory()
+
+    def test_director_comes_first(self):
+        self.assertEqual(teachers_in('Direktion'), [self.anna, self.bernd])
+        self.assertEqual(teachers_in('Blechblasinstrumente'), [self.clara, self.anna])
+
+    def test_combined_categories_are_distinct(self):
+        self.assertEqual(teachers_in('Blechblasinstrumente', 'Holzblasinstrumente'), [self.clara, self.anna])
+        self.assertEqual(teachers_in('Unbekannt'), [])
+
+    def test_subject_assignment_invalidates_directory(self):
+        self.assertEqual(teachers_in('Holzblasinstrumente'), [self.clara])
+        self.bernd.subject.add(self.clarinet)
+        self.assertEqual(teachers_in('Holzblasinstrumente'), [self.bernd, self.clara])
+        self.clarinet.delete()
+        self.assertEqual(teachers_in('Holzblasinstrumente'), [])
+
+    def test_teacher_change_invalidates_directory(self):
+        get_teacher_directory()
+        self.bernd.last_name = 'Zwerger'
+        self.bernd.save()
+        self.assertEqual(teachers_in('Direktion')[1].last_name, 'Zwerger')
+
+    def test_about_page_and_fachgruppe_share_directory(self):
+        response = self.client.get(reverse('teaching:all_teachers'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['director'], [self.anna, self.bernd])
+        self.assertRegex(response.content.decode(), r'Direktor,\s+Trompete')
+
+        with self.assertNumQueries(0):
+            teachers_in('Blechblasinstrumente', 'Holzblasinstrumente')
+        Fachgruppe.objects.get(slug='blasinstrumente').categories.set([self.brass, self.wood])
+        response = self.client.get(reverse('teaching:teaching_brass'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['teachers'], [self.clara, self.anna])
+
+
+class FachgruppenRegistryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        gender = Gender.objects.create(gender='Female')
+        brass = SubjectCategory.objects.create(name='Blechblasinstrumente')
+        wood = SubjectCategory.objects.create(name='Holzblasinstrumente')
+        self.trumpet = Subject.objects.create(subject='Trompete', category=brass, ordering=1)
+        self.flute = Subject.objects.create(subject='Querflöte', category=wood, ordering=2)
+        Subject.objects.create(subject='Ensemble', category=wood, complementary_subject=True)
+        Subject.objects.create(subject='Alte Fächer', category=wood, hidden_subject=True)
+
+        self.brass_group = Fachgruppe.objects.get(slug='blasinstrumente')
+        self.brass_group.categories.set([brass, wood])
+
+        self.teacher = Teacher.objects.create(gender=gender, first_name='Eva', last_name='Horn')
+        self.teacher.subject.set([self.trumpet, self.flute])
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_registry_is_loaded_with_one_query(self):
+        with self.assertNumQueries(1):
+            fachgruppen = get_fachgruppen()
+        brass_group = fachgruppen['blasinstrumente']
+        self.assertEqual(brass_group.category_names, ['Blechblasinstrumente', 'Holzblasinstrumente'])
+        self.assertEqual(brass_group.subject_list, [self.trumpet, self.flute])
+        self.assertEqual(len(brass_group.youtube_videos), 5)
+        self.assertEqual(fachgruppen['streichinstrumente'].subject_list, [])
+        with self.assertNumQueries(0):
+            get_fachgruppen()
+
+    def test_fachgruppe_page_merges_categories(self):
+        response = self.client.get(reverse('teaching:teaching_brass'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['category_name'], 'Blasinstrumente')
+        self.assertEqual(response.context['subjects'], [self.trumpet, self.flute])
+        self.assertEqual(response.context['teachers'], [self.teacher])
+        self.assertContains(response, 'Querflöte')
+
+    def test_new_group_needs_no_code_change(self):
+        group = Fachgruppe.objects.create(name='Alte Musik', slug='alte-musik', intro_text='Barock')
+        group.categories.set([self.flute.category])
+        overview = self.client.get(reverse('teaching:teaching_music'))
+        self.assertContains(overview, reverse('teaching:fachgruppe', args=['alte-musik']))
+
+        response = self.client.get(reverse('teaching:fachgruppe', args=['alte-musik']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['teachers'], [self.teacher])
+        self.assertContains(response, 'Barock')
+
+    def test_hidden_group_is_not_listed(self):
+        Fachgruppe.objects.filter(slug='musikkunde').update(hidden=True)
+        cache.clear()
+        self.assertNotIn('musikkunde', get_fachgruppen())
+        response = self.client.get(reverse('teaching:teaching_theory'))
+        self.assertNotEqual(response.status_code, 200)
@@ -1,3 +1,25 @@
-from django.test import TestCase
+from django.test import TestCase, RequestFactory
 
-# Create your tests here.
+from users.middleware import TwoFactorSetupRedirectMiddleware
+from users.models import CustomUser
+
+
+class TwoFactorSetupRedirectTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='lehrer', password='pass12345', is_staff=True)
+        self.middleware = TwoFactorSetupRedirectMiddleware(lambda request: None)
+
+    def make_request(self):
+        request = RequestFactory().get('/controlling/')
+        request.user = CustomUser.objects.get(pk=self.user.pk)
+        return request
+
+    def test_redirect_check_without_refresh_query(self):
+        request = self.make_request()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.middleware.needs_2fa_redirect(request))
+
+    def test_enabled_2fa_is_not_redirected(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(is_2fa_enabled=True)
+        self.assertFalse(self.middleware.needs_2fa_redirect(self.make_request()))
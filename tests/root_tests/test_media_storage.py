@@ -0,0 +1,88 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+
+from mks.media_storage import media_storage
+from mks.models import StoredFile
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTestCase(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_identical_content_is_stored_once(self):
+        content = b'gleiche Bytes'
+        sha256 = hashlib.sha256(content).hexdigest()
+        first = media_storage.save('blog/posts/images/a.JPG', ContentFile(content))
+        second = media_storage.save('blog/posts/images/b.jpg', ContentFile(content))
+
+        self.assertEqual(first, 'blog/posts/images/%s/%s.jpg' % (sha256[:2], sha256))
+        self.assertEqual(first, second)
+        entry = StoredFile.objects.get(name=first)
+        self.assertEqual((entry.sha256, entry.size, entry.references), (sha256, len(content), 2))
+        # Keine Temp-Dateien übrig
+        self.assertEqual(media_storage.listdir('')[1], [])
+
+        other = media_storage.save('blog/posts/images/c.jpg', ContentFile(b'andere Bytes'))
+        self.assertNotEqual(other, first)
+
+    def test_file_is_deleted_with_last_reference(self):
+        name = media_storage.save('gallery/images/a.jpg', ContentFile(b'bild'))
+        media_storage.save('gallery/images/b.jpg', ContentFile(b'bild'))
+
+        media_storage.delete(name)
+        self.assertTrue(media_storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).references, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media_storage.delete(name)
+            # Erst nach dem Commit
+            self.assertTrue(media_storage.exists(name))
+        self.assertFalse(media_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_rollback_keeps_file(self):
+        name = media_storage.save('gallery/images/a.jpg', ContentFile(b'bild'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    media_storage.delete(name)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(StoredFile.objects.get(name=name).references, 1)
+        # Der Callback einer zurückgerollten Transaktion löscht nichts mehr
+        for callback in callbacks:
+            callback()
+        self.assertTrue(media_storage.exists(name))
+
+    def test_content_stored_again_before_commit_is_kept(self):
+        name = media_storage.save('gallery/images/a.jpg', ContentFile(b'bild'))
+        with self.captureOnCommitCallbacks(execute=True):
+            media_storage.delete(name)
+            self.assertEqual(media_storage.save('gallery/images/b.jpg', ContentFile(b'bild')), name)
+        self.assertTrue(media_storage.exists(name))
+
+    def test_missing_file_is_written_again(self):
+        name = media_storage.save('gallery/images/a.jpg', ContentFile(b'bild'))
+        os.remove(media_storage.path(name))
+        self.assertEqual(media_storage.save('gallery/images/b.jpg', ContentFile(b'bild')), name)
+        self.assertTrue(media_storage.exists(name))
+
+    def test_unindexed_files_are_deleted_as_before(self):
+        with open(media_storage.path('alt.jpg'), 'wb') as legacy:
+            legacy.write(b'alt')
+        self.assertFalse(media_storage.release('alt.jpg'))
+        media_storage.delete('alt.jpg')
+        self.assertFalse(media_storage.exists('alt.jpg'))
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from mks import reference_data
+from mks.reference_data import ReferenceModelChoiceField
+from students.forms import SignInForm
+from students.gender import Gender
+from teaching.get_students import get_alibi_pic
+from teaching.models import Teacher
+from teaching.subject import Subject, SubjectCategory
+
+
+class ReferenceDataTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.male = Gender.objects.create(gender='Male')
+        self.female = Gender.objects.create(gender='Female')
+        category = SubjectCategory.objects.create(name='Tasteninstrumente')
+        self.piano = Subject.objects.create(subject='Klavier', category=category)
+        self.organ = Subject.objects.create(subject='Orgel', category=category)
+        self.accordion = Subject.objects.create(subject='Akkordeon', category=category)
+        self.hidden = Subject.objects.create(subject='Cembalo', category=category, hidden_subject=True)
+
+    def test_table_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            reference_data.rows(Gender)
+            reference_data.rows(Gender)
+            self.assertEqual(reference_data.get(Gender, self.female.pk), self.female)
+            self.assertEqual(reference_data.find(Gender, gender='Male'), self.male)
+
+    def test_lookups(self):
+        self.assertEqual(reference_data.get(Gender, str(self.male.pk)), self.male)
+        self.assertIsNone(reference_data.find(Gender, gender='Divers'))
+        with self.assertRaises(Gender.DoesNotExist):
+            reference_data.get(Gender, 0)
+        with self.assertRaises(ValueError):
+            reference_data.rows(Teacher)
+
+    def test_save_invalidates_tables(self):
+        self.assertEqual(len(reference_data.rows(Gender)), 2)
+        Gender.objects.create(gender='Divers')
+        self.assertEqual(len(reference_data.rows(Gender)), 3)
+        self.male.delete()
+        self.assertIsNone(reference_data.find(Gender, gender='Male'))
+
+    def test_related_rows_are_loaded_with_the_table(self):
+        subjects = reference_data.rows(Subject)
+        with self.assertNumQueries(0):
+            self.assertEqual({subject.category.name for subject in subjects}, {'Tasteninstrumente'})
+
+    def test_alibi_pic_without_queries(self):
+        reference_data.rows(Gender)
+        with self.assertNumQueries(0):
+            image = get_alibi_pic('/media/student_imageDefault', self.female, None)
+        self.assertEqual(image, '/media/students/images/signup_female.png')
+
+    def test_choice_field_serves_choices_from_memory(self):
+        field = ReferenceModelChoiceField(
+            Subject,
+            predicate=lambda subject: not subject.hidden_subject,
+            sort_key=lambda subject: subject.subject,
+        )
+        list(field.choices)
+        with self.assertNumQueries(0):
+            labels = [label for value, label in field.choices]
+            self.assertEqual(labels, ['---------', 'Akkordeon', 'Klavier', 'Orgel'])
+            self.assertEqual(field.clean(str(self.organ.pk)), self.organ)
+        with self.assertRaises(ValidationError):
+            field.clean(str(self.hidden.pk))
+        with self.assertRaises(ValidationError):
+            field.clean('abc')
+
+    def test_sign_in_form_subjects(self):
+        form = SignInForm()
+        labels = [label for value, label in form.fields['subject'].choices]
+        self.assertEqual(labels, ['---------', 'Akkordeon', 'Klavier', 'Orgel'])
+        self.assertIn('Orgel', str(form['subject']))
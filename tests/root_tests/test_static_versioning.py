@@ -0,0 +1,42 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from mks import static_manifest
+from mks.templatetags.static_versioning import versioned_static
+
+
+class VersionedStaticTestCase(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, True)
+        os.makedirs(os.path.join(self.static_root, 'css'))
+        with open(os.path.join(self.static_root, 'css', 'site.css'), 'w') as f:
+            f.write('body { color: red; }')
+        static_manifest.reset_static_manifest()
+        self.addCleanup(static_manifest.reset_static_manifest)
+
+    def test_version_is_stable_content_hash(self):
+        with override_settings(STATIC_ROOT=self.static_root):
+            static_manifest.write_static_manifest()
+            first = versioned_static('css/site.css')
+            second = versioned_static('css/site.css')
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('/static/css/site.css?v='))
+
+    def test_manifest_written_to_static_root(self):
+        with override_settings(STATIC_ROOT=self.static_root):
+            path, count = static_manifest.write_static_manifest()
+        with open(path) as f:
+            manifest = json.load(f)
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            manifest['css/site.css'],
+            static_manifest.file_hash(os.path.join(self.static_root, 'css', 'site.css')))
+
+    def test_unknown_file_is_not_versioned(self):
+        with override_settings(STATIC_ROOT=self.static_root):
+            self.assertEqual(versioned_static('css/missing.css'), '/static/css/missing.css')
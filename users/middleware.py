@@ -111,15 +111,9 @@ class TwoFactorSetupRedirectMiddleware:
         if not request.user.is_authenticated:
             return False
             
-        # Skip if already has 2FA - DB-Check mit Refresh
-        try:
-            # Refresh user from DB to get latest state
-            request.user.refresh_from_db()
-            if request.user.is_2fa_enabled:
-                return False
-        except:
-            # If refresh fails, assume no 2FA
-            pass
+        # Skip if already has 2FA - request.user lädt AuthenticationMiddleware bei jedem Request neu
+        if request.user.is_2fa_enabled:
+            return False
             
         # Skip always allowed URLs (erweitert für 2FA-Pfade)
         if any(request.path.startswith(url) for url in self.always_allowed):
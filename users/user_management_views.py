@@ -9,6 +9,7 @@ from django.db.models import Q
 from users.models import CustomUser
 from teaching.models import Teacher
 from teaching.models import SubjectCategory
+from mks import reference_data
 
 
 def is_admin(user):
@@ -164,7 +165,7 @@ def user_role_edit(request, user_id):
         return redirect('users:role_list')
     
     # Get available subject categories for coordinators
-    subject_categories = SubjectCategory.objects.all()
+    subject_categories = reference_data.rows(SubjectCategory)
     
     # Check if user is a teacher
     is_teacher = hasattr(user, 'teacher')